@@ -1,28 +1,110 @@
 import os
+import asyncio
 import json
-from fastapi import FastAPI, HTTPException
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastapi import Depends, FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
-import openai
-import uvicorn
-
-# Load environment variables
-load_dotenv()
+from dependencies.auth import get_current_user
+from services.jobs import JobQueue, JobStore, QueueFull
+from services.rate_limit import ConcurrencyGate, MemoryBackend, RateLimiter, SQLiteBackend
+from services.taxonomy import quick_analysis, score_project
+from utils.profiling import install_profiling
 
 # --- OpenAI/DeepSeek Configuration ---
-api_key = os.getenv('DEEPSEEK_API_KEY')
-if not api_key:
-    print("Warning: DEEPSEEK_API_KEY environment variable not set!")
-openai.api_key = api_key
-openai.api_base = os.getenv('DEEPSEEK_API_BASE', "https://api.deepseek.com/v1")
+# openai (which pulls in aiohttp and requests) is only imported on the first AI
+# call, so importing this module and starting a worker stay cheap.
+_openai = None
+
+def load_settings():
+    """Loads environment variables from .env (idempotent)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# the limits, gate and job queue below read their settings at import, so
+# .env has to be loaded first (under `uvicorn ai:app` nothing else loads it)
+load_settings()
+
+def get_openai():
+    """Returns the configured openai module, importing it on first use."""
+    global _openai
+    if _openai is None:
+        load_settings()
+        import openai
+
+        api_key = os.getenv('DEEPSEEK_API_KEY')
+        if not api_key:
+            print("Warning: DEEPSEEK_API_KEY environment variable not set!")
+        openai.api_key = api_key
+        openai.api_base = os.getenv('DEEPSEEK_API_BASE', "https://api.deepseek.com/v1")
+        _openai = openai
+    return _openai
+
+# --- Admission Control ---
+# Every analysis/ranking call may cost a paid, multi-second DeepSeek request, so
+# callers are identified by their access token and limited per user and
+# globally. AI_RATE_LIMIT_DB points all workers on a host at one SQLite file;
+# without it each worker keeps its own in-memory buckets.
+rate_limiter = RateLimiter(
+    backend=SQLiteBackend(os.environ["AI_RATE_LIMIT_DB"]) if os.getenv("AI_RATE_LIMIT_DB") else MemoryBackend(),
+    user_rate=float(os.getenv("AI_USER_REQUESTS_PER_MINUTE", 10)) / 60,
+    user_burst=float(os.getenv("AI_USER_BURST", 5)),
+    global_rate=float(os.getenv("AI_GLOBAL_REQUESTS_PER_MINUTE", 120)) / 60,
+    global_burst=float(os.getenv("AI_GLOBAL_BURST", 30)),
+)
+
+# At most DEEPSEEK_MAX_CONCURRENCY calls in flight per worker; a short queue
+# absorbs bursts and anything beyond it is shed with 429 + Retry-After.
+deepseek_gate = ConcurrencyGate(
+    limit=int(os.getenv("DEEPSEEK_MAX_CONCURRENCY", 8)),
+    max_waiting=int(os.getenv("DEEPSEEK_MAX_WAITING", 32)),
+    max_wait_seconds=float(os.getenv("DEEPSEEK_MAX_WAIT_SECONDS", 10)),
+)
+
+# Background jobs were already admitted when submitted; they wait for a slot
+# instead of being shed.
+in_background_job: ContextVar[bool] = ContextVar("in_background_job", default=False)
+
+def rate_limited(scope: str):
+    """Dependency: authenticates the caller and charges one request to their bucket."""
+    def dependency(user=Depends(get_current_user)):
+        rate_limiter.check(scope, user["id"])
+        return user
+    return dependency
+
+# --- Background Ranking Jobs ---
+# Long rankings run on a bounded pool of workers instead of holding the HTTP
+# connection; jobs are persisted so queued work survives a restart.
+async def run_rank_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    in_background_job.set(True)
+    ranked = await rank_projects_internal(payload.get("requirements"), payload["projects"])
+    return build_rank_response(ranked).model_dump()
+
+rank_jobs = JobQueue(
+    kind="rank-projects",
+    runner=run_rank_job,
+    store=JobStore(os.getenv("RANK_JOB_DB", "rank_jobs.sqlite3")),
+    workers=int(os.getenv("RANK_JOB_WORKERS", 4)),
+    max_pending=int(os.getenv("RANK_JOB_MAX_PENDING", 1000)),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await rank_jobs.start()
+    yield
+    await rank_jobs.stop()
 
 # --- FastAPI Application Instance ---
 app = FastAPI(
     title="Project Matching AI Service",
     description="Provides user requirement analysis and project ranking features based on DeepSeek.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+install_profiling(app)
 
 # --- Pydantic Model Definitions ---
 
@@ -34,11 +116,30 @@ class AnalyzeResponse(BaseModel):
     keywords: Optional[List[str]] = Field(None, description="Extracted technical keywords", example=["Machine Learning", "Image Recognition"])
     features: Optional[List[str]] = Field(None, description="Specific project features mentioned by the user", example=["Needs a deep learning model"])
 
+class BatchAnalyzeRequest(BaseModel):
+    inputs: List[str] = Field(..., min_length=1, max_length=500, description="Requirement texts, one per student")
+
+class BatchAnalyzeItem(BaseModel):
+    index: int = Field(..., description="Position of the input in the request")
+    source: Optional[str] = Field(None, description="rule (answered locally), llm, or none (asked for all projects)")
+    fields: List[str] = Field(default_factory=list)
+    keywords: List[str] = Field(default_factory=list)
+    features: List[str] = Field(default_factory=list)
+    error: Optional[str] = Field(None, description="Why this input could not be analyzed")
+
+class BatchAnalyzeResponse(BaseModel):
+    results: List[BatchAnalyzeItem]
+    api_calls: int = Field(..., description="DeepSeek calls made for the whole batch")
+
 class ProjectInput(BaseModel):
     id: Any = Field(..., description="Unique identifier for the project")
     name: str = Field(..., description="Name of the project")
     description: Optional[str] = Field(None, description="Description of the project")
     field: Optional[str] = Field(None, description="Field the project belongs to")
+    # Precomputed when the project was written (GET /projects/ranking-input on the main API)
+    fields: Optional[List[str]] = Field(None, description="Normalized fields extracted from the project")
+    keywords: Optional[List[str]] = Field(None, description="Normalized technical keywords extracted from the project")
+    features: Optional[List[str]] = Field(None, description="Normalized features extracted from the project")
     # Add more project attributes as needed
 
 class RequirementsInput(BaseModel):
@@ -63,11 +164,38 @@ class RankedProjectOutput(BaseModel):
 class RankResponse(BaseModel):
     ranked_projects: List[RankedProjectOutput] = Field(..., description="List of ranked projects")
 
+class RankJobRequest(RankRequest):
+    priority: int = Field(0, description="Higher priority jobs are started first")
+
+class RankJobStatus(BaseModel):
+    job_id: str = Field(..., description="Identifier to poll or cancel the job with")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    priority: int = Field(0, description="Priority the job was submitted with")
+    created_at: float = Field(..., description="Submission time (unix seconds)")
+    updated_at: float = Field(..., description="Time of the last status change (unix seconds)")
+    result: Optional[RankResponse] = Field(None, description="Ranking, once the job has succeeded")
+    error: Optional[str] = Field(None, description="Failure reason, if the job failed")
+
+class AnalysisMetrics(BaseModel):
+    total: int = Field(..., description="Analysis requests handled since startup")
+    rule_based: int = Field(..., description="Answered by the local taxonomy matcher")
+    llm: int = Field(..., description="Deferred to DeepSeek")
+    list_all: int = Field(..., description="Requests asking for the full project list")
+    rule_based_share: float = Field(..., description="Share of requests answered without an API call")
+    avg_rule_us: float = Field(..., description="Mean time spent in the local matcher, in microseconds")
+
 
 # --- Core AI Logic Functions ---
 
 async def call_deepseek_api(messages: List[Dict[str, str]], expect_json: bool = True):
+    """Calls the DeepSeek API once a concurrency slot is free (see deepseek_gate)."""
+    async with deepseek_gate.slot(shed=not in_background_job.get()):
+        return await _request_deepseek(messages, expect_json)
+
+
+async def _request_deepseek(messages: List[Dict[str, str]], expect_json: bool = True):
     """Asynchronously calls the DeepSeek API for conversation."""
+    openai = get_openai()
     try:
         if not openai.api_key:
             print("Error: API Key not configured!")
@@ -80,14 +208,11 @@ async def call_deepseek_api(messages: List[Dict[str, str]], expect_json: bool =
         print(f"Expect JSON: {expect_json}")
         print("-"*50)
 
-        # Note: Asynchronous calls with the openai library might require `async openai` or `httpx`.
-        # For simplicity, synchronous calls are kept here, but async is recommended in FastAPI.
-        # If performance issues arise, switch to an async HTTP client library (e.g., httpx or aiohttp).
-
         response_format = {"type": "json_object"} if expect_json else {"type": "text"}
 
-        # Using openai.ChatCompletion.create (consider migrating to newer client methods if available)
-        response = openai.ChatCompletion.create(
+        # acreate (aiohttp under the hood) keeps the event loop free while DeepSeek
+        # responds, so concurrent requests and ranking jobs actually overlap
+        response = await openai.ChatCompletion.acreate(
             model=os.getenv('DEEPSEEK_MODEL', "deepseek-chat"),
             messages=messages,
             temperature=0.3,
@@ -130,21 +255,13 @@ async def call_deepseek_api(messages: List[Dict[str, str]], expect_json: bool =
         raise HTTPException(status_code=500, detail=f"Internal error processing AI request: {str(e)}")
 
 
-async def analyze_user_requirements_internal(user_input: str) -> Optional[Dict[str, Any]]:
-    """Analyzes user requirements, extracts keywords and fields (internal implementation)."""
-    print(f"\nStarting user requirement analysis for: {user_input}")
+# How analysis requests were answered since the process started
+analysis_metrics = Counter()
 
-    # Simple keyword check to see if the user is just asking for a list of projects
-    ask_keywords = ['what projects', 'which projects', 'all projects', 'show projects', 'list projects', 'view projects']
-    normalized_input = user_input.lower()
-    if any(keyword in normalized_input for keyword in ask_keywords):
-        print("User might be asking for all projects, returning None (indicating no specific requirements extracted)")
-        return None # Return None to indicate no specific requirements were extracted
+# Phrases meaning the user just wants to browse every project
+LIST_ALL_PHRASES = ['what projects', 'which projects', 'all projects', 'show projects', 'list projects', 'view projects']
 
-    messages = [
-        {
-            "role": "system",
-            "content": """#### Role
+ANALYSIS_SYSTEM_PROMPT = """#### Role
 - Assistant Name: Project Requirement Analysis Expert
 - Primary Task: Analyze student project requirements, extract key information, and match to predefined project fields.
 
@@ -182,6 +299,46 @@ If the user input cannot be analyzed for specific requirements, or is just small
 2. Keywords: Prioritize technical terms.
 3. Features: Only extract requirements explicitly stated by the user (e.g., specific tech stack, functionality).
 4. Brevity: Include only the most core requirement information."""
+
+
+def triage_input(user_input: str):
+    """Decides how an input is answered: ("list_all", None), ("rule", requirements) or ("llm", None).
+
+    Requests for the full project list need no analysis, and inputs that map
+    cleanly onto the field/keyword taxonomy (e.g. "I want a blockchain
+    project") are answered locally without calling the API.
+    """
+    normalized_input = user_input.lower()
+    if any(phrase in normalized_input for phrase in LIST_ALL_PHRASES):
+        analysis_metrics["list_all"] += 1
+        return "list_all", None
+
+    started = time.perf_counter()
+    local_result = quick_analysis(user_input)
+    analysis_metrics["rule_seconds"] += time.perf_counter() - started
+    if local_result is not None:
+        analysis_metrics["rule_based"] += 1
+        return "rule", local_result
+    analysis_metrics["llm"] += 1
+    return "llm", None
+
+
+async def analyze_user_requirements_internal(user_input: str) -> Optional[Dict[str, Any]]:
+    """Analyzes user requirements, extracts keywords and fields (internal implementation)."""
+    print(f"\nStarting user requirement analysis for: {user_input}")
+
+    route, local_result = triage_input(user_input)
+    if route == "list_all":
+        print("User might be asking for all projects, returning None (indicating no specific requirements extracted)")
+        return None # Return None to indicate no specific requirements were extracted
+    if route == "rule":
+        print(f"Requirement analysis answered locally: {json.dumps(local_result, ensure_ascii=False)}")
+        return local_result
+
+    messages = [
+        {
+            "role": "system",
+            "content": ANALYSIS_SYSTEM_PROMPT
         },
         {
             "role": "user",
@@ -210,6 +367,131 @@ If the user input cannot be analyzed for specific requirements, or is just small
     return response_data
 
 
+# --- Batch Analysis ---
+# A cohort's interests are analyzed several inputs per prompt: inputs are packed
+# up to a token budget (and an item cap that keeps the JSON answer within the
+# completion limit), packs run concurrently and answers are matched back by index.
+ANALYZE_BATCH_TOKEN_BUDGET = int(os.getenv("ANALYZE_BATCH_TOKEN_BUDGET", 2000))
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", 20))
+# prompts one batch may have in flight, so a large batch cannot take every DeepSeek slot
+ANALYZE_BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", 4))
+
+BATCH_INSTRUCTIONS = """
+
+#### Batch Mode
+The user message is a JSON object {"inputs": [{"index": 0, "text": "..."}, ...]} holding several
+independent students' requirements. Analyze each text on its own, following the rules above, and output:
+{
+    "results": [
+        {"index": 0, "fields": [], "keywords": [], "features": []}
+    ]
+}
+Return exactly one result per input, with the same index."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token, plus JSON framing)."""
+    return len(text) // 4 + 8
+
+
+def pack_inputs(items: List[tuple], token_budget: int, max_items: int) -> List[List[tuple]]:
+    """Groups (index, text) items into packs that fit the prompt budget; an
+    oversized input gets a pack of its own."""
+    packs, current, used = [], [], 0
+    for item in items:
+        cost = estimate_tokens(item[1])
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            packs.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _clean_requirements(entry: Any) -> Optional[Dict[str, List[str]]]:
+    if not isinstance(entry, dict):
+        return None
+    cleaned = {}
+    for key in ("fields", "keywords", "features"):
+        values = entry.get(key, [])
+        if not isinstance(values, list):
+            return None
+        cleaned[key] = [str(v) for v in values if v]
+    return cleaned
+
+
+async def analyze_pack(pack: List[tuple]) -> Dict[int, Dict[str, Any]]:
+    """One DeepSeek call for a pack; returns {index: result or error} for every item in it."""
+    messages = [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT + BATCH_INSTRUCTIONS},
+        {"role": "user", "content": json.dumps(
+            {"inputs": [{"index": index, "text": text} for index, text in pack]}, ensure_ascii=False)},
+    ]
+    try:
+        response_data = await call_deepseek_api(messages, expect_json=True)
+    except HTTPException as e:
+        return {index: {"error": str(e.detail)} for index, _ in pack}
+
+    returned = {}
+    results = response_data.get("results") if isinstance(response_data, dict) else None
+    for entry in results if isinstance(results, list) else []:
+        index = entry.get("index") if isinstance(entry, dict) else None
+        cleaned = _clean_requirements(entry)
+        if isinstance(index, int) and cleaned is not None:
+            returned[index] = cleaned
+
+    outcome = {}
+    for index, _ in pack:
+        if index in returned:
+            outcome[index] = {"source": "llm", **returned[index]}
+        else:
+            outcome[index] = {"error": "Missing or malformed in the AI response"}
+    return outcome
+
+
+def plan_batch(inputs: List[str]) -> tuple:
+    """Answers what the local matcher can; returns (results in input order, packs for DeepSeek)."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+    pending = []
+    for index, text in enumerate(inputs):
+        route, local_result = triage_input(text)
+        if route == "list_all":
+            results[index] = {"source": "none", "fields": [], "keywords": [], "features": []}
+        elif route == "rule":
+            results[index] = {"source": "rule", **local_result}
+        else:
+            pending.append((index, text))
+
+    packs = pack_inputs(pending, ANALYZE_BATCH_TOKEN_BUDGET, ANALYZE_BATCH_MAX_ITEMS)
+    print(f"\nBatch analysis: {len(inputs)} inputs, {len(inputs) - len(pending)} answered locally, "
+          f"{len(pending)} sent to DeepSeek in {len(packs)} prompts")
+    return results, packs
+
+
+async def run_batch(results: List[Optional[Dict[str, Any]]], packs: List[List[tuple]]) -> tuple:
+    """Sends the packs to DeepSeek, at most ANALYZE_BATCH_CONCURRENCY at a time; returns
+    (results in input order, number of API calls made)."""
+    semaphore = asyncio.Semaphore(ANALYZE_BATCH_CONCURRENCY)
+
+    async def bounded(pack):
+        async with semaphore:
+            return await analyze_pack(pack)
+
+    # each pack reports its own failures, so one bad pack never sinks the batch
+    for outcome in await asyncio.gather(*(bounded(pack) for pack in packs)):
+        for index, result in outcome.items():
+            results[index] = result
+    return results, len(packs)
+
+
+async def analyze_batch_internal(inputs: List[str]) -> tuple:
+    """Analyzes many inputs; returns (results in input order, number of API calls made)."""
+    results, packs = plan_batch(inputs)
+    return await run_batch(results, packs)
+
+
 async def rank_projects_internal(requirements: Optional[Dict[str, Any]], projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Ranks projects based on user requirements (internal implementation)."""
     print(f"\nStarting project ranking...")
@@ -224,6 +506,18 @@ async def rank_projects_internal(requirements: Optional[Dict[str, Any]], project
         # Add null score and reasoning to each project
         return [{**p, 'score': None, 'reasoning': 'Not ranked due to missing requirements or empty list'} for p in projects]
 
+    # If every project carries precomputed features, score them locally with the
+    # same rubric instead of having the LLM re-read every description. A project
+    # whose analysis found no field and no keyword has nothing to score locally.
+    if all(p.get("fields") or p.get("keywords") for p in projects):
+        print("All projects have precomputed features, scoring locally without an API call.")
+        scored = []
+        for p in projects:
+            score, reasoning = score_project(requirements, p)
+            scored.append({**p, 'score': score, 'reasoning': reasoning})
+        scored.sort(key=lambda p: p['score'], reverse=True)
+        return scored
+
     # Prepare project information, including only necessary fields to reduce token usage
     projects_for_api = [
         {
@@ -361,7 +655,7 @@ Project List:
 # -H "Content-Type: application/json" \
 # -d '{"user_input": "I am interested in web security and blockchain projects"}'
 @app.post("/analyze-requirements", response_model=AnalyzeResponse, summary="Analyze user requirement text")
-async def analyze_requirements(request: AnalyzeRequest):
+async def analyze_requirements(request: AnalyzeRequest, user=Depends(rate_limited("analyze"))):
     """
     Receives user input text and calls the AI to analyze and extract key project requirement information.
 
@@ -382,6 +676,28 @@ async def analyze_requirements(request: AnalyzeRequest):
     return AnalyzeResponse(**analysis_result)
 
 
+@app.post("/analyze-requirements/batch", response_model=BatchAnalyzeResponse, summary="Analyze many requirement texts at once")
+async def analyze_requirements_batch(request: BatchAnalyzeRequest, user=Depends(get_current_user)):
+    """
+    Analyzes a list of requirement texts (e.g. a whole cohort's interests).
+
+    Inputs the local matcher can answer never reach DeepSeek; the rest are packed
+    several per prompt and the prompts run concurrently. Results come back in
+    input order, and an input that could not be analyzed carries an `error`
+    instead of failing the whole request.
+
+    The caller's rate limit is charged one request per DeepSeek prompt the batch
+    needs (at least one), so a batch costs what the same calls made one by one would.
+    """
+    results, packs = plan_batch(request.inputs)
+    rate_limiter.check("analyze-batch", user["id"], cost=max(len(packs), 1))
+    results, api_calls = await run_batch(results, packs)
+    return BatchAnalyzeResponse(
+        results=[BatchAnalyzeItem(index=index, **result) for index, result in enumerate(results)],
+        api_calls=api_calls,
+    )
+
+
 # Example usage comment:
 # To call this endpoint, send a POST request to /rank-projects
 # with a JSON body containing 'requirements' (output from /analyze-requirements, can be null)
@@ -407,7 +723,7 @@ async def analyze_requirements(request: AnalyzeRequest):
 #       ]
 #     }'
 @app.post("/rank-projects", response_model=RankResponse, summary="Rank a list of projects based on requirements")
-async def rank_projects_endpoint(request: RankRequest):
+async def rank_projects_endpoint(request: RankRequest, user=Depends(rate_limited("rank"))):
     """
     Receives structured user requirements and a list of projects, then calls the AI
     to score and rank the projects based on relevance.
@@ -423,7 +739,11 @@ async def rank_projects_endpoint(request: RankRequest):
     requirements_dict = request.requirements.model_dump() if request.requirements else None
 
     ranked_projects_list = await rank_projects_internal(requirements_dict, projects_dict_list)
+    return build_rank_response(ranked_projects_list)
+
 
+def build_rank_response(ranked_projects_list: List[Dict[str, Any]]) -> RankResponse:
+    """Converts the internal ranking result into the validated response model."""
     # Convert the list of dictionaries returned by the internal function
     # back to a list of Pydantic models for the response.
     validated_ranked_projects = []
@@ -446,14 +766,116 @@ async def rank_projects_endpoint(request: RankRequest):
 
     return RankResponse(ranked_projects=validated_ranked_projects)
 
+
+def job_owner(user: Dict[str, Any]) -> str:
+    # student and supervisor ids come from different tables, so keep the role
+    return f"{user['role']}:{user['id']}"
+
+
+def owned_job(job_id: str, user: Dict[str, Any]) -> Dict[str, Any]:
+    """The job if this user submitted it; other users' jobs are reported as missing."""
+    job = rank_jobs.store.get(job_id)
+    if job is None or job["submitted_by"] != job_owner(user):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def job_status(job: Dict[str, Any]) -> RankJobStatus:
+    return RankJobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        priority=job["priority"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=job["result"],
+        error=job["error"],
+    )
+
+
+# Example usage comment:
+# Submit a ranking job (returns immediately with a job id), then poll it.
+# curl -X POST "http://127.0.0.1:8001/rank-projects/jobs" \
+# -H "Authorization: Bearer <access token>" -H "Content-Type: application/json" \
+# -d '{"priority": 5, "requirements": {"fields": ["AI"], "keywords": ["NLP"], "features": []},
+#      "projects": [{"id": 1, "name": "Chatbot", "description": "NLP based chatbot", "field": "AI"}]}'
+# curl -H "Authorization: Bearer <access token>" "http://127.0.0.1:8001/rank-projects/jobs/<job_id>?wait=30"
+@app.post("/rank-projects/jobs", response_model=RankJobStatus, status_code=202, summary="Submit a background ranking job")
+async def submit_rank_job(request: RankJobRequest, user=Depends(rate_limited("rank"))):
+    """
+    Queues the same work as /rank-projects and returns a job id straight away.
+
+    - **priority**: Higher priority jobs are picked up first by the worker pool.
+
+    Poll GET /rank-projects/jobs/{job_id} (optionally with `wait` to long-poll) for the result.
+    """
+    payload = {
+        "requirements": request.requirements.model_dump() if request.requirements else None,
+        "projects": [p.model_dump() for p in request.projects],
+    }
+    try:
+        job_id = rank_jobs.submit(payload, priority=request.priority, submitted_by=job_owner(user))
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Ranking queue is full, please retry later")
+    return job_status(rank_jobs.store.get(job_id))
+
+
+@app.get("/rank-projects/jobs/{job_id}", response_model=RankJobStatus, summary="Get a ranking job")
+async def get_rank_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for the job to finish"),
+    user=Depends(get_current_user),
+):
+    """
+    Returns the job's status, and the ranking once it has succeeded.
+    With `wait`, the call blocks until the job finishes or the wait expires.
+    Only the user who submitted the job can see it.
+    """
+    owned_job(job_id, user)
+    job = await rank_jobs.wait(job_id, wait)
+    return job_status(job)
+
+
+@app.delete("/rank-projects/jobs/{job_id}", response_model=RankJobStatus, summary="Cancel a ranking job")
+async def cancel_rank_job(job_id: str, user=Depends(get_current_user)):
+    """Cancels a queued or running job of the caller's. Finished jobs are returned unchanged.
+
+    A job running in another worker process stops at that worker's next lease renewal.
+    """
+    job = owned_job(job_id, user)
+    if rank_jobs.cancel(job_id):
+        job = await rank_jobs.wait(job_id, 5)
+    return job_status(job)
+
+@app.get("/metrics/analysis", response_model=AnalysisMetrics, summary="Requirement analysis fast-path statistics")
+async def get_analysis_metrics(user=Depends(get_current_user)):
+    """Reports how many analysis requests the local matcher answered versus DeepSeek."""
+    rule_based, llm, list_all = (analysis_metrics[k] for k in ("rule_based", "llm", "list_all"))
+    total = rule_based + llm + list_all
+    matched = rule_based + llm
+    return AnalysisMetrics(
+        total=total,
+        rule_based=rule_based,
+        llm=llm,
+        list_all=list_all,
+        rule_based_share=rule_based / total if total else 0.0,
+        avg_rule_us=analysis_metrics["rule_seconds"] / matched * 1e6 if matched else 0.0,
+    )
+
 # --- Running the FastAPI Application ---
-# You can run this service using: uvicorn backend.ai:app --reload --port 8001
+# It imports the backend's services/ and utils/ packages like main.py does, so
+# run it from backend/ (or pass --app-dir backend from the repo root):
+#   cd backend && uvicorn ai:app --reload --port 8001
+#   uvicorn ai:app --app-dir backend --reload --port 8001
 if __name__ == "__main__":
+    import uvicorn
+
+    load_settings()
     # Get port from environment variable or default to 8001
     port = int(os.getenv("PORT", 8001))
     print(f"Starting AI service on http://127.0.0.1:{port}")
     # Note: In production, using Gunicorn + Uvicorn workers is recommended.
-    uvicorn.run("backend.ai:app", host="127.0.0.1", port=port, log_level="info", reload=True)
+    uvicorn.run("ai:app", app_dir=os.path.dirname(os.path.abspath(__file__)),
+                host="127.0.0.1", port=port, log_level="info", reload=True)
 
 # --- requirements.txt Notes ---
 # To run this file, ensure the following dependencies are installed:
@@ -2,14 +2,17 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from config import DATABASE_URL
 from database import Base
-from models import project, supervisor, user_base, student
+from models import project, supervisor, user_base, student, group, capacity, project_feature, recommendation
 
 from alembic import context
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# the app and the migrations share one connection setting
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,41 @@
+"""store updated_at in UTC
+
+Revision ID: 3e7c91b05d48
+Revises: b6d9f1a4c873
+Create Date: 2026-10-19 21:04:37.118260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7c91b05d48'
+down_revision: Union[str, None] = 'b6d9f1a4c873'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('supervisors', 'students', 'projects', 'student_recommendations')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # only MySQL's NOW() is server-local; SQLite's CURRENT_TIMESTAMP was UTC already
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET updated_at = CONVERT_TZ(updated_at, @@session.time_zone, '+00:00')")
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                        server_default=sa.text('(UTC_TIMESTAMP())'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET updated_at = CONVERT_TZ(updated_at, '+00:00', @@session.time_zone)")
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(), existing_nullable=False,
+                        server_default=sa.func.now())
@@ -0,0 +1,35 @@
+"""add student_groups.project_id
+
+Revision ID: 7a1c2e9d4b10
+Revises: 490c03ecd47c
+Create Date: 2026-10-19 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c2e9d4b10'
+down_revision: Union[str, None] = '490c03ecd47c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('student_groups', sa.Column('project_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_student_groups_project_id'), 'student_groups', ['project_id'], unique=False)
+    op.create_foreign_key(
+        'fk_student_groups_project_id', 'student_groups', 'projects',
+        ['project_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_student_groups_project_id', 'student_groups', type_='foreignkey')
+    op.drop_index(op.f('ix_student_groups_project_id'), table_name='student_groups')
+    op.drop_column('student_groups', 'project_id')
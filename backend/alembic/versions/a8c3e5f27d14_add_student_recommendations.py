@@ -0,0 +1,53 @@
+"""add student_recommendations
+
+Revision ID: a8c3e5f27d14
+Revises: f4b2d8c61e07
+Create Date: 2026-10-19 17:05:48.217530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3e5f27d14'
+down_revision: Union[str, None] = 'f4b2d8c61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'student_recommendations',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('requirement_text', sa.Text(), nullable=False),
+        sa.Column('requirement_hash', sa.String(length=40), nullable=False),
+        sa.Column('requirements', sa.JSON(), nullable=True),
+        sa.Column('analyzed_hash', sa.String(length=40), nullable=True),
+        sa.Column('results', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id')
+    )
+    op.create_table(
+        'recommendation_projects',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['student_recommendations.student_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id', 'project_id')
+    )
+    op.create_index(op.f('ix_recommendation_projects_project_id'), 'recommendation_projects', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recommendation_projects_project_id'), table_name='recommendation_projects')
+    op.drop_table('recommendation_projects')
+    op.drop_table('student_recommendations')
@@ -0,0 +1,48 @@
+"""add capacity counters
+
+Revision ID: b3f81d6a2c47
+Revises: 7a1c2e9d4b10
+Create Date: 2026-10-19 10:03:41.507219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f81d6a2c47'
+down_revision: Union[str, None] = '7a1c2e9d4b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'supervisor_capacity',
+        sa.Column('supervisor_id', sa.Integer(), nullable=False),
+        sa.Column('remaining', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['supervisor_id'], ['supervisors.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('supervisor_id')
+    )
+    op.create_table(
+        'project_capacity',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('supervisor_id', sa.Integer(), nullable=True),
+        sa.Column('remaining', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['supervisor_id'], ['supervisors.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_index(op.f('ix_project_capacity_supervisor_id'), 'project_capacity', ['supervisor_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_project_capacity_supervisor_id'), table_name='project_capacity')
+    op.drop_table('project_capacity')
+    op.drop_table('supervisor_capacity')
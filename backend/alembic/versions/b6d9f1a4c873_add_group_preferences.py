@@ -0,0 +1,38 @@
+"""add group_preferences
+
+Revision ID: b6d9f1a4c873
+Revises: a8c3e5f27d14
+Create Date: 2026-10-20 10:12:36.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d9f1a4c873'
+down_revision: Union[str, None] = 'a8c3e5f27d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'group_preferences',
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['student_groups.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('group_id', 'project_id')
+    )
+    op.create_index(op.f('ix_group_preferences_project_id'), 'group_preferences', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_group_preferences_project_id'), table_name='group_preferences')
+    op.drop_table('group_preferences')
@@ -0,0 +1,38 @@
+"""add project_features
+
+Revision ID: d52b8e3a6f90
+Revises: c9e4a07f5d21
+Create Date: 2026-10-19 13:41:52.906317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52b8e3a6f90'
+down_revision: Union[str, None] = 'c9e4a07f5d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'project_features',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('fields', sa.JSON(), nullable=False),
+        sa.Column('keywords', sa.JSON(), nullable=False),
+        sa.Column('features', sa.JSON(), nullable=False),
+        sa.Column('source_hash', sa.String(length=40), nullable=False),
+        sa.Column('analyzed_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_features')
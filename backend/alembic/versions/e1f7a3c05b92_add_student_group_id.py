@@ -0,0 +1,35 @@
+"""add students.group_id
+
+Revision ID: e1f7a3c05b92
+Revises: d52b8e3a6f90
+Create Date: 2026-10-19 15:02:37.441906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f7a3c05b92'
+down_revision: Union[str, None] = 'd52b8e3a6f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('students', sa.Column('group_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_students_group_id'), 'students', ['group_id'], unique=False)
+    op.create_foreign_key(
+        'fk_students_group_id', 'students', 'student_groups',
+        ['group_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_students_group_id', 'students', type_='foreignkey')
+    op.drop_index(op.f('ix_students_group_id'), table_name='students')
+    op.drop_column('students', 'group_id')
@@ -0,0 +1,30 @@
+"""add project schedule indexes
+
+Revision ID: f4b2d8c61e07
+Revises: e1f7a3c05b92
+Create Date: 2026-10-19 16:20:11.583402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b2d8c61e07'
+down_revision: Union[str, None] = 'e1f7a3c05b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_start_end', 'projects', ['project_start_time', 'project_end_time'], unique=False)
+    op.create_index('ix_projects_end_start', 'projects', ['project_end_time', 'project_start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_end_start', table_name='projects')
+    op.drop_index('ix_projects_start_end', table_name='projects')
@@ -0,0 +1,293 @@
+"""Latency/throughput benchmark for the main API on a seeded SQLite database.
+
+Drives main.app in-process (no network) against SQLite seeded with N users
+and N projects per scale, and reports latency percentiles and throughput for
+the auth routes and every /supervisors route:
+
+    python -m benchmarks.api_bench --scales 1000 10000 100000
+    python -m benchmarks.api_bench --save-baseline       # record current numbers
+    python -m benchmarks.api_bench --tolerance 0.3       # fail on >30% p50 regressions
+
+Baselines are machine specific; record them on the machine that compares
+against them. Every run seeds a fresh database, in memory unless --db-file.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("FAST_START", "1")
+os.environ.setdefault("SQL_ECHO", "0")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+import database
+from crud.user import hash_password
+from models.capacity import SupervisorCapacity, ProjectCapacity  # noqa: F401  (tables for the write paths)
+from models.group import StudentGroup  # noqa: F401
+from models.project import Project
+from models.project_feature import ProjectFeature  # noqa: F401
+from models.recommendation import StudentRecommendation  # noqa: F401
+from models.student import Student
+from models.supervisor import Supervisor
+from utils.jwt import create_access_token
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "api_baseline.json")
+PASSWORD = "bench-password"
+SUPERVISOR_SHARE = 10  # one supervisor per ten users
+SEED_CHUNK = 5000
+
+
+def use_database(db_file):
+    url = f"sqlite:///{db_file}" if db_file else "sqlite://"
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool if not db_file else None,
+    )
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    database.Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, scale: int):
+    """scale users (a tenth of them supervisors) and scale projects spread over the supervisors."""
+    # bcrypt is deliberately slow; hashing once keeps seeding at 100k feasible
+    password = hash_password(PASSWORD)
+    supervisors = max(1, scale // SUPERVISOR_SHARE)
+    students = scale - supervisors
+    start = datetime(2025, 2, 1)
+
+    def chunks(rows):
+        for i in range(0, len(rows), SEED_CHUNK):
+            yield rows[i:i + SEED_CHUNK]
+
+    with engine.begin() as conn:
+        for rows in chunks([
+            {"id": i, "first_name": "sup", "last_name": f"s{i}", "email": f"sup.s{i}@uts.edu.au",
+             "password": password, "user_group_identifier": "supervisor", "quota": 5,
+             "faculty": "Engineering and IT", "expertise": "Software"}
+            for i in range(1, supervisors + 1)
+        ]):
+            conn.execute(insert(Supervisor), rows)
+        for rows in chunks([
+            {"id": i, "first_name": "stu", "last_name": f"s{i}", "email": f"stu.s{i}@student.uts.edu.au",
+             "password": password, "user_group_identifier": "student"}
+            for i in range(1, students + 1)
+        ]):
+            conn.execute(insert(Student), rows)
+        for rows in chunks([
+            {"id": i, "title": f"Project {i}", "description": "Seeded benchmark project",
+             "research_field": "Artificial Intelligence", "group_or_individual": "Group",
+             "project_start_time": start, "project_end_time": start + timedelta(days=90),
+             "supervisor_id": (i - 1) % supervisors + 1, "project_grade": ""}
+            for i in range(1, scale + 1)
+        ]):
+            conn.execute(insert(Project), rows)
+    return supervisors, students
+
+
+def bearer(user_id: int, email: str, role: str):
+    token = create_access_token({"id": user_id, "sub": email, "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def project_body(i: int):
+    return {
+        "title": f"Bench project {i}", "description": "Created by the benchmark",
+        "research_field": "Big Data", "group_or_individual": "Individual",
+        "project_start_time": "2025-02-01T00:00:00", "project_end_time": "2025-05-01T00:00:00",
+    }
+
+
+def build_cases(client: TestClient, supervisor_id: int, iterations: int):
+    """(name, iterations factor, request(i) -> response) for each measured route."""
+    sup = bearer(supervisor_id, f"sup.s{supervisor_id}@uts.edu.au", "supervisor")
+    stu = bearer(1, "stu.s1@student.uts.edu.au", "student")
+    base = f"/supervisors/{supervisor_id}"
+    run_id = int(time.time() * 1000) % 1_000_000
+    rows_needed = iterations + 2
+
+    # projects created up front so that updates/deletes have rows to work on
+    def make_projects(count):
+        ids = []
+        for start in range(0, count, 100):
+            body = {"projects": [project_body(i) for i in range(start, min(count, start + 100))]}
+            ids += client.post(f"{base}/projects/batch", json=body, headers=sup).json()["ids"]
+        return ids
+
+    state = {}
+
+    def prepared(key, count):
+        if key not in state:
+            state[key] = make_projects(count)
+        return state[key]
+
+    def me_projects_etag():
+        if "etag" not in state:
+            state["etag"] = client.get("/supervisors/me/projects", headers=sup).headers["etag"]
+        return state["etag"]
+
+    def me_etag():
+        if "me_etag" not in state:
+            state["me_etag"] = client.get("/supervisors/me", headers=sup).headers["etag"]
+        return state["me_etag"]
+
+    return [
+        # register and login are dominated by bcrypt, so they get fewer iterations
+        ("POST /api/register", 0.1, lambda i: client.post("/api/register", json={
+            "first_name": "reg", "last_name": f"r{run_id}x{i}",
+            "email": f"reg.r{run_id}x{i}@student.uts.edu.au", "password": PASSWORD})),
+        ("POST /api/login", 0.1, lambda i: client.post("/api/login", json={
+            "email": f"stu.s{i % 50 + 1}@student.uts.edu.au", "password": PASSWORD})),
+        ("GET /api/me", 1, lambda i: client.get("/api/me", headers=stu)),
+        ("GET /supervisors/me", 1, lambda i: client.get("/supervisors/me", headers=sup)),
+        ("GET /supervisors/me (304)", 1, lambda i: client.get(
+            "/supervisors/me", headers={**sup, "If-None-Match": me_etag()})),
+        ("GET /supervisors/me/projects", 1, lambda i: client.get("/supervisors/me/projects", headers=sup)),
+        ("GET /supervisors/me/projects (304)", 1, lambda i: client.get(
+            "/supervisors/me/projects", headers={**sup, "If-None-Match": me_projects_etag()})),
+        ("GET /supervisors/me/dashboard", 1, lambda i: client.get("/supervisors/me/dashboard", headers=sup)),
+        ("PUT /supervisors/me", 1, lambda i: client.put(
+            "/supervisors/me", json={"expertise": f"Software {i}"}, headers=sup)),
+        ("POST /supervisors/{id}/projects", 1, lambda i: client.post(
+            f"{base}/projects", json=project_body(i), headers=sup)),
+        ("PUT /supervisors/{id}/projects/{pid}", 1, lambda i: client.put(
+            f"{base}/projects/{prepared('update', 50)[i % 50]}", json={"title": f"Renamed {i}"}, headers=sup)),
+        ("DELETE /supervisors/{id}/projects/{pid}", 1, lambda i: client.delete(
+            f"{base}/projects/{prepared('delete', rows_needed)[i]}", headers=sup)),
+        ("POST /supervisors/{id}/projects/batch (20)", 0.5, lambda i: client.post(
+            f"{base}/projects/batch", json={"projects": [project_body(j) for j in range(20)]}, headers=sup)),
+        ("PATCH /supervisors/{id}/projects/batch (20)", 0.5, lambda i: client.patch(
+            f"{base}/projects/batch",
+            json={"projects": [{"id": pid, "title": f"Patched {i}"} for pid in prepared("patch", 20)]},
+            headers=sup)),
+        ("DELETE /supervisors/{id}/projects/batch (20)", 0.5, lambda i: client.request(
+            "DELETE", f"{base}/projects/batch",
+            json={"ids": prepared("batch-delete", 20 * rows_needed)[i * 20:(i + 1) * 20]}, headers=sup)),
+        ("POST /supervisors/{id}/grades (20)", 1, lambda i: client.post(
+            f"{base}/grades",
+            json={"grades": [{"project_id": pid, "grade": "HD"} for pid in prepared("update", 50)[:20]]},
+            headers=sup)),
+        ("POST /supervisors/{id}/grades/csv (20)", 1, lambda i: client.post(
+            f"{base}/grades/csv",
+            content="project_id,grade\n" + "".join(f"{pid},D\n" for pid in prepared("update", 50)[:20]),
+            headers={**sup, "Content-Type": "text/csv"})),
+        ("GET /supervisors/{id}/grades/export", 1, lambda i: client.get(f"{base}/grades/export", headers=sup)),
+    ]
+
+
+def measure(request, iterations: int):
+    timings, errors = [], 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        response = request(i + 1)  # 0 is the warm-up request
+        timings.append((time.perf_counter() - t) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    timings.sort()
+
+    def pct(p):
+        return timings[min(len(timings) - 1, int(round(p / 100 * (len(timings) - 1))))]
+
+    return {
+        "n": iterations,
+        "p50_ms": round(pct(50), 3),
+        "p90_ms": round(pct(90), 3),
+        "p99_ms": round(pct(99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "rps": round(iterations / elapsed, 1),
+        "errors": errors,
+    }
+
+
+def run_scale(scale: int, iterations: int, db_file):
+    path = None
+    if db_file:
+        path = os.path.join(tempfile.mkdtemp(), f"bench-{scale}.sqlite3") if db_file == "tmp" else db_file
+        if os.path.exists(path):
+            os.remove(path)
+    engine = use_database(path)
+    t = time.perf_counter()
+    supervisors, students = seed(engine, scale)
+    print(f"\n== scale {scale}: {supervisors} supervisors, {students} students, {scale} projects "
+          f"(seeded in {time.perf_counter() - t:.1f}s)")
+
+    import main  # imported after the engine swap so the app never sees the default URL
+    client = TestClient(main.create_app())
+    results = {}
+    for name, factor, request in build_cases(client, supervisor_id=1, iterations=iterations):
+        n = max(5, int(iterations * factor))
+        # the app prints on every token decode; keep that work but not the noise
+        with contextlib.redirect_stdout(io.StringIO()):
+            request(0)  # warm up (and prepare any rows the case needs)
+            results[name] = measure(request, n)
+        r = results[name]
+        flag = f"  {r['errors']} errors" if r["errors"] else ""
+        print(f"  {name:45s} p50 {r['p50_ms']:8.2f}ms  p90 {r['p90_ms']:8.2f}ms  "
+              f"p99 {r['p99_ms']:8.2f}ms  {r['rps']:8.1f} req/s{flag}")
+    engine.dispose()
+    return results
+
+
+def compare(results, baseline, tolerance: float):
+    regressions = []
+    for scale, routes in results.items():
+        for name, r in routes.items():
+            before = baseline.get("results", {}).get(scale, {}).get(name)
+            if before and r["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+                regressions.append(f"{name} @ {scale}: p50 {before['p50_ms']:.2f}ms -> {r['p50_ms']:.2f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--iterations", type=int, default=200, help="requests per route (auth routes run a tenth)")
+    parser.add_argument("--db-file", nargs="?", const="tmp", default=None,
+                        help="use a SQLite file instead of memory (optionally at this path)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before failing")
+    args = parser.parse_args()
+
+    results = {str(scale): run_scale(scale, args.iterations, args.db_file) for scale in args.scales}
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.node(),
+                "iterations": args.iterations,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nFAIL: regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
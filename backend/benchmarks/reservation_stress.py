@@ -0,0 +1,149 @@
+"""Concurrent stress test for the quota reservation path.
+
+Simulates the "selection opens" burst: many groups race for a handful of
+popular projects at once. Runs against a SQLite file so it needs no server:
+
+    python -m benchmarks.reservation_stress --groups 600 --threads 32
+
+Exits non-zero if any supervisor or project ends up oversubscribed, or if the
+counters drift from the actual claims.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.capacity import SupervisorCapacity, ProjectCapacity
+from models.group import StudentGroup
+from models.project import Project
+from models.supervisor import Supervisor
+from services import reservation
+from models.capacity import DEFAULT_PROJECT_CAPACITY
+
+
+def seed(Session, supervisors, projects_per_supervisor, quota, groups):
+    db = Session()
+    for s in range(1, supervisors + 1):
+        db.add(Supervisor(id=s, email=f"sup{s}@uts.edu.au", quota=quota, user_group_identifier="supervisor"))
+        for p in range(projects_per_supervisor):
+            db.add(Project(id=s * 1000 + p, title=f"project {s}-{p}", supervisor_id=s))
+    for g in range(1, groups + 1):
+        db.add(StudentGroup(id=g, group_name=f"group {g}"))
+    db.commit()
+    db.close()
+
+
+def run(args):
+    path = os.path.join(tempfile.mkdtemp(), "reservation.db")
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": args.lock_timeout},
+        pool_size=args.threads,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(Session, args.supervisors, args.projects, args.quota, args.groups)
+
+    project_ids = [s * 1000 + p for s in range(1, args.supervisors + 1) for p in range(args.projects)]
+    # skew demand: most groups want the first few projects
+    weights = [1.0 / (rank + 1) for rank in range(len(project_ids))]
+    outcomes = Counter()
+    lock = threading.Lock()
+    next_group = iter(range(1, args.groups + 1))
+    latencies = []
+
+    def worker():
+        db = Session()
+        rng = random.Random()
+        while True:
+            with lock:
+                group_id = next(next_group, None)
+            if group_id is None:
+                break
+            for project_id in rng.choices(project_ids, weights=weights, k=args.attempts):
+                started = time.perf_counter()
+                try:
+                    reservation.reserve(db, group_id, project_id)
+                    result = "reserved"
+                except HTTPException as e:
+                    result = str(e.status_code)
+                with lock:
+                    outcomes[result] += 1
+                    latencies.append(time.perf_counter() - started)
+                if result == "reserved":
+                    break
+        db.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    failures = verify(Session)
+    latencies.sort()
+    total = sum(outcomes.values())
+    print(f"requests: {total} in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    print(f"outcomes: {dict(outcomes)}")
+    print(f"latency p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK: no oversubscription" if not failures else "FAILED")
+    return 1 if failures else 0
+
+
+def verify(Session):
+    db = Session()
+    failures = []
+    per_supervisor = dict(db.execute(
+        select(StudentGroup.supervisor_id, func.count()).where(StudentGroup.project_id.isnot(None))
+        .group_by(StudentGroup.supervisor_id)
+    ).all())
+    per_project = dict(db.execute(
+        select(StudentGroup.project_id, func.count()).where(StudentGroup.project_id.isnot(None))
+        .group_by(StudentGroup.project_id)
+    ).all())
+
+    for supervisor in db.query(Supervisor).all():
+        claimed = per_supervisor.get(supervisor.id, 0)
+        if claimed > supervisor.quota:
+            failures.append(f"supervisor {supervisor.id} has {claimed} groups, quota {supervisor.quota}")
+        counter = db.get(SupervisorCapacity, supervisor.id)
+        if counter is not None and counter.remaining != supervisor.quota - claimed:
+            failures.append(f"supervisor {supervisor.id} counter {counter.remaining} != {supervisor.quota - claimed}")
+    for project_id, claimed in per_project.items():
+        if claimed > DEFAULT_PROJECT_CAPACITY:
+            failures.append(f"project {project_id} has {claimed} groups")
+        counter = db.get(ProjectCapacity, project_id)
+        if counter.remaining != DEFAULT_PROJECT_CAPACITY - claimed:
+            failures.append(f"project {project_id} counter {counter.remaining} drifted")
+    db.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--supervisors", type=int, default=10)
+    parser.add_argument("--projects", type=int, default=5, help="projects per supervisor")
+    parser.add_argument("--quota", type=int, default=3)
+    parser.add_argument("--groups", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=5, help="claims a group tries before giving up")
+    parser.add_argument("--lock-timeout", type=float, default=0.05)
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Cold-start benchmark: how long a fresh worker takes to import and build each app.
+
+Every sample is a new interpreter, so nothing is shared between runs:
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --max-ms 1500   # fail if a target gets slower
+
+Runs with FAST_START=1 so the numbers measure imports and app construction,
+not a database round-trip.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "main": "import time; t = time.perf_counter(); import main; main.create_app(); print(time.perf_counter() - t)",
+    "ai": "import time; t = time.perf_counter(); import ai; print(time.perf_counter() - t)",
+}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample(code: str, env: dict) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(module: str, env: dict, limit: int):
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.strip()))
+    # top-level packages only, nested modules are already counted in them
+    top = [r for r in rows if not r[1].startswith(" ") and "." not in r[1] and r[1] != module]
+    return sorted(top, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--targets", nargs="*", default=list(TARGETS))
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if a median exceeds this")
+    parser.add_argument("--top", type=int, default=5, help="show the N heaviest imports")
+    args = parser.parse_args()
+
+    env = {**os.environ, "FAST_START": "1", "SQL_ECHO": "0", "PYTHONDONTWRITEBYTECODE": "1"}
+    failed = False
+    for target in args.targets:
+        times = [sample(TARGETS[target], env) * 1000 for _ in range(args.runs)]
+        median = statistics.median(times)
+        print(f"{target}: median {median:.0f}ms  min {min(times):.0f}ms  max {max(times):.0f}ms  ({args.runs} runs)")
+        for cumulative, name in heaviest_imports(target, env, args.top):
+            print(f"    {cumulative / 1000:8.1f}ms  {name}")
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"FAIL: {target} cold start {median:.0f}ms > {args.max_ms:.0f}ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
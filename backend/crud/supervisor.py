@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
+from typing import Dict, List
+from sqlalchemy import select, insert, update, delete, case
+from sqlalchemy.orm import Session, selectinload
 from models.supervisor import Supervisor
 from models.project import Project
-from schemas.supervisor import ProjectCreate, SupervisorUpdate, ProjectUpdate
+from schemas.supervisor import ProjectCreate, SupervisorUpdate, ProjectUpdate, ProjectPatch
+from services.reservation import release_projects, sync_supervisor_capacity
+from services.allocation import plan_project_removal, plan_quota_change, write_and_repair
+from services.project_features import touches_source, refresh_features, refresh_features_for_ids
+from services.availability import touches_schedule, invalidate_availability
+from services.recommendations import mark_stale
 
 
 def create_project_for_supervisor(db: Session, supervisor_id: int, project_data: ProjectCreate):
@@ -19,47 +26,216 @@ def create_project_for_supervisor(db: Session, supervisor_id: int, project_data:
         supervisor_id=supervisor.id
     )
     db.add(new_project)
+    db.flush()
+    refresh_features(db, [new_project], force=True)
     db.commit()
+    invalidate_availability()
     db.refresh(new_project)
     return new_project
 
-def update_project_for_supervisor(db: Session, supervisor_id: int, project_id: int, update_data: ProjectUpdate):
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.supervisor_id == supervisor_id
-    ).first()
-
-    if not project:
+def get_supervisor_dashboard(db: Session, supervisor_id: int):
+    # three queries however many projects/groups: the supervisor, then one
+    # SELECT ... IN for each collection
+    supervisor = db.execute(
+        select(Supervisor)
+        .where(Supervisor.id == supervisor_id)
+        .options(selectinload(Supervisor.projects), selectinload(Supervisor.student_groups))
+    ).scalar_one_or_none()
+    if not supervisor:
         return None
 
-    for field, value in update_data.dict(exclude_unset=True).items():
-        setattr(project, field, value)
+    groups, groups_per_project = [], {}
+    for group in supervisor.student_groups:
+        groups.append({"id": group.id, "group_name": group.group_name, "project_id": group.project_id})
+        if group.project_id is not None:
+            groups_per_project[group.project_id] = groups_per_project.get(group.project_id, 0) + 1
+
+    projects = [
+        {
+            "id": p.id,
+            "title": p.title,
+            "research_field": p.research_field,
+            "group_or_individual": p.group_or_individual,
+            "project_start_time": p.project_start_time,
+            "project_end_time": p.project_end_time,
+            "project_grade": p.project_grade,
+            "group_count": groups_per_project.get(p.id, 0),
+        }
+        for p in supervisor.projects
+    ]
+
+    # same notion of a claimed seat as the reservation counters
+    assigned = sum(groups_per_project.values())
+    quota = supervisor.quota or 0
+    return {
+        "profile": {
+            "id": supervisor.id,
+            "email": supervisor.email,
+            "first_name": supervisor.first_name,
+            "last_name": supervisor.last_name,
+            "user_group_identifier": supervisor.user_group_identifier,
+            "faculty": supervisor.faculty,
+            "expertise": supervisor.expertise,
+            "quota": supervisor.quota,
+        },
+        "projects": projects,
+        "groups": groups,
+        "project_count": len(projects),
+        "group_count": len(groups),
+        "assigned_group_count": assigned,
+        "quota": quota,
+        "remaining_quota": max(quota - assigned, 0),
+    }
+
+def _update_returning(db: Session, model, where, values):
+    """UPDATE ... WHERE ... and hand back the row, in one round-trip when the
+    dialect has RETURNING and with a follow-up SELECT otherwise (MySQL)."""
+    if not values:
+        return db.execute(select(model).where(*where)).scalar_one_or_none()
+
+    stmt = update(model).where(*where).values(**values).execution_options(synchronize_session=False)
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(model)).scalar_one_or_none()
+    if db.execute(stmt).rowcount != 1:
+        return None
+    return db.execute(select(model).where(*where)).scalar_one_or_none()
 
+def _commit_detached(db: Session, obj):
+    # detach before committing so the loaded row is not expired and
+    # re-SELECTed when the response is serialized
+    if obj is None:
+        db.rollback()
+        return None
+    db.expunge(obj)
     db.commit()
-    db.refresh(project)
+    return obj
+
+def update_project_for_supervisor(db: Session, supervisor_id: int, project_id: int, update_data: ProjectUpdate):
+    values = update_data.dict(exclude_unset=True)
+    project = _update_returning(
+        db, Project,
+        (Project.id == project_id, Project.supervisor_id == supervisor_id),
+        values,
+    )
+    if project is not None and touches_source(values):
+        refresh_features(db, [project], force=True)
+        mark_stale(db, [project_id])
+    project = _commit_detached(db, project)
+    if project is not None and touches_schedule(values):
+        invalidate_availability()
     return project
 
 def delete_project_for_supervisor(db: Session, supervisor_id: int, project_id: int):
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.supervisor_id == supervisor_id
-    ).first()
+    def write():
+        release_projects(db, [project_id], supervisor_id)
+        mark_stale(db, [project_id])
+        deleted = db.execute(
+            delete(Project).where(Project.id == project_id, Project.supervisor_id == supervisor_id),
+            execution_options={"synchronize_session": False},
+        )
+        # not ours (or gone): undo the claim release along with it
+        return True if deleted.rowcount == 1 else None
 
-    if not project:
-        return False 
-
-    db.delete(project)
-    db.commit()
+    # the displaced groups (and whoever the repair path moves) are rehoused
+    # in the same transaction as the delete
+    deleted, _ = write_and_repair(db, write, lambda: plan_project_removal(db, [project_id]))
+    if not deleted:
+        return False
+    invalidate_availability()
     return True
 
 def update_supervisor_info(db: Session, supervisor_id: int, data: SupervisorUpdate):
-    supervisor = db.query(Supervisor).filter(Supervisor.id == supervisor_id).first()
-    if not supervisor:
+    changes = data.dict(exclude_unset=True)
+    if "quota" not in changes:
+        supervisor = _update_returning(db, Supervisor, (Supervisor.id == supervisor_id,), changes)
+        return _commit_detached(db, supervisor)
+
+    def write():
+        supervisor = _update_returning(db, Supervisor, (Supervisor.id == supervisor_id,), changes)
+        if supervisor is not None:
+            sync_supervisor_capacity(db, supervisor_id)
+            db.expunge(supervisor)
+        return supervisor
+
+    # the groups a lower quota evicts (or a higher one admits) move in the
+    # same transaction as the quota itself
+    supervisor, _ = write_and_repair(db, write, lambda: plan_quota_change(db, supervisor_id, changes["quota"]))
+    return supervisor
+
+def _owned_project_ids(db: Session, supervisor_id: int, project_ids: List[int]):
+    return set(db.execute(
+        select(Project.id).where(Project.id.in_(project_ids), Project.supervisor_id == supervisor_id)
+    ).scalars())
+
+def create_projects_for_supervisor(db: Session, supervisor_id: int, projects: List[ProjectCreate]):
+    if not db.execute(select(Supervisor.id).where(Supervisor.id == supervisor_id)).first():
         return None
 
-    for key, value in data.dict(exclude_unset=True).items():
-        setattr(supervisor, key, value)
+    rows = [{**p.dict(), "supervisor_id": supervisor_id} for p in projects]
+    if db.get_bind().dialect.insert_executemany_returning:
+        # one batched INSERT ... RETURNING id, ids come back in input order
+        ids = list(db.scalars(
+            insert(Project).returning(Project.id, sort_by_parameter_order=True), rows
+        ))
+    else:
+        # no RETURNING (MySQL): the unit of work still batches the inserts and
+        # picks the ids up from the cursor, without a refresh per row
+        new_projects = [Project(**row) for row in rows]
+        db.add_all(new_projects)
+        db.flush()
+        ids = [p.id for p in new_projects]
 
+    refresh_features_for_ids(db, ids, force=True)
     db.commit()
-    db.refresh(supervisor)
-    return supervisor
+    invalidate_availability()
+    return ids
+
+def update_projects_for_supervisor(db: Session, supervisor_id: int, patches: List[ProjectPatch]):
+    """Returns (updated ids, ids not found or not owned); nothing is written if any are missing."""
+    ids = [p.id for p in patches]
+    missing = sorted(set(ids) - _owned_project_ids(db, supervisor_id, ids))
+    if missing:
+        return None, missing
+
+    rows = [p.dict(exclude_unset=True) for p in patches]
+    rows = [row for row in rows if len(row) > 1]
+    if rows:
+        # ORM bulk UPDATE by primary key: one executemany per distinct set of columns
+        db.execute(update(Project), rows)
+        reanalyze = [row["id"] for row in rows if touches_source(row)]
+        if reanalyze:
+            refresh_features_for_ids(db, reanalyze)
+            mark_stale(db, reanalyze)
+    db.commit()
+    if any(touches_schedule(row) for row in rows):
+        invalidate_availability()
+    return ids, []
+
+def delete_projects_for_supervisor(db: Session, supervisor_id: int, project_ids: List[int]):
+    """Returns (deleted ids, ids not found or not owned); nothing is deleted if any are missing."""
+    missing = sorted(set(project_ids) - _owned_project_ids(db, supervisor_id, project_ids))
+    if missing:
+        return None, missing
+
+    def write():
+        release_projects(db, project_ids, supervisor_id)
+        mark_stale(db, project_ids)
+        db.execute(
+            delete(Project).where(Project.id.in_(project_ids), Project.supervisor_id == supervisor_id),
+            execution_options={"synchronize_session": False},
+        )
+        return True
+
+    write_and_repair(db, write, lambda: plan_project_removal(db, project_ids))
+    invalidate_availability()
+    return project_ids, []
+
+def set_project_grades(db: Session, supervisor_id: int, grades: Dict[int, str]):
+    """One UPDATE ... SET project_grade = CASE id ... for the whole batch (no commit)."""
+    result = db.execute(
+        update(Project)
+        .where(Project.id.in_(list(grades)), Project.supervisor_id == supervisor_id)
+        .values(project_grade=case(grades, value=Project.id))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
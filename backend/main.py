@@ -1,14 +1,45 @@
 # main.py
 from fastapi import FastAPI
-from database import engine, Base
+from config import FAST_START
+from database import engine, Base, install_read_routing
 from routers import supervisor
 from routers import user 
+from routers import group
+from routers import project
+from routers import student
+from utils.profiling import install_profiling
+from utils.query_stats import install_query_stats
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+def create_app() -> FastAPI:
+    # schema creation at startup is a dev convenience; with FAST_START the
+    # schema is owned by Alembic and startup never talks to the database
+    if not FAST_START:
+        Base.metadata.create_all(bind=engine)
 
-app.include_router(user.router, prefix="/api", tags=["user"])
-app.include_router(supervisor.router)
-# The supervisor function is completely decoupled, with a clear structure and high scalability
+    app = FastAPI()
+    install_profiling(app)
+    install_query_stats(app)
+    install_read_routing(app)
 
+    app.include_router(user.router, prefix="/api", tags=["user"])
+    app.include_router(supervisor.router)
+    app.include_router(group.router)
+    app.include_router(project.router)
+    app.include_router(student.router)
+    # The supervisor function is completely decoupled, with a clear structure and high scalability
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    # `uvicorn main:app` keeps working, built on first access; importing main
+    # for `uvicorn --factory main:create_app` no longer builds a second app
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database import Base
+
+# a project hosts a single group unless told otherwise
+DEFAULT_PROJECT_CAPACITY = 1
+
+
+# Denormalized remaining-capacity counters. They are only ever changed with
+# conditional UPDATEs (remaining = remaining - 1 WHERE remaining > 0), so a
+# burst of claims cannot oversubscribe a supervisor or a project.
+class SupervisorCapacity(Base):
+    __tablename__ = "supervisor_capacity"
+
+    supervisor_id = Column(Integer, ForeignKey("supervisors.id", ondelete="CASCADE"), primary_key=True)
+    remaining = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class ProjectCapacity(Base):
+    __tablename__ = "project_capacity"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    supervisor_id = Column(Integer, ForeignKey("supervisors.id", ondelete="CASCADE"), index=True)
+    remaining = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=0)
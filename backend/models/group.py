@@ -8,7 +8,13 @@ class StudentGroup(Base):
     id = Column(Integer, primary_key=True, index=True)
     group_name = Column(String(100), unique=True)
     supervisor_id = Column(Integer, ForeignKey("supervisors.id"))
-    # group should have a project ID
-    # group should have a project ID
-    # group should have a project ID
-    supervisor = relationship("Supervisor", back_populates="student_groups")
\ No newline at end of file
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True, index=True)
+    supervisor = relationship("Supervisor", back_populates="student_groups")
+
+# A group's ranked project choices (rank 0 first), the input to the allocator.
+class GroupPreference(Base):
+    __tablename__ = "group_preferences"
+
+    group_id = Column(Integer, ForeignKey("student_groups.id", ondelete="CASCADE"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)
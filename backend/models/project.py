@@ -1,11 +1,17 @@
 # models/project.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, literal_column
 from sqlalchemy.orm import relationship
 from database import Base
+from utils.sql_time import utcnow
 
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # availability windows: range on one end, filter on the other from the index
+        Index("ix_projects_start_end", "project_start_time", "project_end_time"),
+        Index("ix_projects_end_start", "project_end_time", "project_start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100))
@@ -15,6 +21,8 @@ class Project(Base):
     project_start_time = Column(DateTime)
     project_end_time = Column(DateTime)
     project_grade = Column(String(10), default="")
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
+    updated_at = Column(DateTime, nullable=False, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     supervisor_id = Column(Integer, ForeignKey("supervisors.id"))
     supervisor = relationship("Supervisor", back_populates="projects")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from database import Base
+from utils.sql_time import utcnow
+
+
+# Structured view of a project's free text, computed once when the project is
+# written so ranking can match against it without re-reading descriptions.
+class ProjectFeature(Base):
+    __tablename__ = "project_features"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    fields = Column(JSON, nullable=False)
+    keywords = Column(JSON, nullable=False)
+    features = Column(JSON, nullable=False)
+    source_hash = Column(String(40), nullable=False)
+    analyzed_at = Column(DateTime, nullable=False, server_default=utcnow(), onupdate=utcnow())
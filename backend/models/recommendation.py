@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from database import Base
+from utils.sql_time import utcnow
+
+
+# A student's latest requirement text, its analysis and the top-N ranked
+# projects, so the matching page is one primary-key read instead of an
+# analyze + rank round through the AI service.
+class StudentRecommendation(Base):
+    __tablename__ = "student_recommendations"
+
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    requirement_text = Column(Text, nullable=False)
+    requirement_hash = Column(String(40), nullable=False)
+    # analysis of requirement_text (fields/keywords/features), null if nothing specific was asked for
+    requirements = Column(JSON, nullable=True)
+    analyzed_hash = Column(String(40), nullable=True)
+    # [{"id", "score", "reasoning"}, ...], best first
+    results = Column(JSON, nullable=False)
+    # pending: being computed, ready, stale: a scored project changed, failed
+    status = Column(String(20), nullable=False, default="pending")
+    # bumped on every requirement change; a computation only stores its result
+    # if the version it started from is still current
+    version = Column(Integer, nullable=False, default=1)
+    computed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
+
+
+# Projects a stored recommendation scored; a write to one of them marks the
+# recommendations that include it stale.
+class RecommendationProject(Base):
+    __tablename__ = "recommendation_projects"
+
+    student_id = Column(Integer, ForeignKey("student_recommendations.student_id", ondelete="CASCADE"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -1,4 +1,7 @@
+from sqlalchemy import Column, Integer, ForeignKey
 from models.user_base import UserBase
 
 class Student(UserBase):
-    __tablename__ = "students"
\ No newline at end of file
+    __tablename__ = "students"
+
+    group_id = Column(Integer, ForeignKey("student_groups.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime, literal_column
 from database import Base
+from utils.sql_time import utcnow
 
 class UserBase(Base):
     __abstract__ = True  
@@ -10,6 +11,10 @@ class UserBase(Base):
     email = Column(String(255), unique=True, index=True)
     password = Column(String(255))
     user_group_identifier = Column(String(20))
+    # bumped on every UPDATE (ORM or set-based); drives ETag / Last-Modified.
+    # updated_at holds UTC from the database clock, whatever its time zone
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
+    updated_at = Column(DateTime, nullable=False, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     def register(self): pass
     def login(self): pass
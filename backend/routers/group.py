@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database import get_db
+from dependencies.auth import require_student, require_supervisor
+from schemas.group import ReservationRequest, ReservationOut, GroupFormationRequest, GroupFormationResult
+from schemas.group import PreferenceRequest, AllocationResult
+from services import allocation, reservation
+
+router = APIRouter(
+    prefix="/groups",
+    tags=["groups"]
+)
+
+@router.post("/{group_id}/reservation", response_model=ReservationOut)
+def reserve_project(
+    group_id: int,
+    request: ReservationRequest,
+    db: Session = Depends(get_db),
+    user = Depends(require_student)
+):
+    reservation.require_member(db, user["id"], group_id)
+    group = reservation.reserve(db, group_id, request.project_id)
+    return {
+        "group_id": group.id,
+        "project_id": group.project_id,
+        "supervisor_id": group.supervisor_id
+    }
+
+@router.delete("/{group_id}/reservation", status_code=204)
+def release_project(
+    group_id: int,
+    db: Session = Depends(get_db),
+    user = Depends(require_student)
+):
+    reservation.require_member(db, user["id"], group_id)
+    if not reservation.release(db, group_id):
+        raise HTTPException(status_code=404, detail="No reservation found")
+
+    return  # 204
+
+def _moves(changes):
+    return {"moved": [{"group_id": g, "project_id": p} for g, p in sorted(changes.items())]}
+
+@router.put("/{group_id}/preferences", response_model=AllocationResult)
+def set_preferences(
+    group_id: int,
+    request: PreferenceRequest,
+    db: Session = Depends(get_db),
+    user = Depends(require_student)
+):
+    reservation.require_member(db, user["id"], group_id)
+    # repairs the current allocation around this group instead of re-solving everyone
+    return _moves(allocation.set_preferences(db, group_id, request.project_ids))
+
+@router.post("/allocation", response_model=AllocationResult)
+def allocate_groups(
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    # places every group that has no project yet; existing claims are kept
+    return _moves(allocation.allocate_unassigned(db))
+
+@router.post("/formation", response_model=GroupFormationResult)
+def form_groups(
+    request: GroupFormationRequest,
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    # numpy/scipy stay off the startup path until someone forms groups
+    from services import group_formation
+
+    # interests are the fields/keywords/features returned by the AI analysis
+    interests = {s.student_id: s.dict(exclude={"student_id"}) for s in request.students}
+    return group_formation.form_groups(db, interests, request.group_size, request.name_prefix)
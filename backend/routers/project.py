@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from database import get_read_db
+from dependencies.auth import get_current_user
+from schemas.project import ProjectRankingInput, ProjectAvailability
+from services.availability import find_projects
+from services.project_features import ranking_input
+
+router = APIRouter(
+    prefix="/projects",
+    tags=["projects"]
+)
+
+@router.get("/ranking-input", response_model=List[ProjectRankingInput])
+def get_ranking_input(
+    db: Session = Depends(get_read_db),
+    user = Depends(get_current_user)
+):
+    # projects with their precomputed features in one query, ready for /rank-projects
+    return ranking_input(db)
+
+def _availability(db: Session, mode: str, start: datetime, end: datetime, limit: int, offset: int):
+    total, projects = find_projects(db, mode, start, end, limit, offset)
+    return {"total": total, "projects": projects}
+
+@router.get("/availability/overlapping", response_model=ProjectAvailability)
+def get_overlapping_projects(
+    start: datetime,
+    end: datetime,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user = Depends(get_current_user)
+):
+    # projects running at any point between start and end, e.g. during a trimester
+    return _availability(db, "overlap", start, end, limit, offset)
+
+@router.get("/availability/within", response_model=ProjectAvailability)
+def get_projects_within(
+    start: datetime,
+    end: datetime,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user = Depends(get_current_user)
+):
+    # projects that both start and finish between start and end
+    return _availability(db, "within", start, end, limit, offset)
+
+@router.get("/availability/active", response_model=ProjectAvailability)
+def get_active_projects(
+    at: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user = Depends(get_current_user)
+):
+    # projects running at the given moment (now by default)
+    at = at or datetime.now(timezone.utc)
+    return _availability(db, "overlap", at, at, limit, offset)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database import get_db, get_read_db
+from dependencies.auth import require_student
+from schemas.student import RecommendationRequest, StudentRecommendationOut
+from services import recommendations
+
+router = APIRouter(
+    prefix="/students",
+    tags=["students"]
+)
+
+@router.put("/me/recommendations", response_model=StudentRecommendationOut, status_code=202)
+def submit_requirements(
+    request: RecommendationRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    user = Depends(require_student)
+):
+    # recomputed in the background only if the text changed; poll the GET for the result
+    return recommendations.submit_requirements(db, user["id"], request.requirements, background_tasks)
+
+@router.get("/me/recommendations", response_model=StudentRecommendationOut)
+def get_my_recommendations(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_read_db),
+    user = Depends(require_student)
+):
+    recommendation = recommendations.get_recommendation(db, user["id"])
+    if not recommendation:
+        raise HTTPException(status_code=404, detail="No requirements submitted yet")
+    # serve what is stored and refresh it after the response if outdated
+    if recommendations.needs_refresh(recommendation):
+        recommendations.schedule_refresh(background_tasks, recommendation)
+    return recommendation
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_read_db
 from crud import supervisor as supervisor_crud
 from crud.supervisor import update_project_for_supervisor, delete_project_for_supervisor, update_supervisor_info
 from models.supervisor import Supervisor
 from schemas.supervisor import ProjectCreate, ProjectOut, ProjectUpdate, SupervisorOut, SupervisorUpdate
+from schemas.supervisor import ProjectBatchCreate, ProjectBatchUpdate, ProjectBatchDelete, ProjectBatchResult
+from schemas.supervisor import GradeBatch, GradeIngestResult, SupervisorDashboard
+from services import grading
 from dependencies.auth import require_supervisor
 from models.project import Project
 from typing import List
 from schemas.user import UserResponse
+from utils.http_cache import make_etag, conditional_response
 
 router = APIRouter(
     prefix="/supervisors",
@@ -27,6 +33,53 @@ def create_project(
         raise HTTPException(status_code=404, detail="Supervisor not found")
     return result
 
+# batch routes are declared before /{supervisor_id}/projects/{project_id} so
+# that "batch" is not parsed as a project id
+@router.post("/{supervisor_id}/projects/batch", response_model=ProjectBatchResult)
+def create_projects(
+    supervisor_id: int,
+    batch: ProjectBatchCreate,
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only create your own projects")
+
+    ids = supervisor_crud.create_projects_for_supervisor(db, supervisor_id, batch.projects)
+    if ids is None:
+        raise HTTPException(status_code=404, detail="Supervisor not found")
+    return {"ids": ids}
+
+@router.patch("/{supervisor_id}/projects/batch", response_model=ProjectBatchResult)
+def update_projects(
+    supervisor_id: int,
+    batch: ProjectBatchUpdate,
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only update your own projects")
+
+    ids, missing = supervisor_crud.update_projects_for_supervisor(db, supervisor_id, batch.projects)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Projects not found or access denied: {missing}")
+    return {"ids": ids}
+
+@router.delete("/{supervisor_id}/projects/batch", response_model=ProjectBatchResult)
+def delete_projects(
+    supervisor_id: int,
+    batch: ProjectBatchDelete,
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only delete your own projects")
+
+    ids, missing = supervisor_crud.delete_projects_for_supervisor(db, supervisor_id, batch.ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Projects not found: {missing}")
+    return {"ids": ids}
+
 @router.put("/{supervisor_id}/projects/{project_id}", response_model=ProjectOut)
 def update_project(
     supervisor_id: int,
@@ -46,11 +99,34 @@ def update_project(
 
 @router.get("/me/projects", response_model=List[ProjectOut])
 def get_my_projects(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     user=Depends(require_supervisor)
 ):
+    # one aggregate row instead of the list: count and max(id) catch
+    # deletes/inserts, sum(version) catches edits
+    stamp = db.execute(
+        select(func.count(Project.id), func.max(Project.id), func.coalesce(func.sum(Project.version), 0))
+        .where(Project.supervisor_id == user["id"])
+    ).one()
+    etag = make_etag("projects", user["id"], *stamp)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
     return db.query(Project).filter(Project.supervisor_id == user["id"]).all()
 
+@router.get("/me/dashboard", response_model=SupervisorDashboard)
+def get_my_dashboard(
+    db: Session = Depends(get_read_db),
+    user=Depends(require_supervisor)
+):
+    dashboard = supervisor_crud.get_supervisor_dashboard(db, user["id"])
+    if not dashboard:
+        raise HTTPException(status_code=404, detail="Supervisor not found")
+    return dashboard
+
 @router.delete("/{supervisor_id}/projects/{project_id}", status_code=204)
 def delete_project(
     supervisor_id: int,
@@ -69,6 +145,52 @@ def delete_project(
     return  # 204 
 
 
+@router.post("/{supervisor_id}/grades", response_model=GradeIngestResult)
+def upload_grades(
+    supervisor_id: int,
+    batch: GradeBatch,
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only grade your own projects")
+
+    rows = [(i, g.project_id, g.grade) for i, g in enumerate(batch.grades, start=1)]
+    return grading.ingest_grades(db, supervisor_id, rows)
+
+@router.post("/{supervisor_id}/grades/csv", response_model=GradeIngestResult)
+def upload_grades_csv(
+    supervisor_id: int,
+    csv_text: str = Body(..., media_type="text/csv"),
+    db: Session = Depends(get_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only grade your own projects")
+
+    try:
+        rows = grading.parse_csv(csv_text)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return grading.ingest_grades(db, supervisor_id, rows)
+
+@router.get("/{supervisor_id}/grades/export")
+def export_grades(
+    supervisor_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_read_db),
+    user = Depends(require_supervisor)
+):
+    if user["id"] != supervisor_id:
+        raise HTTPException(status_code=403, detail="You can only export your own grades")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        grading.export_grades(db, supervisor_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=grades-{supervisor_id}.{format}"}
+    )
+
 @router.put("/me", response_model=UserResponse)  
 def update_my_info(
     update_data: SupervisorUpdate,
@@ -89,9 +211,22 @@ def update_my_info(
 
 @router.get("/me", response_model=SupervisorOut)
 def get_my_profile(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     user = Depends(require_supervisor)
 ):
+    stamp = db.execute(
+        select(Supervisor.version, Supervisor.updated_at).where(Supervisor.id == user["id"])
+    ).first()
+    if not stamp:
+        raise HTTPException(status_code=404, detail="Supervisor not found")
+
+    etag = make_etag("supervisor", user["id"], stamp.version)
+    not_modified = conditional_response(request, response, etag, stamp.updated_at)
+    if not_modified:
+        return not_modified
+
     return db.query(Supervisor).filter(Supervisor.id == user["id"]).first()
 # @router.get("/me/project", response_model=ProjectOut)
 # def get_my_project(
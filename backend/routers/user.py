@@ -1,13 +1,14 @@
 # routers/user.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from schemas.user import UserCreate
 from crud.user import create_user
-from database import get_db
+from database import get_db, get_read_db
 from schemas.user import LoginRequest, RefreshTokenRequest, UserResponse
 from services.auth import login_user, refresh_access_token 
 from database import get_db    
 from dependencies.auth import get_current_user      
+from utils.http_cache import make_etag, conditional_response
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     return create_user(db, user)
 
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+def login(request: LoginRequest, db: Session = Depends(get_read_db)):
     return login_user(db, request.email, request.password)
 
 @router.post("/refresh")
@@ -27,5 +28,10 @@ def refresh_token(request: RefreshTokenRequest):
     return {"access_token": new_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_me(user = Depends(get_current_user)):
+def get_me(request: Request, response: Response, user = Depends(get_current_user)):
+    # the payload comes straight from the token claims, so they are the validator
+    etag = make_etag("me", user["id"], user["email"], user["role"])
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
     return user
\ No newline at end of file
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+
+class ReservationRequest(BaseModel):
+    project_id: int
+
+class ReservationOut(BaseModel):
+    group_id: int
+    project_id: Optional[int]
+    supervisor_id: Optional[int]
+
+class PreferenceRequest(BaseModel):
+    # most preferred first
+    project_ids: List[int] = Field(..., max_length=20)
+
+    @field_validator("project_ids")
+    @classmethod
+    def unique_projects(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("Each project may only be listed once")
+        return v
+
+class AllocationMove(BaseModel):
+    group_id: int
+    project_id: Optional[int]
+
+class AllocationResult(BaseModel):
+    # groups whose project changed, with the new project (null: unassigned)
+    moved: List[AllocationMove]
+
+class StudentInterests(BaseModel):
+    student_id: int
+    fields: List[str] = []
+    keywords: List[str] = []
+    features: List[str] = []
+
+class GroupFormationRequest(BaseModel):
+    students: List[StudentInterests] = Field(..., min_length=2, max_length=20000)
+    group_size: int = Field(4, ge=2, le=10)
+    name_prefix: Optional[str] = Field(None, max_length=80)
+
+    @field_validator("students")
+    @classmethod
+    def unique_students(cls, v):
+        if len({s.student_id for s in v}) != len(v):
+            raise ValueError("Each student may only appear once")
+        return v
+
+class FormedGroup(BaseModel):
+    id: int
+    group_name: str
+    student_ids: List[int]
+
+class GroupFormationResult(BaseModel):
+    groups: List[FormedGroup]
+    cohesion: float
@@ -0,0 +1,28 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ProjectRankingInput(BaseModel):
+    # same shape as ai.ProjectInput, so it can be posted to /rank-projects as-is
+    id: int
+    name: str
+    description: Optional[str] = None
+    field: Optional[str] = None
+    fields: Optional[List[str]] = None
+    keywords: Optional[List[str]] = None
+    features: Optional[List[str]] = None
+
+class ProjectWindow(BaseModel):
+    id: int
+    title: Optional[str] = None
+    research_field: Optional[str] = None
+    supervisor_id: Optional[int] = None
+    project_start_time: Optional[datetime] = None
+    project_end_time: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class ProjectAvailability(BaseModel):
+    total: int
+    projects: List[ProjectWindow]
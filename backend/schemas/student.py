@@ -1,6 +1,33 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
 from schemas.user import UserCommon
-from typing import Optional
+from typing import List, Optional
 
 class StudentOut(UserCommon):
     group_id: Optional[int]  
-    degree_type: Optional[str]
\ No newline at end of file
+    degree_type: Optional[str]
+
+class RecommendationRequest(BaseModel):
+    requirements: str = Field(..., min_length=1, max_length=2000)
+
+class AnalyzedRequirements(BaseModel):
+    fields: List[str] = []
+    keywords: List[str] = []
+    features: List[str] = []
+
+class RecommendedProject(BaseModel):
+    id: int
+    score: Optional[float] = None
+    reasoning: Optional[str] = None
+
+class StudentRecommendationOut(BaseModel):
+    # pending while being (re)computed, ready, stale or failed; results are the
+    # latest stored ones in every state
+    status: str
+    requirement_text: str
+    requirements: Optional[AnalyzedRequirements] = None
+    results: List[RecommendedProject]
+    computed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
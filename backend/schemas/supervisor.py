@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from schemas.user import UserCommon
 
 class ProjectCreate(BaseModel):
@@ -38,4 +38,79 @@ class SupervisorUpdate(BaseModel):
     email: Optional[str] = None
     expertise: Optional[str] = None
     faculty: Optional[str] = None
-    quota: Optional[int] = None
\ No newline at end of file
+    quota: Optional[int] = None
+
+# supervisors usually publish a term's worth of projects at once
+MAX_BATCH_SIZE = 100
+
+class ProjectPatch(ProjectUpdate):
+    id: int
+
+class ProjectBatchCreate(BaseModel):
+    projects: List[ProjectCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ProjectBatchUpdate(BaseModel):
+    projects: List[ProjectPatch] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+    @field_validator("projects")
+    @classmethod
+    def unique_ids(cls, v):
+        if len({p.id for p in v}) != len(v):
+            raise ValueError("Each project may only appear once in a batch")
+        return v
+
+class ProjectBatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+    @field_validator("ids")
+    @classmethod
+    def unique_ids(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("Each project may only appear once in a batch")
+        return v
+
+class ProjectBatchResult(BaseModel):
+    ids: List[int]
+
+
+class GradeEntry(BaseModel):
+    project_id: int
+    grade: str
+
+class GradeBatch(BaseModel):
+    grades: List[GradeEntry] = Field(..., min_length=1)
+
+class GradeRowError(BaseModel):
+    row: int
+    project_id: Optional[int] = None
+    detail: str
+
+class GradeIngestResult(BaseModel):
+    updated: int
+    errors: List[GradeRowError]
+
+
+class DashboardProject(BaseModel):
+    id: int
+    title: Optional[str]
+    research_field: Optional[str]
+    group_or_individual: Optional[str]
+    project_start_time: Optional[datetime]
+    project_end_time: Optional[datetime]
+    project_grade: Optional[str]
+    group_count: int
+
+class DashboardGroup(BaseModel):
+    id: int
+    group_name: Optional[str]
+    project_id: Optional[int]
+
+class SupervisorDashboard(BaseModel):
+    profile: SupervisorOut
+    projects: List[DashboardProject]
+    groups: List[DashboardGroup]
+    project_count: int
+    group_count: int
+    assigned_group_count: int
+    quota: int
+    remaining_quota: int
@@ -0,0 +1,60 @@
+"""Analyze existing projects and fill project_features.
+
+Projects are split into id ranges and processed in parallel, each batch in its
+own session and transaction. Unchanged projects are skipped unless --force:
+
+    python -m scripts.backfill_project_features --workers 8 --batch-size 500
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models.project import Project
+from models.supervisor import Supervisor  # noqa: F401  (registers the relationship target)
+from services.project_features import refresh_features_for_ids
+
+
+def id_batches(batch_size: int):
+    db = SessionLocal()
+    try:
+        ids = db.execute(select(Project.id).order_by(Project.id)).scalars().all()
+    finally:
+        db.close()
+    for start in range(0, len(ids), batch_size):
+        yield ids[start:start + batch_size]
+
+
+def process(batch, force: bool) -> int:
+    db = SessionLocal()
+    try:
+        analyzed = refresh_features_for_ids(db, batch, force=force)
+        db.commit()
+        return analyzed
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--force", action="store_true", help="re-analyze projects whose text has not changed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    batches = list(id_batches(args.batch_size))
+    analyzed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(process, batch, args.force) for batch in batches]
+        for done, future in enumerate(as_completed(futures), start=1):
+            analyzed += future.result()
+            print(f"batch {done}/{len(batches)} done, {analyzed} projects analyzed")
+    total = sum(len(b) for b in batches)
+    print(f"{analyzed} of {total} projects analyzed in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
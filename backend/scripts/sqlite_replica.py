@@ -0,0 +1,48 @@
+"""Poor man's replication between SQLite files, for trying read/write routing locally.
+
+Copies the primary file onto each replica every --interval seconds, so the
+replicas lag the primary like asynchronous replicas would:
+
+    python -m scripts.sqlite_replica dev.db replica1.db replica2.db --interval 2
+
+    DATABASE_URL=sqlite:///dev.db \\
+    DATABASE_REPLICA_URLS=sqlite:///replica1.db,sqlite:///replica2.db \\
+    READ_STICKY_SECONDS=5 READ_STICKY_DB=sticky.db uvicorn main:app --workers 2
+
+With two MySQL instances, set up ordinary replication instead and point
+DATABASE_REPLICA_URLS at the replica.
+"""
+import argparse
+import sqlite3
+import time
+
+
+def copy(primary: str, replica: str):
+    # the backup API takes a consistent snapshot even while the app is writing
+    source = sqlite3.connect(primary)
+    target = sqlite3.connect(replica)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a SQLite primary onto replica files periodically")
+    parser.add_argument("primary")
+    parser.add_argument("replicas", nargs="+")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between copies (the replica lag)")
+    parser.add_argument("--once", action="store_true", help="copy once and exit")
+    args = parser.parse_args()
+
+    while True:
+        for replica in args.replicas:
+            copy(args.primary, replica)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
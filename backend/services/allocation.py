@@ -0,0 +1,483 @@
+import logging
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from models.capacity import DEFAULT_PROJECT_CAPACITY
+from models.group import GroupPreference, StudentGroup
+from models.project import Project
+from models.supervisor import Supervisor
+from services.reservation import StaleRead, with_retry, apply_assignment, seed_counters
+
+logger = logging.getLogger(__name__)
+
+
+class Allocator:
+    """Group -> project allocation under project capacity and supervisor quota.
+
+    The assignment is kept as a flow network (group -> project -> supervisor)
+    so that any change can be repaired with augmenting paths started from the
+    groups it touched, instead of solving the whole cohort again.
+    """
+
+    def __init__(
+        self,
+        preferences: Dict[int, List[int]],
+        project_supervisor: Dict[int, int],
+        quotas: Dict[int, int],
+        project_capacity: Optional[Dict[int, int]] = None,
+        assignment: Optional[Dict[int, int]] = None,
+    ):
+        self.preferences = {g: list(prefs) for g, prefs in preferences.items()}
+        self.project_supervisor = dict(project_supervisor)
+        self.quotas = {s: q or 0 for s, q in quotas.items()}
+        self.project_capacity = dict(project_capacity or {})
+        self.assignment: Dict[int, int] = {}
+
+        self.project_groups: Dict[int, Set[int]] = defaultdict(set)
+        self.supervisor_load: Dict[int, int] = defaultdict(int)
+        self.supervisor_projects: Dict[int, Set[int]] = defaultdict(set)
+        self.interested: Dict[int, Set[int]] = defaultdict(set)
+
+        for project_id, supervisor_id in self.project_supervisor.items():
+            self.supervisor_projects[supervisor_id].add(project_id)
+        for group_id, prefs in self.preferences.items():
+            for project_id in prefs:
+                self.interested[project_id].add(group_id)
+
+        # trust the previous assignment only as far as it is still feasible
+        for group_id, project_id in (assignment or {}).items():
+            if self._can_host(project_id):
+                self._move(group_id, project_id)
+
+    # --- full solve ---
+
+    # --- each update returns {group_id: new project_id or None} for the moved groups ---
+
+    def allocate(self) -> Dict[int, Optional[int]]:
+        """Place every group that has no project yet, keeping existing claims."""
+        before = dict(self.assignment)
+        for group_id in self.preferences:
+            if group_id not in self.assignment:
+                self._augment(group_id)
+        return self._diff(before)
+
+    def update_preferences(self, group_id: int, preferences: List[int]) -> Dict[int, Optional[int]]:
+        before = dict(self.assignment)
+
+        for project_id in self.preferences.get(group_id, []):
+            self.interested[project_id].discard(group_id)
+        self.preferences[group_id] = list(preferences)
+        for project_id in preferences:
+            self.interested[project_id].add(group_id)
+
+        freed = self._unassign(group_id)
+        self._augment(group_id)
+        if freed is not None and self.assignment.get(group_id) != freed:
+            self._refill(self.project_supervisor[freed])
+            for waiting in sorted(self.interested[freed] - set(self.assignment)):
+                if len(self.project_groups[freed]) >= self._capacity(freed):
+                    break
+                self._augment(waiting)
+        if group_id in self.assignment:
+            self._reroute_through(group_id)
+        return self._diff(before)
+
+    def update_quota(self, supervisor_id: int, quota: int) -> Dict[int, Optional[int]]:
+        before = dict(self.assignment)
+        self.quotas[supervisor_id] = quota or 0
+
+        evicted = []
+        while self.supervisor_load[supervisor_id] > self.quotas[supervisor_id]:
+            evicted.append(self._evict_least_preferred(supervisor_id))
+        for group_id in evicted:
+            self._augment(group_id)
+        self._refill(supervisor_id)
+        return self._diff(before)
+
+    def remove_project(self, project_id: int) -> Dict[int, Optional[int]]:
+        before = dict(self.assignment)
+        supervisor_id = self.project_supervisor.get(project_id)
+        if supervisor_id is None:
+            return {}
+
+        displaced = list(self.project_groups.get(project_id, ()))
+        for group_id in displaced:
+            self._unassign(group_id)
+        del self.project_supervisor[project_id]
+        self.supervisor_projects[supervisor_id].discard(project_id)
+        self.project_groups.pop(project_id, None)
+        self.project_capacity.pop(project_id, None)
+
+        for group_id in displaced:
+            self._augment(group_id)
+        self._refill(supervisor_id)
+        return self._diff(before)
+
+    # --- internals ---
+
+    def _capacity(self, project_id: int) -> int:
+        return self.project_capacity.get(project_id, DEFAULT_PROJECT_CAPACITY)
+
+    def _can_host(self, project_id: int) -> bool:
+        supervisor_id = self.project_supervisor.get(project_id)
+        if supervisor_id is None:
+            return False
+        return (
+            len(self.project_groups[project_id]) < self._capacity(project_id)
+            and self.supervisor_load[supervisor_id] < self.quotas.get(supervisor_id, 0)
+        )
+
+    def _move(self, group_id: int, project_id: int):
+        self._unassign(group_id)
+        self.assignment[group_id] = project_id
+        self.project_groups[project_id].add(group_id)
+        self.supervisor_load[self.project_supervisor[project_id]] += 1
+
+    def _unassign(self, group_id: int) -> Optional[int]:
+        project_id = self.assignment.pop(group_id, None)
+        if project_id is not None:
+            self.project_groups[project_id].discard(group_id)
+            self.supervisor_load[self.project_supervisor[project_id]] -= 1
+        return project_id
+
+    def _evict_least_preferred(self, supervisor_id: int) -> int:
+        def rank(group_id):
+            prefs = self.preferences.get(group_id, [])
+            project_id = self.assignment[group_id]
+            return prefs.index(project_id) if project_id in prefs else len(prefs)
+
+        candidates = [
+            group_id
+            for project_id in self.supervisor_projects[supervisor_id]
+            for group_id in self.project_groups[project_id]
+        ]
+        victim = max(candidates, key=rank)
+        self._unassign(victim)
+        return victim
+
+    def _refill(self, supervisor_id: int):
+        # capacity opened up under this supervisor: search backwards from it
+        # for a waiting group, so only the part of the graph that can reach
+        # the free seat is explored
+        while self.supervisor_load[supervisor_id] < self.quotas.get(supervisor_id, 0):
+            path = self._search_back(("supervisor", supervisor_id))
+            if path is None:
+                return
+            for moved_group, project_id in reversed(path):
+                self._move(moved_group, project_id)
+
+    def _reroute_through(self, group_id: int):
+        # the group's new preferences may open a path for a waiting group that
+        # takes its seat while it moves on to one of its other choices
+        back = self._search_back(("project", self.assignment[group_id]))
+        if back is None:
+            return
+        seen = {("group", g) for g, _ in back} | {("project", p) for _, p in back}
+        forward = self._search_group(group_id, seen)
+        if forward is None:
+            return
+        for moved_group, project_id in reversed(back + forward):
+            self._move(moved_group, project_id)
+
+    def _search_back(self, start):
+        towards = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            kind, key = node
+            if kind == "supervisor":
+                previous = [
+                    ("project", p) for p in sorted(self.supervisor_projects.get(key, ()))
+                    if len(self.project_groups[p]) < self._capacity(p)
+                ]
+            elif kind == "project":
+                previous = [
+                    ("group", g) for g in sorted(self.interested[key])
+                    if self.assignment.get(g) != key
+                ]
+                if self.project_groups[key]:
+                    previous.append(("supervisor", self.project_supervisor[key]))
+            else:
+                if key not in self.assignment:
+                    return self._walk_forward(node, towards)
+                previous = [("project", self.assignment[key])]
+            for prev in previous:
+                if prev not in towards:
+                    towards[prev] = node
+                    queue.append(prev)
+        return None
+
+    def _walk_forward(self, node, towards):
+        path = []
+        while towards[node] is not None:
+            following = towards[node]
+            if node[0] == "group":
+                path.append((node[1], following[1]))
+            node = following
+        return path
+
+    def _augment(self, group_id: int) -> bool:
+        """Find an augmenting path for an unassigned group and apply it."""
+        path = self._search_group(group_id, set())
+        if path is None:
+            return False
+        # path is [(group, project), ...]; apply the tail first so capacity
+        # is released before it is claimed
+        for moved_group, project_id in reversed(path):
+            self._move(moved_group, project_id)
+        return True
+
+    def _search_group(self, group_id, seen):
+        # depth-first over an explicit stack: a displacement chain can run
+        # through every group in the cohort, far deeper than Python recursion
+        start = ("group", group_id)
+        if start in seen:
+            return None
+        seen.add(start)
+        parent = {start: None}
+        stack = [iter(self._next_nodes(start))]
+        nodes = [start]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                nodes.pop()
+                continue
+            if node in seen:
+                continue
+            seen.add(node)
+            parent[node] = nodes[-1]
+            kind, key = node
+            if kind == "supervisor" and self.supervisor_load[key] < self.quotas.get(key, 0):
+                return self._path_to(node, parent)
+            stack.append(iter(self._next_nodes(node)))
+            nodes.append(node)
+        return None
+
+    def _next_nodes(self, node):
+        kind, key = node
+        if kind == "group":
+            # move the group to another of its choices
+            current = self.assignment.get(key)
+            return [
+                ("project", p) for p in self.preferences.get(key, [])
+                if p != current and p in self.project_supervisor
+            ]
+        if kind == "project":
+            # forward edge: the project still has a free slot, go up to the
+            # supervisor; backward edge: push one of its groups somewhere else
+            following = []
+            if len(self.project_groups[key]) < self._capacity(key):
+                following.append(("supervisor", self.project_supervisor[key]))
+            return following + [("group", g) for g in sorted(self.project_groups[key])]
+        # supervisor is full: free a seat by moving a group off one of their projects
+        return [
+            ("group", g)
+            for p in sorted(self.supervisor_projects[key])
+            for g in sorted(self.project_groups[p])
+        ]
+
+    def _path_to(self, node, parent):
+        # every group -> project edge on the way back is one move
+        path = []
+        while parent[node] is not None:
+            previous = parent[node]
+            if node[0] == "project" and previous[0] == "group":
+                path.append((previous[1], node[1]))
+            node = previous
+        path.reverse()
+        return path
+
+    def _diff(self, before: Dict[int, int]) -> Dict[int, Optional[int]]:
+        changed = {}
+        for group_id in set(before) | set(self.assignment):
+            if before.get(group_id) != self.assignment.get(group_id):
+                changed[group_id] = self.assignment.get(group_id)
+        return changed
+
+
+def load_allocator(
+    db: Session,
+    groups: Iterable[int] = (),
+    projects: Iterable[int] = (),
+    supervisors: Iterable[int] = (),
+    quota_overrides: Optional[Dict[int, int]] = None,
+) -> Allocator:
+    """The part of the current assignment reachable from the given groups, projects and supervisors.
+
+    Groups lead to the projects they want or hold, projects to their
+    supervisor and to the groups wanting or holding them, supervisors to all
+    of their projects, until nothing new turns up. Every path a repair can
+    take from the seeds stays inside that part, and the loads in it are
+    exact, so the work follows the size of the change, not of the cohort.
+    """
+    preferences: Dict[int, List[int]] = defaultdict(list)
+    assignment: Dict[int, int] = {}
+    project_supervisor: Dict[int, int] = {}
+    quotas: Dict[int, int] = {}
+    seen_groups: Set[int] = set()
+    seen_projects: Set[int] = set()
+    seen_supervisors: Set[int] = set()
+    new_groups, new_projects, new_supervisors = set(groups), set(projects), set(supervisors)
+
+    while new_groups or new_projects or new_supervisors:
+        if new_groups:
+            seen_groups |= new_groups
+            rows = db.execute(
+                select(GroupPreference.group_id, GroupPreference.project_id)
+                .where(GroupPreference.group_id.in_(new_groups))
+                .order_by(GroupPreference.group_id, GroupPreference.rank)
+            )
+            for group_id, project_id in rows:
+                preferences[group_id].append(project_id)
+                new_projects.add(project_id)
+            rows = db.execute(
+                select(StudentGroup.id, StudentGroup.project_id)
+                .where(StudentGroup.id.in_(new_groups), StudentGroup.project_id.isnot(None))
+            )
+            for group_id, project_id in rows:
+                assignment[group_id] = project_id
+                new_projects.add(project_id)
+            new_groups = set()
+
+        new_projects -= seen_projects
+        if new_projects:
+            seen_projects |= new_projects
+            rows = db.execute(select(Project.id, Project.supervisor_id).where(Project.id.in_(new_projects)))
+            for project_id, supervisor_id in rows:
+                if supervisor_id is not None:
+                    project_supervisor[project_id] = supervisor_id
+                    new_supervisors.add(supervisor_id)
+            new_groups.update(db.execute(
+                select(GroupPreference.group_id).where(GroupPreference.project_id.in_(new_projects))
+            ).scalars())
+            new_groups.update(db.execute(
+                select(StudentGroup.id).where(StudentGroup.project_id.in_(new_projects))
+            ).scalars())
+            new_projects = set()
+
+        new_supervisors -= seen_supervisors
+        if new_supervisors:
+            seen_supervisors |= new_supervisors
+            quotas.update(db.execute(
+                select(Supervisor.id, Supervisor.quota).where(Supervisor.id.in_(new_supervisors))
+            ).all())
+            new_projects.update(db.execute(
+                select(Project.id).where(Project.supervisor_id.in_(new_supervisors))
+            ).scalars())
+            new_supervisors = set()
+
+        new_groups -= seen_groups
+        new_projects -= seen_projects
+
+    quotas.update(quota_overrides or {})
+    return Allocator(
+        preferences=preferences,
+        project_supervisor=project_supervisor,
+        quotas=quotas,
+        assignment=assignment,
+    )
+
+
+def save_assignment(db: Session, allocator: Allocator, changed: Iterable[int]) -> bool:
+    """Write the allocator's choice for the changed groups through the capacity counters (commits)."""
+    return apply_assignment(db, {group_id: allocator.assignment.get(group_id) for group_id in changed})
+
+
+def write_and_repair(db: Session, write: Callable[[], Any], plan: Callable[[], Tuple[Allocator, Dict[int, Optional[int]]]]):
+    """Commit write()'s rows and the moves plan() picks in one transaction.
+
+    plan() reads the allocation and returns (allocator, changes); the
+    counters its moves claim are seeded before write() runs, since seeding
+    commits. write() returns its result, or None to roll back and stop. A
+    move that loses a race with a concurrent reservation rolls back both and
+    plans again through with_retry, which answers 503 once it gives up, with
+    nothing written. Returns (write's result, changes).
+    """
+    def attempt():
+        allocator, changes = plan()
+        seed_counters(db, [p for p in changes.values() if p is not None])
+        result = write()
+        if result is None:
+            db.rollback()
+            return None, {}
+        if changes and not save_assignment(db, allocator, changes):
+            logger.warning("moving %d groups lost a race with a concurrent reservation, planning again", len(changes))
+            raise StaleRead()
+        db.commit()
+        return result, changes
+
+    return with_retry(db, attempt)
+
+
+def set_preferences(db: Session, group_id: int, project_ids: List[int]) -> Dict[int, Optional[int]]:
+    """Store a group's choices and repair the allocation around it; returns the moved groups."""
+    if db.get(StudentGroup, group_id) is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    known = set(db.execute(select(Project.id).where(Project.id.in_(project_ids))).scalars())
+    missing = [p for p in project_ids if p not in known]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Projects not found: {missing}")
+
+    def plan():
+        allocator = load_allocator(db, groups=[group_id], projects=project_ids)
+        return allocator, allocator.update_preferences(group_id, project_ids)
+
+    def write():
+        db.execute(delete(GroupPreference).where(GroupPreference.group_id == group_id))
+        if project_ids:
+            db.execute(
+                insert(GroupPreference),
+                [{"group_id": group_id, "project_id": p, "rank": rank} for rank, p in enumerate(project_ids)],
+            )
+        return True
+
+    return write_and_repair(db, write, plan)[1]
+
+
+def allocate_unassigned(db: Session) -> Dict[int, Optional[int]]:
+    """Place every group without a project, keeping existing claims."""
+    def plan():
+        waiting = db.execute(
+            select(GroupPreference.group_id)
+            .join(StudentGroup, StudentGroup.id == GroupPreference.group_id)
+            .where(StudentGroup.project_id.is_(None))
+            .distinct()
+        ).scalars().all()
+        allocator = load_allocator(db, groups=waiting)
+        return allocator, allocator.allocate()
+
+    return write_and_repair(db, lambda: True, plan)[1]
+
+
+def _supervisor_load(db: Session, supervisor_id: int) -> int:
+    return db.execute(
+        select(func.count(StudentGroup.id))
+        .where(StudentGroup.supervisor_id == supervisor_id, StudentGroup.project_id.isnot(None))
+    ).scalar()
+
+
+def plan_quota_change(db: Session, supervisor_id: int, quota: Optional[int]):
+    """(allocator, moves) for a supervisor's new quota (nothing written)."""
+    # start from the quota the current claims were made under, so that
+    # update_quota does the evicting and refilling
+    allocator = load_allocator(
+        db, supervisors=[supervisor_id], quota_overrides={supervisor_id: _supervisor_load(db, supervisor_id)}
+    )
+    return allocator, allocator.update_quota(supervisor_id, quota)
+
+
+def plan_project_removal(db: Session, project_ids: List[int]):
+    """(allocator, moves) for deleting these projects: where their groups go (nothing written)."""
+    if not db.execute(select(StudentGroup.id).where(StudentGroup.project_id.in_(project_ids)).limit(1)).first():
+        # nobody was placed there, so no one has to move
+        return None, {}
+    allocator = load_allocator(db, projects=project_ids)
+    changes: Dict[int, Optional[int]] = {}
+    for project_id in project_ids:
+        changes.update(allocator.remove_project(project_id))
+    # report final positions only
+    return allocator, {group_id: allocator.assignment.get(group_id) for group_id in changes}
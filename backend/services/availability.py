@@ -0,0 +1,138 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import AVAILABILITY_CACHE_TTL, AVAILABILITY_HOT_DAYS
+from database import SessionLocal, is_sticky
+from models.project import Project
+from utils.interval_tree import IntervalTree
+
+# columns whose change moves a project in the tree
+SCHEDULE_COLUMNS = ("project_start_time", "project_end_time")
+
+
+@dataclass
+class _Snapshot:
+    tree: IntervalTree
+    # every project ending at or after this is in the tree
+    horizon: datetime
+    loaded_at: float
+    generation: int
+
+
+_snapshot: Optional[_Snapshot] = None
+_generation = 0
+_lock = threading.Lock()
+
+
+def touches_schedule(values) -> bool:
+    return any(c in values for c in SCHEDULE_COLUMNS)
+
+
+def invalidate_availability():
+    """Drop the cached tree; call after committing a project write."""
+    global _generation
+    _generation += 1
+
+
+def _fresh(snapshot: Optional[_Snapshot]) -> bool:
+    return (
+        snapshot is not None
+        and snapshot.generation == _generation
+        and time.monotonic() - snapshot.loaded_at < AVAILABILITY_CACHE_TTL
+    )
+
+
+def _hot_snapshot() -> _Snapshot:
+    global _snapshot
+    snapshot = _snapshot
+    if _fresh(snapshot):
+        return snapshot
+
+    # one rebuild at a time; the others wait and take its result
+    with _lock:
+        snapshot = _snapshot
+        if _fresh(snapshot):
+            return snapshot
+        generation = _generation
+        horizon = _naive(datetime.now(timezone.utc)) - timedelta(days=AVAILABILITY_HOT_DAYS)
+        # shared by every request, so it is loaded from the primary: a lagging
+        # replica would hide a user's own writes from them for the whole TTL
+        with SessionLocal() as primary:
+            rows = primary.execute(
+                select(Project.id, Project.project_start_time, Project.project_end_time)
+                .where(Project.project_end_time >= horizon, Project.project_start_time.isnot(None))
+                .order_by(Project.id)
+            ).all()
+        snapshot = _Snapshot(
+            tree=IntervalTree((r.project_start_time, r.project_end_time, r.id) for r in rows),
+            horizon=horizon,
+            loaded_at=time.monotonic(),
+            generation=generation,
+        )
+        # a write committed while loading makes this copy stale already
+        if generation == _generation:
+            _snapshot = snapshot
+        return snapshot
+
+
+def _naive(value: datetime) -> datetime:
+    # the columns are naive DateTime holding UTC: aware values are converted,
+    # naive ones are taken to be UTC already
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _sql_ids(db: Session, mode: str, start: datetime, end: datetime) -> List[int]:
+    # served by ix_projects_start_end / ix_projects_end_start
+    if mode == "within":
+        where = (Project.project_start_time >= start, Project.project_end_time <= end)
+    else:
+        where = (Project.project_start_time <= end, Project.project_end_time >= start)
+    return list(db.execute(
+        select(Project.id)
+        .where(*where)
+        .order_by(Project.project_start_time, Project.project_end_time, Project.id)
+    ).scalars())
+
+
+def find_project_ids(db: Session, mode: str, start: datetime, end: datetime) -> List[int]:
+    """Ids of projects overlapping ("overlap") or lying inside ("within") [start, end], in start order.
+
+    Windows that begin inside the hot range only match projects in the tree,
+    so they never touch the database; older windows use the range indexes.
+    A client that wrote recently skips the tree, which another worker's write
+    may not have reached yet, and reads through db (then on the primary).
+    """
+    start, end = _naive(start), _naive(end)
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+
+    if is_sticky():
+        return _sql_ids(db, mode, start, end)
+    snapshot = _hot_snapshot()
+    if start < snapshot.horizon:
+        return _sql_ids(db, mode, start, end)
+    if mode == "within":
+        return snapshot.tree.within(start, end)
+    return snapshot.tree.overlapping(start, end)
+
+
+def find_projects(
+    db: Session, mode: str, start: datetime, end: datetime, limit: int, offset: int
+) -> Tuple[int, List[Project]]:
+    """(total matches, one page of Project rows) for an availability query."""
+    ids = find_project_ids(db, mode, start, end)
+    page = ids[offset:offset + limit]
+    if not page:
+        return len(ids), []
+    by_id = {p.id: p for p in db.execute(select(Project).where(Project.id.in_(page))).scalars()}
+    # a project deleted by another worker may still be in the tree until the TTL runs out
+    return len(ids), [by_id[i] for i in page if i in by_id]
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from crud.supervisor import set_project_grades
+from models.project import Project
+
+GRADE_MAX_LENGTH = Project.project_grade.type.length
+BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+
+def parse_csv(text: str) -> List[Tuple[int, object, object]]:
+    """Rows as (row number, project_id, grade); row 1 is the header."""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {"project_id", "grade"} <= {f.strip() for f in reader.fieldnames}:
+        raise ValueError("CSV header must contain project_id and grade")
+    rows = []
+    try:
+        for line, row in enumerate(reader, start=2):
+            row = {(k or "").strip(): v for k, v in row.items()}
+            rows.append((line, row.get("project_id"), row.get("grade")))
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV: {e}")
+    return rows
+
+
+def _validate(row: int, project_id, grade, seen: set):
+    try:
+        project_id = int(str(project_id).strip())
+    except (TypeError, ValueError):
+        return None, {"row": row, "detail": f"Invalid project_id: {project_id!r}"}
+
+    grade = (grade or "").strip()
+    if not grade:
+        return None, {"row": row, "project_id": project_id, "detail": "Grade is empty"}
+    if len(grade) > GRADE_MAX_LENGTH:
+        return None, {"row": row, "project_id": project_id, "detail": f"Grade longer than {GRADE_MAX_LENGTH} characters"}
+    if project_id in seen:
+        return None, {"row": row, "project_id": project_id, "detail": "Duplicate project_id in upload"}
+    seen.add(project_id)
+    return (row, project_id, grade), None
+
+
+def ingest_grades(db: Session, supervisor_id: int, rows: Iterable[Tuple[int, object, object]]):
+    errors = []
+    valid = []
+    seen = set()
+    for row, project_id, grade in rows:
+        entry, error = _validate(row, project_id, grade, seen)
+        if error:
+            errors.append(error)
+        else:
+            valid.append(entry)
+
+    updated = 0
+    for start in range(0, len(valid), BATCH_SIZE):
+        batch = valid[start:start + BATCH_SIZE]
+        ids = [project_id for _, project_id, _ in batch]
+        owned = set(db.execute(
+            select(Project.id).where(Project.id.in_(ids), Project.supervisor_id == supervisor_id)
+        ).scalars())
+
+        grades = {}
+        for row, project_id, grade in batch:
+            if project_id in owned:
+                grades[project_id] = grade
+            else:
+                errors.append({"row": row, "project_id": project_id, "detail": "Project not found or access denied"})
+        if grades:
+            updated += set_project_grades(db, supervisor_id, grades)
+        db.commit()
+
+    errors.sort(key=lambda e: e["row"])
+    return {"updated": updated, "errors": errors}
+
+
+def export_grades(db: Session, supervisor_id: int, fmt: str = "csv"):
+    """Yield the supervisor's grades chunk by chunk from the request's session,
+    closing it once the stream is exhausted or the client goes away."""
+    try:
+        if fmt == "csv":
+            yield "project_id,title,project_grade\r\n"
+        last_id = 0
+        while True:
+            # keyset pagination keeps every chunk an index range scan
+            rows = db.execute(
+                select(Project.id, Project.title, Project.project_grade)
+                .where(Project.supervisor_id == supervisor_id, Project.id > last_id)
+                .order_by(Project.id)
+                .limit(EXPORT_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            buffer = io.StringIO()
+            if fmt == "csv":
+                writer = csv.writer(buffer)
+                writer.writerows((r.id, r.title, r.project_grade or "") for r in rows)
+            else:
+                for r in rows:
+                    buffer.write(json.dumps({"project_id": r.id, "title": r.title, "project_grade": r.project_grade or ""}) + "\n")
+            yield buffer.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,198 @@
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import HTTPException
+from scipy import sparse
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models.group import StudentGroup
+from models.student import Student
+from services.taxonomy import canonical_requirements
+
+# a shared keyword says more about a good fit than a shared broad field
+WEIGHTS = {"fields": 1.0, "keywords": 1.5, "features": 0.5}
+# refinement rounds per split
+ITERATIONS = 5
+TIE_BREAK = 1e-4
+# switch a subtree to dense arrays below this many students
+DENSE_BELOW = 512
+
+
+def interest_matrix(interests: Dict[int, Dict[str, List[str]]]):
+    """Students as rows of an L2-normalized sparse term matrix (dot product = cosine similarity).
+
+    Terms go through the same taxonomy as project features, so "AI" and
+    "Artificial Intelligence" land in the same column.
+    """
+    student_ids = sorted(interests)
+    vocabulary: Dict[str, int] = {}
+    rows, cols, values = [], [], []
+    for row, student_id in enumerate(student_ids):
+        fields, keywords, features = canonical_requirements(interests[student_id])
+        terms = {}
+        for kind, found in (("fields", fields), ("keywords", keywords), ("features", features)):
+            for term in found:
+                terms[f"{kind}:{term.lower()}"] = WEIGHTS[kind]
+        for term, weight in terms.items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(weight)
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (rows, cols)),
+        shape=(len(student_ids), max(len(vocabulary), 1)),
+    )
+    return student_ids, _normalize_rows(matrix)
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+def _split(rows: np.ndarray, vectors, n_left: int, rng):
+    """Divide rows in two parts of exactly n_left and the rest, similar rows together.
+
+    A balanced 2-means: rows are ranked by how much closer they are to one
+    centroid than the other, the top n_left go left, and the centroids are
+    recomputed from the halves a few times.
+    """
+    first = int(rng.integers(len(rows)))
+    sims = vectors @ _dense_row(vectors, first)
+    c_left, c_right = _dense_row(vectors, first), _dense_row(vectors, int(np.argmin(sims)))
+    # tiny noise so that identical students can still be split
+    noise = rng.uniform(0, TIE_BREAK, size=len(rows))
+    left = None
+    for _ in range(ITERATIONS):
+        score = vectors @ (c_left - c_right) + noise
+        new_left = np.argpartition(-score, n_left - 1)[:n_left] if n_left < len(rows) else np.arange(len(rows))
+        mask = np.zeros(len(rows), dtype=bool)
+        mask[new_left] = True
+        if left is not None and np.array_equal(mask, left):
+            break
+        left = mask
+        c_left, c_right = _mean(vectors, left), _mean(vectors, ~left)
+    return left
+
+
+def _dense_row(vectors, index: int) -> np.ndarray:
+    if isinstance(vectors, np.ndarray):
+        return vectors[index]
+    # straight from the CSR arrays; sparse row slicing is slow in a loop
+    dense = np.zeros(vectors.shape[1], dtype=np.float32)
+    start, end = vectors.indptr[index], vectors.indptr[index + 1]
+    dense[vectors.indices[start:end]] = vectors.data[start:end]
+    return dense
+
+
+def _mean(vectors, mask: np.ndarray) -> np.ndarray:
+    if not mask.any():
+        return np.zeros(vectors.shape[1], dtype=np.float32)
+    return np.asarray(vectors[mask].mean(axis=0)).ravel()
+
+
+def balanced_clusters(matrix, group_size: int, seed: int = 0) -> np.ndarray:
+    """Cluster label per row, in ceil(n / group_size) clusters of at most group_size
+    members whose sizes differ by at most one (n=5, group_size=4 gives 3 and 2).
+
+    Recursive balanced bisection: each split hands each side exactly the
+    number of seats its groups hold, so sizes come out right by construction
+    and the whole run is O(nnz * log(groups)) rather than students x groups.
+    """
+    n = matrix.shape[0]
+    k = max(1, math.ceil(n / group_size))
+    capacities = np.full(k, n // k, dtype=np.int64)
+    capacities[: n % k] += 1
+    seats = np.concatenate([[0], np.cumsum(capacities)])
+
+    rng = np.random.default_rng(seed)
+    labels = np.empty(n, dtype=np.int64)
+    # (rows, their vectors, first cluster, end cluster)
+    stack = [(np.arange(n), matrix, 0, k)]
+    while stack:
+        rows, vectors, first, end = stack.pop()
+        if end - first == 1:
+            labels[rows] = first
+            continue
+        if not isinstance(vectors, np.ndarray) and len(rows) <= DENSE_BELOW:
+            vectors = vectors.toarray()  # small subtrees are faster dense
+        middle = (first + end) // 2
+        left = _split(rows, vectors, int(seats[middle] - seats[first]), rng)
+        stack.append((rows[left], vectors[left], first, middle))
+        stack.append((rows[~left], vectors[~left], middle, end))
+    return labels
+
+
+def cohesion(matrix, labels: np.ndarray) -> float:
+    """Mean pairwise cosine similarity inside groups, averaged over groups."""
+    k = int(labels.max()) + 1
+    membership = sparse.csr_matrix(
+        (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+        shape=(k, len(labels)),
+    )
+    sums = membership @ matrix
+    pair_sums = np.asarray(sums.multiply(sums).sum(axis=1)).ravel()
+    self_sims = membership @ np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    sizes = np.asarray(membership.sum(axis=1)).ravel()
+    pairs = sizes * (sizes - 1)
+    valid = pairs > 0
+    if not valid.any():
+        return 0.0
+    return float(np.mean((pair_sums[valid] - self_sims[valid]) / pairs[valid]))
+
+
+def form_groups(
+    db: Session,
+    interests: Dict[int, Dict[str, List[str]]],
+    group_size: int,
+    name_prefix: Optional[str] = None,
+):
+    """Cluster the students by interest and store the result as StudentGroup rows."""
+    student_ids, matrix = interest_matrix(interests)
+
+    found = set(db.execute(select(Student.id).where(Student.id.in_(student_ids))).scalars())
+    missing = [sid for sid in student_ids if sid not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Students not found: {missing[:20]}")
+    # a second run over the same cohort would strand the first run's groups
+    grouped = list(db.execute(
+        select(Student.id).where(Student.id.in_(student_ids), Student.group_id.isnot(None)).order_by(Student.id)
+    ).scalars())
+    if grouped:
+        raise HTTPException(status_code=409, detail=f"Students already in a group: {grouped[:20]}")
+
+    name_prefix = name_prefix or f"group-{datetime.now():%Y%m%d-%H%M%S}"
+    taken = db.execute(
+        select(StudentGroup.id).where(StudentGroup.group_name.like(f"{name_prefix}-%")).limit(1)
+    ).first()
+    if taken:
+        raise HTTPException(status_code=409, detail=f"Groups named '{name_prefix}-*' already exist")
+
+    labels = balanced_clusters(matrix, group_size)
+    k = int(labels.max()) + 1
+
+    groups = [StudentGroup(group_name=f"{name_prefix}-{i + 1}") for i in range(k)]
+    db.add_all(groups)
+    db.flush()
+
+    # one executemany UPDATE by primary key for all students
+    db.execute(
+        update(Student),
+        [{"id": sid, "group_id": groups[label].id} for sid, label in zip(student_ids, labels.tolist())],
+    )
+    db.commit()
+
+    members: Dict[int, List[int]] = {}
+    for sid, label in zip(student_ids, labels.tolist()):
+        members.setdefault(label, []).append(sid)
+    return {
+        "groups": [
+            {"id": group.id, "group_name": group.group_name, "student_ids": members[i]}
+            for i, group in enumerate(groups)
+        ],
+        "cohesion": round(cohesion(matrix, labels), 4),
+    }
@@ -0,0 +1,348 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """Persists jobs in SQLite so queued work survives a restart.
+
+    SQLite is the local stand-in; the interface is small enough to back with
+    the main database or Redis later.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # opened on first use so importing the service has no filesystem side effects
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._create_schema(connection)
+            self._connection = connection
+        return self._connection
+
+    def _create_schema(self, connection: sqlite3.Connection):
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                lease_until REAL,
+                submitted_by TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+        # stores created before leases, submitters and remote cancellation existed
+        for column, kind in (
+            ("owner", "TEXT"),
+            ("lease_until", "REAL"),
+            ("submitted_by", "TEXT"),
+            ("cancel_requested", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if column not in columns:
+                connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, priority, created_at)")
+
+    def create(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: int,
+        submitted_by: Optional[str] = None,
+        max_queued: Optional[int] = None,
+    ) -> Optional[str]:
+        """Store a queued job; None if max_queued jobs of this kind are already
+        queued, counted in the same statement so concurrent processes agree."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, created_at, updated_at, submitted_by) "
+                "SELECT ?, ?, ?, ?, ?, ?, ?, ? "
+                "WHERE ? IS NULL OR (SELECT COUNT(*) FROM jobs WHERE kind = ? AND status = ?) < ?",
+                (job_id, kind, QUEUED, priority, json.dumps(payload), now, now, submitted_by,
+                 max_queued, kind, QUEUED, max_queued),
+            ).rowcount
+        return job_id if inserted == 1 else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, priority, payload, result, error, created_at, updated_at, submitted_by "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "priority": row[3],
+            "payload": json.loads(row[4]),
+            "result": json.loads(row[5]) if row[5] is not None else None,
+            "error": row[6],
+            "created_at": row[7],
+            "updated_at": row[8],
+            "submitted_by": row[9],
+        }
+
+    def transition(self, job_id: str, status: str, only_from=None, result=None, error=None, owner=None) -> bool:
+        """Move a job to a new status; with only_from, only if it is currently in one of those,
+        and with owner, only if that worker still holds its lease."""
+        sql = "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?"
+        params = [status, json.dumps(result) if result is not None else None, error, time.time(), job_id]
+        if only_from:
+            sql += " AND status IN (%s)" % ",".join("?" * len(only_from))
+            params.extend(only_from)
+        if owner is not None:
+            sql += " AND owner = ?"
+            params.append(owner)
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount == 1
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """QUEUED -> RUNNING under owner's lease; False if another worker got it first (or it was cancelled)."""
+        now = time.time()
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, owner, now + lease_seconds, now, job_id, QUEUED),
+            ).rowcount == 1
+
+    def renew(self, job_ids: List[str], owner: str, lease_seconds: float) -> List[str]:
+        """Extend owner's leases; returns the ones whose cancellation was requested."""
+        if not job_ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ? AND id IN (%s) "
+                "RETURNING id, cancel_requested" % ",".join("?" * len(job_ids)),
+                (time.time() + lease_seconds, owner, RUNNING, *job_ids),
+            ).fetchall()
+        return [job_id for job_id, cancel_requested in rows if cancel_requested]
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a running job for its owner to cancel at its next renewal."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING)
+            ).rowcount == 1
+
+    def unfinished(self, job_ids: List[str]) -> List[str]:
+        """Those of job_ids that are still queued or running (purged ones count as finished)."""
+        if not job_ids:
+            return []
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND id IN (%s)" % ",".join("?" * len(job_ids)),
+                (QUEUED, RUNNING, *job_ids),
+            )]
+
+    def release(self, owner: str):
+        """Expire owner's leases now, so its interrupted jobs are picked up without waiting."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET lease_until = 0 WHERE owner = ? AND status = ?", (owner, RUNNING))
+
+    def requeue_expired(self) -> List[Tuple[str, int]]:
+        """Put RUNNING jobs whose worker stopped renewing its lease back in the queue.
+
+        Returns only the jobs this call requeued, so with several workers
+        sharing the store each orphan is picked up once. Orphans whose
+        cancellation was requested are cancelled instead.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, "
+                "owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?) RETURNING id, priority, status",
+                (CANCELLED, QUEUED, now, RUNNING, now),
+            ).fetchall()
+        return [(job_id, priority) for job_id, priority, status in rows if status == QUEUED]
+
+    def queued(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, priority FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+
+    def purge(self, older_than_seconds: float):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*FINISHED, time.time() - older_than_seconds),
+            )
+
+
+class JobQueue:
+    """Bounded pool of asyncio workers draining a priority queue of stored jobs.
+
+    Higher priority runs first; equal priorities run in submission order.
+    A running job is leased to this process (worker_id) and the lease renewed
+    every lease_seconds / 3, so processes sharing the store only re-run the
+    jobs of a process that stopped renewing. The store is the shared state:
+    max_pending counts its queued rows, a cancel for a job another process
+    runs is recorded there and acted on at that process's next renewal, and
+    long-polls on jobs finished elsewhere are woken by the same heartbeat.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        runner: Callable[[Dict[str, Any]], Awaitable[Any]],
+        store: JobStore,
+        workers: int = 4,
+        max_pending: int = 1000,
+        retention_seconds: float = 24 * 3600,
+        lease_seconds: float = 30.0,
+    ):
+        self.kind = kind
+        self.runner = runner
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._tasks = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._done: Dict[str, asyncio.Event] = {}
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self.store.purge(self.retention_seconds)
+        # jobs cut off mid-run by a stopped worker run again; jobs another live
+        # worker holds a lease on are left alone. Every worker enqueues the
+        # queued ones and claim() lets one of them run each.
+        self.store.requeue_expired()
+        for job_id, priority in self.store.queued():
+            self._enqueue(job_id, priority)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # the interrupted jobs can be taken over right away instead of after the lease
+        self.store.release(self.worker_id)
+
+    def submit(self, payload: Dict[str, Any], priority: int = 0, submitted_by: Optional[str] = None) -> str:
+        job_id = self.store.create(self.kind, payload, priority, submitted_by, max_queued=self.max_pending)
+        if job_id is None:
+            raise QueueFull()
+        self._enqueue(job_id, priority)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        # a queued job is skipped when a worker pops it; a running one is
+        # interrupted here, or flagged for the process that holds its lease
+        if self.store.transition(job_id, CANCELLED, only_from=(QUEUED,)):
+            self._finish(job_id)
+            return True
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            return True
+        return self.store.request_cancel(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once it finishes or the timeout passes."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED or timeout <= 0:
+            return job
+        event = self._done.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.store.get(job_id)
+
+    def _enqueue(self, job_id: str, priority: int):
+        self._queue.put_nowait((-priority, next(self._order), job_id))
+
+    def _finish(self, job_id: str):
+        event = self._done.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            for job_id in self.store.renew(list(self._running), self.worker_id, self.lease_seconds):
+                # cancelled through another process
+                task = self._running.get(job_id)
+                if task is not None:
+                    self._cancel_requested.add(job_id)
+                    task.cancel()
+            # pick up the jobs of workers that died without releasing them
+            for job_id, priority in self.store.requeue_expired():
+                self._enqueue(job_id, priority)
+            # wake (and forget) long-polls on jobs another process finished
+            waiting = [job_id for job_id in self._done if job_id not in self._running]
+            for job_id in set(waiting) - set(self.store.unfinished(waiting)):
+                self._finish(job_id)
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                if not self.store.claim(job_id, self.worker_id, self.lease_seconds):
+                    continue  # cancelled while queued, or another worker runs it
+                job = self.store.get(job_id)
+                task = asyncio.create_task(self.runner(job["payload"]))
+                self._running[job_id] = task
+                # a worker that lost its lease (stalled past it) leaves the result to the new owner
+                owned = {"only_from": (RUNNING,), "owner": self.worker_id}
+                try:
+                    result = await task
+                    self.store.transition(job_id, SUCCEEDED, result=result, **owned)
+                except asyncio.CancelledError:
+                    if job_id not in self._cancel_requested:
+                        raise  # shutting down: stop() releases the lease and the job is re-run
+                    self.store.transition(job_id, CANCELLED, **owned)
+                except Exception as e:
+                    detail = getattr(e, "detail", None) or str(e)
+                    self.store.transition(job_id, FAILED, error=str(detail), **owned)
+                finally:
+                    self._running.pop(job_id, None)
+                    self._cancel_requested.discard(job_id)
+                    self._finish(job_id)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,129 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.project import Project
+from models.project_feature import ProjectFeature
+from services.taxonomy import extract_terms, normalize_field
+
+# columns whose change means the analysis has to be redone
+SOURCE_COLUMNS = ("title", "description", "research_field", "group_or_individual")
+
+
+def touches_source(values) -> bool:
+    return any(c in values for c in SOURCE_COLUMNS)
+
+
+def source_hash(project) -> str:
+    text = "\x1f".join(str(getattr(project, c, None) or "") for c in SOURCE_COLUMNS)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def analyze_project(project) -> Dict[str, List[str]]:
+    """Normalized fields/keywords/features for a project row (or anything with its columns)."""
+    found = extract_terms(" ".join(
+        str(getattr(project, c, None) or "") for c in ("title", "description", "research_field")
+    ))
+
+    fields = list(found["fields"])
+    declared = normalize_field(getattr(project, "research_field", None))
+    if declared:
+        if declared in fields:
+            fields.remove(declared)
+        fields.insert(0, declared)
+    elif getattr(project, "research_field", None):
+        # keep a field outside the reference list rather than dropping it
+        fields.insert(0, project.research_field.strip())
+
+    features = list(found["features"])
+    mode = (getattr(project, "group_or_individual", None) or "").strip().lower()
+    if mode.startswith("group"):
+        features.append("Group Project")
+    elif mode.startswith("individual"):
+        features.append("Individual Project")
+
+    return {"fields": fields, "keywords": found["keywords"], "features": features}
+
+
+UPSERT_COLUMNS = ("fields", "keywords", "features", "source_hash", "analyzed_at")
+
+
+def _upsert(db: Session, rows: List[Dict[str, Any]]):
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(ProjectFeature)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectFeature.project_id],
+            set_={c: stmt.excluded[c] for c in UPSERT_COLUMNS},
+        )
+        db.execute(stmt, rows)
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(ProjectFeature)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in UPSERT_COLUMNS})
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.merge(ProjectFeature(**row))
+
+
+def refresh_features(db: Session, projects: Iterable, force: bool = False) -> int:
+    """Analyze projects and store the result (no commit); unchanged projects are skipped."""
+    projects = [p for p in projects if p is not None]
+    if not projects:
+        return 0
+
+    known = {}
+    if not force:
+        known = dict(db.execute(
+            select(ProjectFeature.project_id, ProjectFeature.source_hash)
+            .where(ProjectFeature.project_id.in_([p.id for p in projects]))
+        ).all())
+
+    # naive UTC, like every DateTime column here
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for project in projects:
+        digest = source_hash(project)
+        if known.get(project.id) == digest:
+            continue
+        rows.append({"project_id": project.id, "source_hash": digest, "analyzed_at": now, **analyze_project(project)})
+
+    if rows:
+        _upsert(db, rows)
+    return len(rows)
+
+
+def refresh_features_for_ids(db: Session, project_ids: List[int], force: bool = False) -> int:
+    projects = db.execute(
+        select(Project.id, *[getattr(Project, c) for c in SOURCE_COLUMNS]).where(Project.id.in_(project_ids))
+    ).all()
+    return refresh_features(db, projects, force=force)
+
+
+def ranking_input(db: Session) -> List[Dict[str, Any]]:
+    """Every project with its precomputed features in one query, shaped like ai.ProjectInput."""
+    rows = db.execute(
+        select(
+            Project.id, Project.title, Project.description, Project.research_field,
+            ProjectFeature.fields, ProjectFeature.keywords, ProjectFeature.features
+        )
+        .outerjoin(ProjectFeature, ProjectFeature.project_id == Project.id)
+        .order_by(Project.id)
+    ).all()
+    return [
+        {
+            "id": r.id,
+            "name": r.title or "",
+            "description": r.description,
+            "field": r.research_field,
+            "fields": r.fields,
+            "keywords": r.keywords,
+            "features": r.features
+        }
+        for r in rows
+    ]
+
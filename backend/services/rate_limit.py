@@ -0,0 +1,164 @@
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# (key, refill rate in tokens per second, burst capacity)
+Bucket = Tuple[str, float, float]
+
+
+def too_many_requests(retry_after: float, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _refill(tokens: float, updated: float, rate: float, capacity: float, now: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _admit(state: Dict[str, Tuple[float, float]], buckets: List[Bucket], cost: float, now: float):
+    """Charge every bucket or none; returns (new state, seconds until the request would fit).
+
+    A request costing more than a bucket holds is admitted once the bucket is
+    full and leaves it in debt, so the caller waits off the difference afterwards.
+    """
+    refilled = {}
+    wait = 0.0
+    for key, rate, capacity in buckets:
+        tokens, updated = state.get(key, (capacity, now))
+        tokens = _refill(tokens, updated, rate, capacity, now)
+        refilled[key] = tokens
+        needed = min(cost, capacity)
+        if tokens < needed:
+            wait = max(wait, (needed - tokens) / rate if rate > 0 else float("inf"))
+    if wait > 0:
+        return {key: (tokens, now) for key, tokens in refilled.items()}, wait
+    return {key: (tokens - cost, now) for key, tokens in refilled.items()}, 0.0
+
+
+class MemoryBackend:
+    """Buckets in process memory; each worker process limits on its own."""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[Bucket], cost: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            state, wait = _admit(self._state, buckets, cost, now)
+            self._state.update(state)
+            return wait
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker on the host.
+
+    Each check is one IMMEDIATE transaction, so concurrent workers serialize
+    on the file lock instead of double-spending tokens.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def take(self, buckets: List[Bucket], cost: float = 1) -> float:
+        keys = [key for key, _, _ in buckets]
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # wall clock, since monotonic clocks are not comparable across processes
+                now = time.time()
+                rows = conn.execute(
+                    "SELECT key, tokens, updated FROM buckets WHERE key IN (%s)" % ",".join("?" * len(keys)), keys
+                ).fetchall()
+                state, wait = _admit({key: (tokens, updated) for key, tokens, updated in rows}, buckets, cost, now)
+                conn.executemany(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(key, tokens, updated) for key, (tokens, updated) in state.items()],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return wait
+
+
+class RateLimiter:
+    """Per-user and global token buckets, checked together."""
+
+    def __init__(self, backend, user_rate: float, user_burst: float, global_rate: float, global_burst: float):
+        self.backend = backend
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+
+    def check(self, scope: str, user_id, cost: float = 1):
+        """Raise 429 if the user, or the service as a whole, is over its rate for this scope."""
+        wait = self.backend.take(
+            [
+                (f"{scope}:user:{user_id}", self.user_rate, self.user_burst),
+                (f"{scope}:global", self.global_rate, self.global_burst),
+            ],
+            cost,
+        )
+        if wait > 0:
+            raise too_many_requests(wait, "Rate limit exceeded, please retry later")
+
+
+class ConcurrencyGate:
+    """Caps in-flight calls; a few wait their turn, the rest are shed with 429."""
+
+    def __init__(self, limit: int, max_waiting: int, max_wait_seconds: float):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.waiting = 0
+        self.in_flight = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def slot(self, shed: bool = True):
+        """Hold one slot for the body; with shed=False wait as long as it takes."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if shed and self._semaphore.locked() and self.waiting >= self.max_waiting:
+            raise too_many_requests(self.max_wait_seconds, "AI service is busy, please retry later")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait_seconds if shed else None)
+        except asyncio.TimeoutError:
+            raise too_many_requests(self.max_wait_seconds, "AI service is busy, please retry later")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
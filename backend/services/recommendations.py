@@ -0,0 +1,265 @@
+import hashlib
+import heapq
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import and_, case, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config import AI_SERVICE_TIMEOUT, AI_SERVICE_URL
+from config import RECOMMENDATION_CANDIDATES, RECOMMENDATION_MAX_AGE_HOURS, RECOMMENDATION_TOP_N
+from database import SessionLocal
+from models.recommendation import RecommendationProject, StudentRecommendation
+from models.student import Student
+from services.project_features import ranking_input
+from services.taxonomy import score_project
+from utils.jwt import create_access_token
+
+logger = logging.getLogger(__name__)
+
+# times the AI service may answer 429 (busy or over the student's rate) before a run fails
+AI_SERVICE_RETRIES = 3
+
+
+def requirement_hash(text: str) -> str:
+    # case and spacing changes do not change what the student asked for
+    return hashlib.sha1(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+def get_recommendation(db: Session, student_id: int) -> Optional[StudentRecommendation]:
+    return db.get(StudentRecommendation, student_id)
+
+
+def _utcnow() -> datetime:
+    # computed_at is a naive DateTime column holding UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _expired_before() -> datetime:
+    return _utcnow() - timedelta(hours=RECOMMENDATION_MAX_AGE_HOURS)
+
+
+def needs_refresh(recommendation: StudentRecommendation) -> bool:
+    """Stale (a scored project changed) or older than RECOMMENDATION_MAX_AGE_HOURS,
+    which also lets projects added since the last run into the ranking."""
+    if recommendation.status == "stale":
+        return True
+    return recommendation.status == "ready" and (
+        recommendation.computed_at is None or recommendation.computed_at < _expired_before()
+    )
+
+
+def submit_requirements(db: Session, student_id: int, text: str, background_tasks: BackgroundTasks):
+    """Store the student's requirements and schedule a recomputation if they changed."""
+    digest = requirement_hash(text)
+    recommendation = db.get(StudentRecommendation, student_id)
+    if recommendation is not None and recommendation.requirement_hash == digest \
+            and recommendation.status in ("pending", "ready"):
+        return recommendation
+
+    if recommendation is None:
+        if not db.execute(select(Student.id).where(Student.id == student_id)).first():
+            raise HTTPException(status_code=404, detail="Student not found")
+        db.add(StudentRecommendation(
+            student_id=student_id, requirement_text=text, requirement_hash=digest,
+            results=[], status="pending", version=1,
+        ))
+    else:
+        # previous results stay readable until the new ones are stored
+        db.execute(
+            update(StudentRecommendation)
+            .where(StudentRecommendation.student_id == student_id)
+            .values(
+                requirement_text=text, requirement_hash=digest, status="pending",
+                version=StudentRecommendation.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    try:
+        db.commit()
+    except IntegrityError:
+        # a concurrent first submission created the row
+        db.rollback()
+        return submit_requirements(db, student_id, text, background_tasks)
+
+    db.expire_all()
+    recommendation = db.get(StudentRecommendation, student_id)
+    background_tasks.add_task(recompute, student_id, recommendation.version)
+    return recommendation
+
+
+def schedule_refresh(background_tasks: BackgroundTasks, recommendation: StudentRecommendation):
+    background_tasks.add_task(recompute, recommendation.student_id, recommendation.version, True)
+
+
+def mark_stale(db: Session, project_ids: List[int]):
+    """Flag the recommendations that scored any of these projects (no commit).
+
+    A run still in progress read the catalogue before this change, so pending rows
+    are flagged too and their version bumped: the run's result is dropped and the
+    next read recomputes."""
+    if not project_ids:
+        return
+    pending = StudentRecommendation.status == "pending"
+    db.execute(
+        update(StudentRecommendation)
+        .where(or_(
+            and_(
+                StudentRecommendation.status == "ready",
+                StudentRecommendation.student_id.in_(
+                    select(RecommendationProject.student_id).where(RecommendationProject.project_id.in_(project_ids))
+                ),
+            ),
+            pending,
+        ))
+        # version first: MySQL evaluates SET left to right against the updated row
+        .ordered_values(
+            (StudentRecommendation.version, StudentRecommendation.version + case((pending, 1), else_=0)),
+            (StudentRecommendation.status, "stale"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _load(student_id: int, version: int, claim: bool) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        if claim:
+            # several readers may ask for the same refresh; only one gets it
+            claimed = db.execute(
+                update(StudentRecommendation)
+                .where(
+                    StudentRecommendation.student_id == student_id,
+                    StudentRecommendation.version == version,
+                    or_(
+                        StudentRecommendation.status == "stale",
+                        StudentRecommendation.computed_at < _expired_before(),
+                    ),
+                    StudentRecommendation.status != "pending",
+                )
+                .values(status="pending")
+                .execution_options(synchronize_session=False)
+            )
+            if claimed.rowcount != 1:
+                db.rollback()
+                return None
+            db.commit()
+
+        recommendation = db.get(StudentRecommendation, student_id)
+        if recommendation is None or recommendation.version != version:
+            return None
+        return {
+            "email": db.execute(select(Student.email).where(Student.id == student_id)).scalar_one(),
+            "text": recommendation.requirement_text,
+            "hash": recommendation.requirement_hash,
+            "requirements": recommendation.requirements,
+            "analyzed_hash": recommendation.analyzed_hash,
+            "projects": ranking_input(db),
+        }
+    finally:
+        db.close()
+
+
+def _store(student_id: int, version: int, values: Dict[str, Any], project_ids: List[int]):
+    db = SessionLocal()
+    try:
+        stored = db.execute(
+            update(StudentRecommendation)
+            .where(StudentRecommendation.student_id == student_id, StudentRecommendation.version == version)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if stored.rowcount != 1:
+            # the requirements changed meanwhile; the newer run stores its own result
+            db.rollback()
+            return
+        db.execute(delete(RecommendationProject).where(RecommendationProject.student_id == student_id))
+        if project_ids:
+            db.execute(
+                insert(RecommendationProject),
+                [{"student_id": student_id, "project_id": pid} for pid in project_ids],
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _call_ai(path: str, body: Dict[str, Any], token: str) -> Dict[str, Any]:
+    """POST to the AI service; a 429 is waited out (Retry-After) a few times, since
+    the run was already accepted when the requirements were submitted."""
+    request = urllib.request.Request(
+        AI_SERVICE_URL.rstrip("/") + path,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+        method="POST",
+    )
+    for attempt in range(AI_SERVICE_RETRIES + 1):
+        try:
+            with urllib.request.urlopen(request, timeout=AI_SERVICE_TIMEOUT) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code != 429 or attempt == AI_SERVICE_RETRIES:
+                raise
+            time.sleep(min(float(e.headers.get("Retry-After") or 1), 30))
+
+
+def _analysis(result: Dict[str, Any]) -> Optional[Dict[str, List[str]]]:
+    # the service answers empty lists when nothing specific was asked for; stored as null
+    requirements = {k: result.get(k) or [] for k in ("fields", "keywords", "features")}
+    return requirements if any(requirements.values()) else None
+
+
+def shortlist(requirements: Optional[Dict[str, Any]], projects: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """The `limit` projects the local rubric scores highest (ties in catalogue order),
+    so the ranking call gets a shortlist instead of the whole catalogue."""
+    if len(projects) <= limit:
+        return projects
+    if not requirements:
+        return projects[:limit]
+    return heapq.nlargest(limit, projects, key=lambda p: score_project(requirements, p)[0])
+
+
+async def recompute(student_id: int, version: int, claim: bool = False):
+    """Background task: analyze (only if the text changed) and rank a shortlist through
+    the AI service, then store the top N."""
+    loaded = await run_in_threadpool(_load, student_id, version, claim)
+    if loaded is None:
+        return
+
+    # on the student's behalf, so it counts against their own AI rate limit
+    token = create_access_token({"id": student_id, "sub": loaded["email"], "role": "student"})
+    try:
+        requirements = loaded["requirements"]
+        if loaded["analyzed_hash"] != loaded["hash"]:
+            analysis = await run_in_threadpool(_call_ai, "/analyze-requirements", {"user_input": loaded["text"]}, token)
+            requirements = _analysis(analysis)
+        candidates = shortlist(requirements, loaded["projects"], RECOMMENDATION_CANDIDATES)
+        ranking = await run_in_threadpool(
+            _call_ai, "/rank-projects", {"requirements": requirements, "projects": candidates}, token
+        )
+        ranked = ranking["ranked_projects"]
+    except Exception as e:
+        logger.warning("computing recommendations for student %s failed: %s", student_id, e)
+        await run_in_threadpool(_store, student_id, version, {"status": "failed"}, [])
+        return
+
+    top = [
+        {"id": p["id"], "score": p.get("score"), "reasoning": p.get("reasoning")}
+        for p in ranked[:RECOMMENDATION_TOP_N]
+    ]
+    values = {
+        "requirements": requirements,
+        "analyzed_hash": loaded["hash"],
+        "results": top,
+        "status": "ready",
+        "computed_at": _utcnow(),
+    }
+    await run_in_threadpool(_store, student_id, version, values, [p["id"] for p in top])
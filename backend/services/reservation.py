@@ -0,0 +1,256 @@
+import random
+import time
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update, delete
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from models.capacity import DEFAULT_PROJECT_CAPACITY, SupervisorCapacity, ProjectCapacity
+from models.group import StudentGroup
+from models.project import Project
+from models.student import Student
+from models.supervisor import Supervisor
+
+MAX_RETRIES = 8
+BACKOFF_SECONDS = 0.005
+
+
+class StaleRead(Exception):
+    """A row changed between reading and the conditional write; read again."""
+
+
+def with_retry(db: Session, operation):
+    # lock waits, deadlocks ("database is locked" on SQLite) and lost seeding
+    # races are retried with jittered backoff; capacity decisions themselves
+    # are made by the conditional UPDATEs inside the operation
+    for attempt in range(MAX_RETRIES):
+        try:
+            return operation()
+        except (OperationalError, IntegrityError, StaleRead):
+            db.rollback()
+            time.sleep(BACKOFF_SECONDS * (2 ** attempt) * random.random())
+    raise HTTPException(status_code=503, detail="Reservation service busy, please retry")
+
+
+def require_member(db: Session, student_id: int, group_id: int):
+    """403 unless the student belongs to the group."""
+    own_group = db.execute(select(Student.group_id).where(Student.id == student_id)).scalar()
+    if own_group != group_id:
+        raise HTTPException(status_code=403, detail="You can only manage your own group")
+
+
+def _claimed_count(supervisor_id: int):
+    return (
+        select(func.count(StudentGroup.id))
+        .where(StudentGroup.supervisor_id == supervisor_id, StudentGroup.project_id.isnot(None))
+        .scalar_subquery()
+    )
+
+
+def sync_supervisor_capacity(db: Session, supervisor_id: int):
+    """Recompute a supervisor's counter from quota and current claims (no commit)."""
+    quota = select(func.coalesce(Supervisor.quota, 0)).where(Supervisor.id == supervisor_id).scalar_subquery()
+    db.execute(
+        update(SupervisorCapacity)
+        .where(SupervisorCapacity.supervisor_id == supervisor_id)
+        .values(
+            remaining=quota - _claimed_count(supervisor_id),
+            version=SupervisorCapacity.version + 1,
+        )
+    )
+
+
+def ensure_counters(db: Session, project_id: int) -> int:
+    """Seed the counters for a project and its supervisor if missing; returns the supervisor id."""
+    supervisor_id = db.execute(select(Project.supervisor_id).where(Project.id == project_id)).scalar()
+    if supervisor_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    has_supervisor = db.get(SupervisorCapacity, supervisor_id) is not None
+    has_project = db.get(ProjectCapacity, project_id) is not None
+    if has_supervisor and has_project:
+        return supervisor_id
+
+    if not has_supervisor:
+        quota = db.execute(select(Supervisor.quota).where(Supervisor.id == supervisor_id)).scalar() or 0
+        claimed = db.execute(select(_claimed_count(supervisor_id))).scalar()
+        db.add(SupervisorCapacity(supervisor_id=supervisor_id, remaining=quota - claimed))
+    if not has_project:
+        claimed = db.execute(
+            select(func.count(StudentGroup.id)).where(StudentGroup.project_id == project_id)
+        ).scalar()
+        db.add(ProjectCapacity(
+            project_id=project_id,
+            supervisor_id=supervisor_id,
+            remaining=DEFAULT_PROJECT_CAPACITY - claimed,
+        ))
+    # a concurrent request seeding the same row raises IntegrityError here,
+    # which the retry loop turns into a re-read
+    db.commit()
+    return supervisor_id
+
+
+def seed_counters(db: Session, project_ids: List[int]):
+    """ensure_counters for each project, so claiming them later does not commit."""
+    for project_id in sorted(set(project_ids)):
+        ensure_counters(db, project_id)
+
+
+def _decrement(db: Session, model, key_column, key: int) -> bool:
+    result = db.execute(
+        update(model)
+        .where(key_column == key, model.remaining > 0)
+        .values(remaining=model.remaining - 1, version=model.version + 1)
+    )
+    return result.rowcount == 1
+
+
+def _increment(db: Session, model, key_column, key: int):
+    db.execute(
+        update(model)
+        .where(key_column == key)
+        .values(remaining=model.remaining + 1, version=model.version + 1)
+    )
+
+
+def reserve(db: Session, group_id: int, project_id: int) -> StudentGroup:
+    def attempt():
+        supervisor_id = ensure_counters(db, project_id)
+
+        if not _decrement(db, ProjectCapacity, ProjectCapacity.project_id, project_id):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Project is full")
+        if not _decrement(db, SupervisorCapacity, SupervisorCapacity.supervisor_id, supervisor_id):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Supervisor quota reached")
+
+        # optimistic claim: only succeeds if the group has not claimed anything
+        # in the meantime, otherwise the decrements above are rolled back
+        claimed = db.execute(
+            update(StudentGroup)
+            .where(StudentGroup.id == group_id, StudentGroup.project_id.is_(None))
+            .values(project_id=project_id, supervisor_id=supervisor_id)
+        )
+        if claimed.rowcount != 1:
+            db.rollback()
+            if db.get(StudentGroup, group_id) is None:
+                raise HTTPException(status_code=404, detail="Group not found")
+            raise HTTPException(status_code=409, detail="Group already holds a reservation")
+
+        db.commit()
+        return db.get(StudentGroup, group_id)
+
+    return with_retry(db, attempt)
+
+
+def release(db: Session, group_id: int) -> bool:
+    def attempt():
+        row = db.execute(
+            select(StudentGroup.project_id, StudentGroup.supervisor_id).where(StudentGroup.id == group_id)
+        ).first()
+        if row is None or row.project_id is None:
+            return False
+
+        released = db.execute(
+            update(StudentGroup)
+            .where(StudentGroup.id == group_id, StudentGroup.project_id == row.project_id)
+            .values(project_id=None, supervisor_id=None)
+        )
+        if released.rowcount != 1:
+            # somebody else moved the group first; read again
+            raise StaleRead()
+
+        _increment(db, ProjectCapacity, ProjectCapacity.project_id, row.project_id)
+        _increment(db, SupervisorCapacity, SupervisorCapacity.supervisor_id, row.supervisor_id)
+        db.commit()
+        return True
+
+    return with_retry(db, attempt)
+
+
+def apply_assignment(db: Session, changes: Dict[int, Optional[int]]) -> bool:
+    """Move groups to new projects (None: unassign) through the capacity counters.
+
+    All or nothing, and committed: every old claim is released first, so a
+    seat freed by one move can be taken by the next, then every new claim
+    goes through the same conditional decrements as reserve(). Returns False,
+    with nothing changed, if a concurrent reservation got in the way. Rows the
+    caller wrote in the same transaction are committed or rolled back with it.
+    """
+    if not changes:
+        return True
+    seed_counters(db, [p for p in changes.values() if p is not None])
+
+    current = {
+        row.id: row
+        for row in db.execute(
+            select(StudentGroup.id, StudentGroup.project_id, StudentGroup.supervisor_id)
+            .where(StudentGroup.id.in_(list(changes)))
+        )
+    }
+    owners = dict(db.execute(
+        select(Project.id, Project.supervisor_id).where(Project.id.in_([p for p in changes.values() if p is not None]))
+    ).all())
+
+    for group_id in changes:
+        row = current.get(group_id)
+        if row is None or row.project_id is None:
+            continue
+        released = db.execute(
+            update(StudentGroup)
+            .where(StudentGroup.id == group_id, StudentGroup.project_id == row.project_id)
+            .values(project_id=None, supervisor_id=None)
+        )
+        if released.rowcount != 1:
+            db.rollback()
+            return False
+        _increment(db, ProjectCapacity, ProjectCapacity.project_id, row.project_id)
+        if row.supervisor_id is not None:
+            _increment(db, SupervisorCapacity, SupervisorCapacity.supervisor_id, row.supervisor_id)
+
+    for group_id, project_id in changes.items():
+        if project_id is None or group_id not in current:
+            continue
+        supervisor_id = owners.get(project_id)
+        claimed = (
+            supervisor_id is not None
+            and _decrement(db, ProjectCapacity, ProjectCapacity.project_id, project_id)
+            and _decrement(db, SupervisorCapacity, SupervisorCapacity.supervisor_id, supervisor_id)
+            and db.execute(
+                update(StudentGroup)
+                .where(StudentGroup.id == group_id, StudentGroup.project_id.is_(None))
+                .values(project_id=project_id, supervisor_id=supervisor_id)
+            ).rowcount == 1
+        )
+        if not claimed:
+            db.rollback()
+            return False
+
+    db.commit()
+    return True
+
+
+def release_projects(db: Session, project_ids: List[int], supervisor_id: Optional[int] = None):
+    """Drop every claim on projects that are about to be deleted (no commit).
+
+    Pass the owning supervisor when it is known to skip looking it up.
+    """
+    if supervisor_id is None:
+        supervisor_ids = db.execute(
+            select(Project.supervisor_id).where(Project.id.in_(project_ids)).distinct()
+        ).scalars().all()
+    else:
+        supervisor_ids = [supervisor_id]
+
+    released = db.execute(
+        update(StudentGroup)
+        .where(StudentGroup.project_id.in_(project_ids))
+        .values(project_id=None, supervisor_id=None)
+    )
+    db.execute(delete(ProjectCapacity).where(ProjectCapacity.project_id.in_(project_ids)))
+    if released.rowcount:
+        for owner_id in supervisor_ids:
+            if owner_id is not None:
+                sync_supervisor_capacity(db, owner_id)
@@ -0,0 +1,256 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.aho_corasick import Automaton
+
+# The seven reference fields from the requirement-analysis prompt, with the
+# ways students and supervisors actually write them.
+FIELDS: Dict[str, List[str]] = {
+    "Healthcare": ["healthcare", "health care", "health", "medical", "medicine", "clinical", "hospital", "e-health", "ehealth"],
+    "Blockchain": ["blockchain", "block chain", "distributed ledger", "dlt", "web3"],
+    "Artificial Intelligence": ["artificial intelligence", "ai", "a.i."],
+    "Internet of Things (IoT)": ["internet of things", "iot"],
+    "Big Data": ["big data", "data science", "data analytics", "data analysis"],
+    "Cloud Computing": ["cloud computing", "cloud"],
+    "Cybersecurity": ["cybersecurity", "cyber security", "cyber-security", "security", "infosec", "information security"],
+}
+
+# Technical keywords -> (field they imply, aliases)
+KEYWORDS: Dict[str, tuple] = {
+    "Machine Learning": ("Artificial Intelligence", ["machine learning", "ml"]),
+    "Deep Learning": ("Artificial Intelligence", ["deep learning", "neural network", "neural networks", "cnn", "transformer", "transformers"]),
+    "Natural Language Processing": ("Artificial Intelligence", ["natural language processing", "nlp", "language model", "language models", "llm", "llms"]),
+    "Computer Vision": ("Artificial Intelligence", ["computer vision", "image recognition", "object detection", "image classification"]),
+    "Chatbot": ("Artificial Intelligence", ["chatbot", "chatbots", "chat bot", "conversational agent"]),
+    "Reinforcement Learning": ("Artificial Intelligence", ["reinforcement learning"]),
+    "Smart Contracts": ("Blockchain", ["smart contract", "smart contracts", "solidity"]),
+    "Cryptocurrency": ("Blockchain", ["cryptocurrency", "cryptocurrencies", "crypto", "bitcoin", "ethereum", "defi", "nft", "nfts"]),
+    "Sensors": ("Internet of Things (IoT)", ["sensor", "sensors", "sensor network", "wsn"]),
+    "Edge Computing": ("Internet of Things (IoT)", ["edge computing", "fog computing"]),
+    "Embedded Systems": ("Internet of Things (IoT)", ["embedded", "embedded systems", "arduino", "raspberry pi", "microcontroller"]),
+    "Smart Home": ("Internet of Things (IoT)", ["smart home", "home automation", "smart city", "smart cities"]),
+    "Wearables": ("Internet of Things (IoT)", ["wearable", "wearables", "smartwatch"]),
+    "Data Visualization": ("Big Data", ["data visualization", "data visualisation", "visualization", "visualisation"]),
+    "Data Mining": ("Big Data", ["data mining", "data pipeline", "data pipelines", "etl"]),
+    "Hadoop": ("Big Data", ["hadoop", "mapreduce", "hdfs"]),
+    "Spark": ("Big Data", ["spark", "pyspark"]),
+    "AWS": ("Cloud Computing", ["aws", "amazon web services", "azure", "gcp", "google cloud"]),
+    "Serverless": ("Cloud Computing", ["serverless", "lambda functions"]),
+    "Containers": ("Cloud Computing", ["docker", "kubernetes", "k8s", "containers", "containerisation", "containerization"]),
+    "Microservices": ("Cloud Computing", ["microservice", "microservices"]),
+    "Penetration Testing": ("Cybersecurity", ["penetration testing", "pen testing", "pentesting", "ethical hacking"]),
+    "Encryption": ("Cybersecurity", ["encryption", "cryptography", "cryptographic"]),
+    "Intrusion Detection": ("Cybersecurity", ["intrusion detection", "ids", "anomaly detection"]),
+    "Malware Analysis": ("Cybersecurity", ["malware", "ransomware", "malware analysis"]),
+    "Network Security": ("Cybersecurity", ["network security", "firewall", "firewalls"]),
+    "Web Security": ("Cybersecurity", ["web security", "xss", "sql injection", "owasp"]),
+    "Privacy": ("Cybersecurity", ["privacy", "privacy-preserving", "differential privacy"]),
+    "Medical Imaging": ("Healthcare", ["medical imaging", "mri", "x-ray", "radiology"]),
+    "Telemedicine": ("Healthcare", ["telemedicine", "telehealth", "remote monitoring"]),
+    "Electronic Health Records": ("Healthcare", ["electronic health records", "ehr", "emr", "health records"]),
+    "Mental Health": ("Healthcare", ["mental health", "wellbeing", "well-being"]),
+}
+
+# Deliverable/feature requirements students state explicitly
+FEATURES: Dict[str, List[str]] = {
+    "Mobile App": ["mobile app", "mobile application", "android", "ios", "mobile"],
+    "Web Application": ["web app", "web application", "website", "web platform", "web development", "web dev"],
+    "Dashboard": ["dashboard", "dashboards"],
+    "REST API": ["rest api", "api", "apis", "backend service"],
+    "Real-time Processing": ["real-time", "real time", "realtime", "streaming"],
+    "Deep Learning Model": ["deep learning model", "train a model", "model training"],
+    "Hardware Prototype": ["prototype", "hardware", "device"],
+}
+
+
+def _aliases():
+    for field, aliases in FIELDS.items():
+        for alias in aliases:
+            yield alias, "fields", field, None
+    for keyword, (field, aliases) in KEYWORDS.items():
+        for alias in [keyword.lower(), *aliases]:
+            yield alias, "keywords", keyword, field
+    for feature, aliases in FEATURES.items():
+        for alias in aliases:
+            yield alias, "features", feature, None
+
+
+ALIASES = {}
+for _alias, _kind, _canonical, _implied in _aliases():
+    ALIASES.setdefault(_alias, (_kind, _canonical, _implied))
+
+_AUTOMATON = Automaton(ALIASES)
+
+# Aliases this short are acronyms ("ids", "ai", "ml") and also read as plain
+# words ("project ids"), so they only count written as an acronym and as a
+# whole token: not inside "user-ids" or "ids.json"
+SHORT_ALIAS = 3
+_TOKEN_BEFORE = set(" \t\n([{\"/,;:")
+_TOKEN_AFTER = set(" \t\n)]}\"/,;:!?")
+
+
+def _acronym_token(text: str, start: int, end: int, check_case: bool = True) -> bool:
+    token = text[start:end]
+    # capitals after the first letter: "AI", "IDS", "iOS", but not "Ids"
+    if check_case and not (token.isupper() or any(c.isupper() for c in token[1:])):
+        return False
+    if start > 0 and text[start - 1] not in _TOKEN_BEFORE:
+        return False
+    if end < len(text) and text[end] not in _TOKEN_AFTER:
+        # a full stop ends the token only at the end of a sentence
+        return text[end] in ".!?" and (end + 1 == len(text) or text[end + 1].isspace())
+    return True
+
+
+def _find(text: str):
+    lowered = text.lower()
+    # lowercasing changed the offsets (rare non-ASCII): check the token only
+    check_case = len(lowered) == len(text)
+    original = text if check_case else lowered
+    return _AUTOMATON.find(
+        lowered,
+        accept=lambda start, end, _: end - start > SHORT_ALIAS or _acronym_token(original, start, end, check_case),
+    )
+
+
+def _collect(matches) -> Dict[str, List[str]]:
+    found = {"fields": [], "keywords": [], "features": []}
+    for _, _, (kind, canonical, implied) in matches:
+        if canonical not in found[kind]:
+            found[kind].append(canonical)
+        if implied and implied not in found["fields"]:
+            found["fields"].append(implied)
+    return found
+
+
+def extract_terms(text: Optional[str]) -> Dict[str, List[str]]:
+    """Canonical fields/keywords/features mentioned in text, in order of appearance.
+
+    A keyword also implies its field (e.g. "NLP" -> Artificial Intelligence).
+    """
+    return _collect(_find(text or ""))
+
+
+# words that carry no requirement of their own in inputs like
+# "I want a project related to blockchain"
+FILLER = frozenset("""
+    a an the and or with of in on for to about into using use based related relating
+    i i'm im i'd id me my we our us you is am are be would like want wanna need looking look
+    what how there have has give show find recommend suggest help
+    interested interest keen do doing work working build building make develop developing
+    project projects topic topics area areas field fields something some any kind type
+    please can could that which involving involves involve focus focused around
+    technology technologies tech thing things stuff also as well maybe preferably
+""".split())
+
+# phrasing the taxonomy cannot represent; these go to the model
+_NEGATION = re.compile(r"\b(not|no|without|except|avoid|rather than|instead of|other than|don't|dont|isn't|aren't)\b")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'+#.-]*[a-z0-9+#]|[a-z0-9]")
+
+MIN_COVERAGE = 0.75
+MAX_FIELDS = 2
+MAX_KEYWORDS = 3
+
+
+def quick_analysis(text: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    """Requirements for inputs the taxonomy fully explains, else None.
+
+    Confident means: something was matched, no negation, at most two fields
+    and three keywords, and at least MIN_COVERAGE of the non-filler words are
+    part of a matched term. Anything else is left to the language model,
+    including acronyms written in lower case ("ai", "ids").
+    """
+    lowered = (text or "").lower()
+    matches = _find(text or "")
+    if not matches or _NEGATION.search(lowered):
+        return None
+
+    spans = [(start, end) for start, end, _ in matches]
+    content = covered = 0
+    for word in _WORD.finditer(lowered):
+        if any(start <= word.start() and word.end() <= end for start, end in spans):
+            content += 1
+            covered += 1
+        elif word.group() not in FILLER:
+            content += 1
+    if content == 0 or covered / content < MIN_COVERAGE:
+        return None
+
+    found = _collect(matches)
+    if not (found["fields"] or found["keywords"]):
+        return None
+    if len(found["fields"]) > MAX_FIELDS or len(found["keywords"]) > MAX_KEYWORDS:
+        return None
+    return found
+
+
+def normalize_field(value: Optional[str]) -> Optional[str]:
+    """Map a free-text field name onto a reference field, if it is one."""
+    found = extract_terms(value)
+    return found["fields"][0] if found["fields"] else None
+
+
+def field_of_keyword(keyword: str) -> Optional[str]:
+    entry = KEYWORDS.get(keyword)
+    return entry[0] if entry else None
+
+
+# --- ranking against precomputed features ---
+# (kept here rather than in project_features so the AI service can score
+# without importing the models and the database engine)
+
+def canonical_requirements(requirements: Dict[str, Any]) -> Tuple[List[str], List[str], List[str]]:
+    """Map LLM-worded requirements onto the same vocabulary as the project features."""
+    fields, keywords, features = [], [], []
+    for value in requirements.get("fields") or []:
+        fields.append(normalize_field(value) or value.strip())
+    for value in requirements.get("keywords") or []:
+        keywords.extend(extract_terms(value)["keywords"] or [value.strip()])
+    for value in requirements.get("features") or []:
+        terms = extract_terms(value)
+        features.extend(terms["features"] or [value.strip()])
+    return fields, keywords, features
+
+
+def score_project(requirements: Dict[str, Any], project: Dict[str, Any]) -> Tuple[float, str]:
+    """Score one project (0-10) with the same rubric the ranking prompt gives the LLM."""
+    req_fields, req_keywords, req_features = canonical_requirements(requirements)
+    fields = [f.lower() for f in project.get("fields") or []]
+    keywords = [k.lower() for k in project.get("keywords") or []]
+    features = [f.lower() for f in project.get("features") or []]
+    keyword_fields = {(field_of_keyword(k) or "").lower() for k in project.get("keywords") or []}
+    text = f"{project.get('name') or ''} {project.get('description') or ''}".lower()
+
+    # 1. field match (0-4)
+    if any(f.lower() in fields for f in req_fields):
+        field_score, field_note = 4, "field match"
+    elif any(f.lower() in keyword_fields for f in req_fields):
+        field_score, field_note = 3, "related field"
+    elif not req_fields and any((field_of_keyword(k) or "").lower() in fields for k in req_keywords):
+        field_score, field_note = 1, "field relates to keywords"
+    else:
+        field_score, field_note = 0, "no field match"
+
+    # 2. keyword match (0-4): exact canonical keyword +1, related (same field) +0.5
+    keyword_score = 0.0
+    matched = []
+    for keyword in req_keywords:
+        if keyword.lower() in keywords or re.search(rf"(?<!\w){re.escape(keyword.lower())}(?!\w)", text):
+            keyword_score += 1
+            matched.append(keyword)
+        elif (field_of_keyword(keyword) or "").lower() in fields:
+            keyword_score += 0.5
+    keyword_score = min(keyword_score, 4)
+
+    # 3. feature match (0-2)
+    met = [f for f in req_features if f.lower() in features]
+    feature_score = min(len(met), 2)
+
+    score = field_score + keyword_score + feature_score
+    reasoning = (
+        f"{field_note.capitalize()} ({field_score}pts), "
+        f"keywords {', '.join(repr(k) for k in matched) or 'none'} matched ({keyword_score:g}pts), "
+        f"features {', '.join(repr(f) for f in met) or 'none'} met ({feature_score}pts). "
+        "Scored from precomputed project features."
+    )
+    return float(score), reasoning
@@ -0,0 +1,116 @@
+import itertools
+import os
+
+os.environ.setdefault("SQL_ECHO", "0")
+os.environ.setdefault("FAST_START", "1")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+import ai
+import database
+import main
+from models.capacity import ProjectCapacity, SupervisorCapacity
+from models.group import GroupPreference, StudentGroup
+from models.project import Project
+from models.student import Student
+from models.supervisor import Supervisor
+from services.jobs import JobStore
+from services.reservation import ensure_counters
+from services.rate_limit import MemoryBackend, RateLimiter
+from utils.jwt import create_access_token
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture
+def engine():
+    # a fresh in-memory database per test; StaticPool shares the one
+    # connection between the test and the app's threadpool
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(engine)
+    previous = database.SessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=engine)
+    yield engine
+    database.SessionLocal.configure(bind=previous)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(engine):
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def ai_client(tmp_path, monkeypatch):
+    # fresh job store and rate-limit buckets per test; the lifespan starts the job workers
+    monkeypatch.setattr(ai.rank_jobs, "store", JobStore(str(tmp_path / "rank_jobs.sqlite3")))
+    monkeypatch.setattr(ai, "rate_limiter", RateLimiter(
+        backend=MemoryBackend(), user_rate=0.1, user_burst=5, global_rate=10, global_burst=30,
+    ))
+    with TestClient(ai.app) as client:
+        yield client
+
+
+def auth(user_id: int, role: str):
+    token = create_access_token({"id": user_id, "sub": f"user{user_id}@uts.edu.au", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_supervisor(db, quota=2, **values) -> Supervisor:
+    n = next(_ids)
+    supervisor = Supervisor(first_name="sup", last_name="visor", email=f"sup.visor-{n}@uts.edu.au",
+                            user_group_identifier="supervisor", quota=quota, **values)
+    db.add(supervisor)
+    db.commit()
+    return supervisor
+
+
+def add_project(db, supervisor_id: int, title="Project", **values) -> Project:
+    values = {"description": "", "research_field": "", **values}
+    project = Project(title=title, supervisor_id=supervisor_id, **values)
+    db.add(project)
+    db.commit()
+    return project
+
+
+def add_group(db, name: str, project_id=None, supervisor_id=None) -> StudentGroup:
+    group = StudentGroup(group_name=name, project_id=project_id, supervisor_id=supervisor_id)
+    db.add(group)
+    db.commit()
+    return group
+
+
+def add_student(db, group_id=None) -> Student:
+    n = next(_ids)
+    student = Student(first_name="stu", last_name="dent", email=f"stu.dent-{n}@student.uts.edu.au",
+                      user_group_identifier="student", group_id=group_id)
+    db.add(student)
+    db.commit()
+    return student
+
+
+def prefer(db, group, *projects):
+    db.execute(insert(GroupPreference), [
+        {"group_id": group.id, "project_id": p.id, "rank": rank} for rank, p in enumerate(projects)
+    ])
+    db.commit()
+
+
+def place(db, group, project):
+    # claimed the way reserve() would, so the counters match the rows
+    ensure_counters(db, project.id)
+    db.query(ProjectCapacity).filter_by(project_id=project.id).update({"remaining": ProjectCapacity.remaining - 1})
+    db.query(SupervisorCapacity).filter_by(supervisor_id=project.supervisor_id).update(
+        {"remaining": SupervisorCapacity.remaining - 1})
+    group.project_id, group.supervisor_id = project.id, project.supervisor_id
+    db.commit()
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+import pytest
+
+import ai
+from conftest import auth
+from services.rate_limit import ConcurrencyGate, MemoryBackend, RateLimiter
+
+# scored locally from the precomputed features, so no DeepSeek call is made
+RANK = {
+    "requirements": {"fields": ["Blockchain"], "keywords": [], "features": []},
+    "projects": [{"id": 1, "name": "Ledger", "fields": ["Blockchain"], "keywords": [], "features": []}],
+}
+# nothing in the taxonomy: goes to DeepSeek
+VAGUE = {"user_input": "something interesting with a friendly supervisor"}
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/rank-projects", RANK),
+    ("/analyze-requirements", {"user_input": "I want a blockchain project"}),
+])
+def test_one_users_bucket_does_not_limit_another(ai_client, path, body):
+    alice, bob = auth(1, "student"), auth(2, "student")
+    for _ in range(5):  # the fixture's burst
+        assert ai_client.post(path, json=body, headers=alice).status_code == 200
+
+    limited = ai_client.post(path, json=body, headers=alice)
+    assert limited.status_code == 429
+    # refills at 0.1/s: the next token is 10s away
+    assert limited.headers["retry-after"] == "10"
+    assert ai_client.post(path, json=body, headers=bob).status_code == 200
+
+
+def test_requests_without_a_token_are_rejected(ai_client):
+    assert ai_client.post("/rank-projects", json=RANK).status_code == 401
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    # one call in flight, one waiting; users are distinct so only the gate limits them
+    gate = ConcurrencyGate(limit=1, max_waiting=1, max_wait_seconds=5)
+    monkeypatch.setattr(ai, "deepseek_gate", gate)
+    monkeypatch.setattr(ai, "rate_limiter", RateLimiter(
+        backend=MemoryBackend(), user_rate=1, user_burst=5, global_rate=100, global_burst=100,
+    ))
+    release = asyncio.Event()
+
+    async def slow_deepseek(messages, expect_json=True):
+        await release.wait()
+        return {"fields": ["Cloud Computing"], "keywords": [], "features": []}
+
+    monkeypatch.setattr(ai, "_request_deepseek", slow_deepseek)
+    return gate, release
+
+
+async def _until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_full_wait_queue_is_shed_with_retry_after(gate):
+    gate, release = gate
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=ai.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ai") as client:
+            def analyze(user_id):
+                return client.post("/analyze-requirements", json=VAGUE, headers=auth(user_id, "student"))
+
+            running = asyncio.create_task(analyze(1))
+            await _until(lambda: gate.in_flight == 1)
+            waiting = asyncio.create_task(analyze(2))
+            await _until(lambda: gate.waiting == 1)
+
+            shed = await analyze(3)
+            release.set()
+            return shed, await running, await waiting
+
+    shed, running, waiting = asyncio.run(scenario())
+    assert shed.status_code == 429
+    assert shed.headers["retry-after"] == "5"
+    assert running.status_code == waiting.status_code == 200
+    assert gate.in_flight == gate.waiting == 0
+
+
+def test_waiting_past_the_deadline_is_shed(gate):
+    gate, release = gate
+    gate.max_wait_seconds = 0.05
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=ai.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ai") as client:
+            running = asyncio.create_task(
+                client.post("/analyze-requirements", json=VAGUE, headers=auth(1, "student")))
+            await _until(lambda: gate.in_flight == 1)
+            timed_out = await client.post("/analyze-requirements", json=VAGUE, headers=auth(2, "student"))
+            release.set()
+            return timed_out, await running
+
+    timed_out, running = asyncio.run(scenario())
+    assert timed_out.status_code == 429
+    assert "retry-after" in timed_out.headers
+    assert running.status_code == 200
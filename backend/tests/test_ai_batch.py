@@ -0,0 +1,65 @@
+import asyncio
+
+import ai
+from conftest import auth
+from services.rate_limit import MemoryBackend
+
+# nothing in the taxonomy, so every input goes to DeepSeek
+VAGUE = "something interesting with a friendly supervisor"
+
+
+def _fake_packs(monkeypatch, in_flight=None):
+    async def fake_pack(pack):
+        if in_flight is not None:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+        return {index: {"source": "llm", "fields": [], "keywords": [], "features": []} for index, _ in pack}
+
+    monkeypatch.setattr(ai, "analyze_pack", fake_pack)
+    monkeypatch.setattr(ai, "ANALYZE_BATCH_MAX_ITEMS", 2)
+
+
+def test_batch_is_charged_per_prompt(ai_client, monkeypatch):
+    _fake_packs(monkeypatch)
+    headers = auth(1, "student")
+    # 12 inputs -> 6 prompts: admitted on a full bucket (burst 5), which it leaves in debt
+    response = ai_client.post("/analyze-requirements/batch", json={"inputs": [VAGUE] * 12}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["api_calls"] == 6
+
+    response = ai_client.post("/analyze-requirements/batch", json={"inputs": [VAGUE]}, headers=headers)
+    assert response.status_code == 429
+    # another user still has their own bucket
+    assert ai_client.post("/analyze-requirements/batch", json={"inputs": [VAGUE]},
+                          headers=auth(2, "student")).status_code == 200
+
+
+def test_local_answers_still_cost_one_request(ai_client, monkeypatch):
+    _fake_packs(monkeypatch)
+    headers = auth(1, "student")
+    for _ in range(5):
+        response = ai_client.post("/analyze-requirements/batch",
+                                  json={"inputs": ["I want a blockchain project"]}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["api_calls"] == 0
+    assert ai_client.post("/analyze-requirements/batch", json={"inputs": [VAGUE]}, headers=headers).status_code == 429
+
+
+def test_batch_fan_out_is_bounded(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+    _fake_packs(monkeypatch, in_flight)
+    monkeypatch.setattr(ai, "ANALYZE_BATCH_CONCURRENCY", 3)
+    results, api_calls = asyncio.run(ai.analyze_batch_internal([VAGUE] * 40))
+    assert api_calls == 20
+    assert all(r["source"] == "llm" for r in results)
+    assert in_flight["max"] == 3
+
+
+def test_oversized_cost_waits_for_a_full_bucket():
+    backend = MemoryBackend()
+    buckets = [("u", 1.0, 5.0)]
+    assert backend.take(buckets, cost=1) == 0
+    # four tokens left: not enough to start a request costing more than the bucket holds
+    assert backend.take(buckets, cost=8) > 0
@@ -0,0 +1,35 @@
+from conftest import auth
+
+PROJECTS = [{"id": 1, "name": "Vision", "fields": ["Artificial Intelligence"], "keywords": ["Machine Learning"]}]
+REQUEST = {"requirements": {"fields": ["Artificial Intelligence"], "keywords": [], "features": []}, "projects": PROJECTS}
+
+
+def _submit(client, headers):
+    response = client.post("/rank-projects/jobs", json=REQUEST, headers=headers)
+    assert response.status_code == 202
+    return response.json()["job_id"]
+
+
+def test_owner_can_read_and_cancel_their_job(ai_client):
+    headers = auth(1, "student")
+    job_id = _submit(ai_client, headers)
+    response = ai_client.get(f"/rank-projects/jobs/{job_id}?wait=5", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+    assert ai_client.delete(f"/rank-projects/jobs/{job_id}", headers=headers).status_code == 200
+
+
+def test_other_users_jobs_are_not_found(ai_client):
+    job_id = _submit(ai_client, auth(1, "student"))
+    # same id, other role: a different user
+    for headers in (auth(2, "student"), auth(1, "supervisor")):
+        assert ai_client.get(f"/rank-projects/jobs/{job_id}", headers=headers).status_code == 404
+        assert ai_client.delete(f"/rank-projects/jobs/{job_id}", headers=headers).status_code == 404
+
+
+def test_job_and_metrics_routes_need_a_token(ai_client):
+    job_id = _submit(ai_client, auth(1, "student"))
+    assert ai_client.get(f"/rank-projects/jobs/{job_id}").status_code == 401
+    assert ai_client.delete(f"/rank-projects/jobs/{job_id}").status_code == 401
+    assert ai_client.get("/metrics/analysis").status_code == 401
+    assert ai_client.get("/metrics/analysis", headers=auth(1, "student")).status_code == 200
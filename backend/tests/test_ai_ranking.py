@@ -0,0 +1,46 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import ai
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUIREMENTS = {"fields": ["Artificial Intelligence"], "keywords": ["machine learning"], "features": []}
+
+
+def _rank(monkeypatch, projects):
+    calls = []
+
+    async def fake_deepseek(messages, expect_json=True):
+        calls.append(messages)
+        return {"ranked_projects": [{"id": p["id"], "score": 5, "reasoning": "llm"} for p in projects]}
+
+    monkeypatch.setattr(ai, "call_deepseek_api", fake_deepseek)
+    return asyncio.run(ai.rank_projects_internal(REQUIREMENTS, projects)), calls
+
+
+def test_precomputed_features_are_scored_locally(monkeypatch):
+    projects = [
+        {"id": 1, "name": "Vision", "fields": ["Artificial Intelligence"], "keywords": ["Machine Learning"], "features": []},
+        {"id": 2, "name": "Ledger", "fields": ["Blockchain"], "keywords": [], "features": []},
+    ]
+    ranked, calls = _rank(monkeypatch, projects)
+    assert calls == []
+    assert [p["id"] for p in ranked] == [1, 2]
+
+
+def test_empty_features_go_to_the_llm(monkeypatch):
+    projects = [
+        {"id": 1, "name": "Vision", "fields": ["Artificial Intelligence"], "keywords": ["Machine Learning"], "features": []},
+        {"id": 2, "name": "Untitled", "fields": [], "keywords": [], "features": []},
+    ]
+    ranked, calls = _rank(monkeypatch, projects)
+    assert len(calls) == 1
+    assert {p["reasoning"] for p in ranked} == {"llm"}
+
+
+def test_ai_service_does_not_import_the_database():
+    code = "import sys, ai; print(sorted(m for m in ('database', 'models.project', 'pymysql') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,173 @@
+import pytest
+
+from conftest import add_group, add_project, add_student, add_supervisor, auth, place, prefer
+from models.capacity import ProjectCapacity, SupervisorCapacity
+from models.group import GroupPreference, StudentGroup
+from models.supervisor import Supervisor
+from services import allocation, reservation
+from services.allocation import Allocator, load_allocator
+
+
+def _assignment(db, *groups):
+    db.expire_all()
+    return [db.get(StudentGroup, g.id).project_id for g in groups]
+
+
+def _remaining(db, model, key):
+    db.expire_all()
+    return db.get(model, key).remaining
+
+
+def test_quota_decrease_repairs_through_an_augmenting_path(client, db):
+    s1, s2, s3 = add_supervisor(db, quota=2), add_supervisor(db, quota=1), add_supervisor(db, quota=1)
+    p1, p2 = add_project(db, s1.id, "p1"), add_project(db, s1.id, "p2")
+    p3, p4 = add_project(db, s2.id, "p3"), add_project(db, s3.id, "p4")
+    g1, g2, g3 = add_group(db, "g1"), add_group(db, "g2"), add_group(db, "g3")
+    prefer(db, g1, p3, p1)
+    prefer(db, g2, p2)
+    prefer(db, g3, p3, p4)
+    place(db, g1, p1)
+    place(db, g2, p2)
+    place(db, g3, p3)
+
+    # s1 drops to one group: g1 (on its second choice) has to go, and only
+    # gets a place if g3 moves from p3 on to p4
+    response = client.put("/supervisors/me", json={"quota": 1}, headers=auth(s1.id, "supervisor"))
+    assert response.status_code == 200
+
+    assert _assignment(db, g1, g2, g3) == [p3.id, p2.id, p4.id]
+    assert _remaining(db, SupervisorCapacity, s1.id) == 0
+    assert _remaining(db, SupervisorCapacity, s2.id) == 0
+    assert _remaining(db, SupervisorCapacity, s3.id) == 0
+    assert _remaining(db, ProjectCapacity, p1.id) == 1
+    assert _remaining(db, ProjectCapacity, p4.id) == 0
+
+
+def test_project_deletion_rehouses_displaced_groups(client, db):
+    s1, s2 = add_supervisor(db, quota=2), add_supervisor(db, quota=1)
+    p1, p2, p6 = add_project(db, s1.id, "p1"), add_project(db, s1.id, "p2"), add_project(db, s2.id, "p6")
+    g1, g2 = add_group(db, "g1"), add_group(db, "g2")
+    prefer(db, g1, p1, p6)
+    prefer(db, g2, p2, p1)
+    place(db, g1, p1)
+    place(db, g2, p2)
+
+    # g2 loses p2; it can only have p1 if g1 moves on to p6
+    response = client.delete(f"/supervisors/{s1.id}/projects/{p2.id}", headers=auth(s1.id, "supervisor"))
+    assert response.status_code == 204
+
+    assert _assignment(db, g1, g2) == [p6.id, p1.id]
+    assert _remaining(db, SupervisorCapacity, s1.id) == 1
+    assert _remaining(db, SupervisorCapacity, s2.id) == 0
+    assert _remaining(db, ProjectCapacity, p1.id) == 0
+
+
+def test_preference_change_moves_only_the_affected_groups(client, db):
+    s1 = add_supervisor(db, quota=3)
+    p1, p2, p3 = (add_project(db, s1.id, name) for name in ("p1", "p2", "p3"))
+    g1, g2, g3 = add_group(db, "g1"), add_group(db, "g2"), add_group(db, "g3")
+    student = add_student(db, group_id=g1.id)
+    prefer(db, g2, p2)
+    prefer(db, g3, p3)
+
+    assert client.post("/groups/allocation", headers=auth(s1.id, "supervisor")).json() == {
+        "moved": [{"group_id": g2.id, "project_id": p2.id}, {"group_id": g3.id, "project_id": p3.id}]
+    }
+    response = client.put(f"/groups/{g1.id}/preferences", json={"project_ids": [p2.id, p1.id]},
+                          headers=auth(student.id, "student"))
+    assert response.json() == {"moved": [{"group_id": g1.id, "project_id": p1.id}]}
+    assert _assignment(db, g1, g2, g3) == [p1.id, p2.id, p3.id]
+    assert _remaining(db, SupervisorCapacity, s1.id) == 0
+
+    other = client.put(f"/groups/{g2.id}/preferences", json={"project_ids": [p1.id]}, headers=auth(student.id, "student"))
+    assert other.status_code == 403
+
+
+def test_long_displacement_chain_does_not_recurse():
+    # group g holds project g and would also take g + 1; a newcomer wanting
+    # project 0 can only get in if every group moves one place along
+    n = 2000
+    allocator = Allocator(
+        preferences={g: [g, g + 1] for g in range(n)},
+        project_supervisor={p: 1 for p in range(n + 1)},
+        quotas={1: n + 1},
+        project_capacity={p: 1 for p in range(n + 1)},
+        assignment={g: g for g in range(n)},
+    )
+    changes = allocator.update_preferences(n, [0])
+    assert changes == {g: g + 1 for g in range(n)} | {n: 0}
+    assert allocator.assignment[n - 1] == n
+
+
+def test_allocator_loads_only_the_reachable_part(db):
+    s1, s2 = add_supervisor(db, quota=1), add_supervisor(db, quota=1)
+    p1, p2 = add_project(db, s1.id, "p1"), add_project(db, s2.id, "p2")
+    g1, g2 = add_group(db, "g1"), add_group(db, "g2")
+    prefer(db, g1, p1)
+    prefer(db, g2, p2)
+    place(db, g2, p2)
+
+    allocator = load_allocator(db, groups=[g1.id])
+    assert allocator.project_supervisor == {p1.id: s1.id}
+    assert allocator.preferences == {g1.id: [p1.id]}
+    assert allocator.assignment == {}
+
+
+@pytest.fixture
+def lost_race(monkeypatch):
+    # every move collides with a concurrent reservation
+    def collide(db, changes):
+        db.rollback()
+        return False
+
+    monkeypatch.setattr(allocation, "apply_assignment", collide)
+    monkeypatch.setattr(reservation, "BACKOFF_SECONDS", 0)
+
+
+def test_preferences_are_not_stored_when_the_repair_conflicts(client, db, lost_race):
+    s1 = add_supervisor(db, quota=1)
+    p1 = add_project(db, s1.id, "p1")
+    g1 = add_group(db, "g1")
+    student = add_student(db, group_id=g1.id)
+
+    response = client.put(f"/groups/{g1.id}/preferences", json={"project_ids": [p1.id]},
+                          headers=auth(student.id, "student"))
+    assert response.status_code == 503
+    assert db.query(GroupPreference).filter_by(group_id=g1.id).count() == 0
+    assert _assignment(db, g1) == [None]
+
+
+def test_quota_is_not_changed_when_the_repair_conflicts(client, db, lost_race):
+    s1 = add_supervisor(db, quota=2)
+    p1, p2 = add_project(db, s1.id, "p1"), add_project(db, s1.id, "p2")
+    g1, g2 = add_group(db, "g1"), add_group(db, "g2")
+    place(db, g1, p1)
+    place(db, g2, p2)
+
+    response = client.put("/supervisors/me", json={"quota": 1}, headers=auth(s1.id, "supervisor"))
+    assert response.status_code == 503
+    db.expire_all()
+    assert db.get(Supervisor, s1.id).quota == 2
+    assert _assignment(db, g1, g2) == [p1.id, p2.id]
+
+
+def test_repair_is_planned_again_after_a_lost_race(client, db, monkeypatch):
+    s1 = add_supervisor(db, quota=1)
+    p1 = add_project(db, s1.id, "p1")
+    g1 = add_group(db, "g1")
+    student = add_student(db, group_id=g1.id)
+    attempts = []
+
+    def collide_once(db, changes):
+        attempts.append(changes)
+        if len(attempts) == 1:
+            db.rollback()
+            return False
+        return reservation.apply_assignment(db, changes)
+
+    monkeypatch.setattr(allocation, "apply_assignment", collide_once)
+    response = client.put(f"/groups/{g1.id}/preferences", json={"project_ids": [p1.id]},
+                          headers=auth(student.id, "student"))
+    assert response.json() == {"moved": [{"group_id": g1.id, "project_id": p1.id}]}
+    assert len(attempts) == 2
+    assert _assignment(db, g1) == [p1.id]
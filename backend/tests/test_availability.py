@@ -0,0 +1,95 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import add_project, add_supervisor, auth
+from services import availability
+from utils.interval_tree import IntervalTree
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot():
+    availability.invalidate_availability()
+    yield
+    availability.invalidate_availability()
+
+
+def test_tree_queries_match_a_scan():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(400):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 80), i))
+    tree = IntervalTree(intervals)
+    for _ in range(200):
+        lo = rng.randint(-50, 1050)
+        hi = lo + rng.randint(0, 200)
+        by_start = sorted(intervals, key=lambda item: (item[0], item[1]))
+        assert tree.within(lo, hi) == [v for s, e, v in by_start if s >= lo and e <= hi]
+        assert tree.overlapping(lo, hi) == [v for s, e, v in by_start if s <= hi and e >= lo]
+
+
+def test_within_skips_subtrees_that_end_too_late():
+    # one short interval among many long ones starting in the same window
+    intervals = [(i, i + 10_000, i) for i in range(1024)] + [(500, 501, "short")]
+    tree = IntervalTree(intervals)
+    visits = []
+    ends = tree._min_end
+    tree._min_end = _Recorder(ends, visits)
+    assert tree.within(0, 2000) == ["short"]
+    assert len(visits) < 60
+
+
+class _Recorder(list):
+    def __init__(self, values, visits):
+        super().__init__(values)
+        self.visits = visits
+
+    def __getitem__(self, index):
+        self.visits.append(index)
+        return super().__getitem__(index)
+
+
+def test_aware_windows_are_compared_in_utc(client, db):
+    supervisor_id = add_supervisor(db).id
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    # stored naive UTC: 10:00-12:00 UTC tomorrow
+    day = (now + timedelta(days=1)).replace(hour=10, minute=0, second=0)
+    project_id = add_project(db, supervisor_id, project_start_time=day,
+                             project_end_time=day + timedelta(hours=2)).id
+    headers = auth(supervisor_id, "supervisor")
+
+    # 19:00-23:00 at +10:00 is 09:00-13:00 UTC, which contains the project
+    sydney = timezone(timedelta(hours=10))
+    start = day.replace(hour=19, tzinfo=sydney) - timedelta(hours=1)
+    params = {"start": start.isoformat(), "end": (start + timedelta(hours=4)).isoformat()}
+    response = client.get("/projects/availability/within", params=params, headers=headers)
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()["projects"]] == [project_id]
+
+    # the same wall-clock hours read as UTC miss it
+    params = {"start": start.replace(tzinfo=None).isoformat(), "end": (start + timedelta(hours=4)).replace(tzinfo=None).isoformat()}
+    assert client.get("/projects/availability/within", params=params, headers=headers).json()["total"] == 0
+
+
+@pytest.fixture
+def sydney_local_time(monkeypatch):
+    # a server clock that is not UTC
+    monkeypatch.setenv("TZ", "Etc/GMT-10")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_active_defaults_to_utc_now(client, db, sydney_local_time):
+    supervisor_id = add_supervisor(db).id
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    running = add_project(db, supervisor_id, project_start_time=now - timedelta(minutes=30),
+                          project_end_time=now + timedelta(minutes=30)).id
+    response = client.get("/projects/availability/active", headers=auth(supervisor_id, "supervisor"))
+    assert [p["id"] for p in response.json()["projects"]] == [running]
+    horizon = availability._hot_snapshot().horizon
+    assert abs(horizon - (now - timedelta(days=availability.AVAILABILITY_HOT_DAYS))) < timedelta(minutes=1)
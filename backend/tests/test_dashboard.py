@@ -0,0 +1,29 @@
+from conftest import add_group, add_project, add_supervisor, auth
+from utils.query_stats import assert_query_budget
+
+
+def test_dashboard_is_three_queries_however_large(client, db):
+    supervisor_id = add_supervisor(db, quota=5).id
+    project_ids = [add_project(db, supervisor_id, title=f"P{i}").id for i in range(6)]
+    for i, project_id in enumerate(project_ids[:3]):
+        add_group(db, f"g{i}", project_id=project_id, supervisor_id=supervisor_id)
+    add_group(db, "g-extra", project_id=project_ids[0], supervisor_id=supervisor_id)
+    headers = auth(supervisor_id, "supervisor")
+
+    with assert_query_budget(3):
+        response = client.get("/supervisors/me/dashboard", headers=headers)
+
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["project_count"] == 6
+    assert dashboard["group_count"] == 4
+    assert dashboard["assigned_group_count"] == 4
+    assert dashboard["remaining_quota"] == 1
+    counts = {p["id"]: p["group_count"] for p in dashboard["projects"]}
+    assert counts[project_ids[0]] == 2 and counts[project_ids[5]] == 0
+
+
+def test_dashboard_of_unknown_supervisor_is_404(client, db):
+    with assert_query_budget(1):
+        response = client.get("/supervisors/me/dashboard", headers=auth(999, "supervisor"))
+    assert response.status_code == 404
@@ -0,0 +1,31 @@
+import database
+import main
+from conftest import add_project, add_supervisor, auth
+
+
+def test_export_streams_from_the_request_session(client, db):
+    supervisor = add_supervisor(db)
+    add_project(db, supervisor.id, title="Alpha", project_grade="HD")
+    add_project(db, supervisor.id, title="Beta")
+    other = add_supervisor(db)
+    add_project(db, other.id, title="Gamma", project_grade="P")
+
+    sessions = []
+
+    def tracked_read_db():
+        for session in database.get_read_db():
+            sessions.append(session)
+            yield session
+
+    main.app.dependency_overrides[database.get_read_db] = tracked_read_db
+    try:
+        response = client.get(f"/supervisors/{supervisor.id}/grades/export", headers=auth(supervisor.id, "supervisor"))
+    finally:
+        main.app.dependency_overrides.pop(database.get_read_db)
+
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "project_id,title,project_grade"
+    assert [line.split(",")[1:] for line in lines[1:]] == [["Alpha", "HD"], ["Beta", ""]]
+    assert len(sessions) == 1
+    assert not sessions[0].in_transaction()
@@ -0,0 +1,81 @@
+import pytest
+from scipy import sparse
+
+from conftest import add_student, add_supervisor, auth
+from models.group import StudentGroup
+from models.student import Student
+from services.group_formation import balanced_clusters
+
+
+def _sizes(n, group_size):
+    matrix = sparse.random(n, 12, density=0.3, format="csr", random_state=n, dtype="float32")
+    labels = balanced_clusters(matrix, group_size)
+    return sorted((labels == label).sum() for label in set(labels.tolist()))
+
+
+@pytest.mark.parametrize("n, group_size, expected", [
+    (1, 4, [1]),
+    (4, 4, [4]),
+    (5, 4, [2, 3]),
+    (7, 3, [2, 2, 3]),
+    (9, 4, [3, 3, 3]),
+    (10, 4, [3, 3, 4]),
+    (13, 5, [4, 4, 5]),
+])
+def test_small_cohorts_get_balanced_sizes(n, group_size, expected):
+    assert _sizes(n, group_size) == expected
+
+
+def test_sizes_never_exceed_group_size_and_differ_by_at_most_one():
+    for n in range(1, 40):
+        for group_size in range(2, 7):
+            sizes = _sizes(n, group_size)
+            assert sum(sizes) == n
+            assert len(sizes) == -(-n // group_size)
+            assert max(sizes) <= group_size
+            assert max(sizes) - min(sizes) <= 1
+
+
+def _cohort(db, n):
+    students = [add_student(db) for _ in range(n)]
+    fields = ["Blockchain", "Healthcare"]
+    return [
+        {"student_id": s.id, "fields": [fields[i % 2]], "keywords": [], "features": []}
+        for i, s in enumerate(students)
+    ]
+
+
+def test_formed_groups_are_stored_and_a_second_run_is_rejected(client, db):
+    headers = auth(add_supervisor(db).id, "supervisor")
+    cohort = _cohort(db, 8)
+
+    response = client.post("/groups/formation", json={"students": cohort, "group_size": 4, "name_prefix": "s1"},
+                           headers=headers)
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert sorted(g["group_name"] for g in groups) == ["s1-1", "s1-2"]
+
+    db.expire_all()
+    for group in groups:
+        assert db.get(StudentGroup, group["id"]).group_name == group["group_name"]
+        assert {db.get(Student, sid).group_id for sid in group["student_ids"]} == {group["id"]}
+    # interests drive the split: each group shares one field
+    by_student = {s["student_id"]: s["fields"][0] for s in cohort}
+    assert all(len({by_student[sid] for sid in g["student_ids"]}) == 1 for g in groups)
+
+    again = client.post("/groups/formation", json={"students": cohort, "group_size": 4}, headers=headers)
+    assert again.status_code == 409
+    assert db.query(StudentGroup).count() == 2
+
+    # the name prefix of an earlier run cannot be reused either
+    other = client.post("/groups/formation", json={"students": _cohort(db, 2), "name_prefix": "s1"},
+                        headers=headers)
+    assert other.status_code == 409
+
+
+def test_formation_is_for_supervisors(client, db):
+    cohort = _cohort(db, 2)
+    response = client.post("/groups/formation", json={"students": cohort},
+                           headers=auth(cohort[0]["student_id"], "student"))
+    assert response.status_code == 403
+    assert db.query(StudentGroup).count() == 0
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects import mysql, sqlite
+
+from conftest import add_project, add_supervisor, auth
+from models.project import Project
+
+
+def _etag(client, headers):
+    response = client.get("/supervisors/me/projects", headers=headers)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+def test_updated_at_is_written_with_the_utc_clock():
+    stmt = update(Project).values(title="x")
+    assert "updated_at=(UTC_TIMESTAMP())" in str(stmt.compile(dialect=mysql.dialect()))
+    assert "updated_at=CURRENT_TIMESTAMP" in str(stmt.compile(dialect=sqlite.dialect()))
+
+
+def test_last_modified_is_the_utc_write_time(client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    response = client.get("/supervisors/me", headers=headers)
+
+    last_modified = parsedate_to_datetime(response.headers["last-modified"])
+    assert abs(last_modified - datetime.now(timezone.utc)) < timedelta(minutes=1)
+
+    again = client.get("/supervisors/me", headers={**headers, "If-Modified-Since": response.headers["last-modified"]})
+    assert again.status_code == 304
+
+
+def test_project_list_etag_follows_every_kind_of_update(client, db):
+    supervisor_id = add_supervisor(db).id
+    p1, p2 = add_project(db, supervisor_id, "one").id, add_project(db, supervisor_id, "two").id
+    headers = auth(supervisor_id, "supervisor")
+    seen = [_etag(client, headers)]
+    assert _etag(client, headers) == seen[-1]
+
+    # single row
+    client.put(f"/supervisors/{supervisor_id}/projects/{p1}", json={"title": "ONE"}, headers=headers)
+    seen.append(_etag(client, headers))
+    # batch patch by primary key
+    client.patch(f"/supervisors/{supervisor_id}/projects/batch",
+                 json={"projects": [{"id": p1, "title": "uno"}, {"id": p2, "title": "dos"}]}, headers=headers)
+    seen.append(_etag(client, headers))
+    # set-based UPDATE ... CASE
+    client.post(f"/supervisors/{supervisor_id}/grades", json={"grades": [{"project_id": p2, "grade": "HD"}]},
+                headers=headers)
+    seen.append(_etag(client, headers))
+
+    assert len(set(seen)) == len(seen)
+    stale = client.get("/supervisors/me/projects", headers={**headers, "If-None-Match": seen[0]})
+    assert stale.status_code == 200
+    assert [p["title"] for p in stale.json()] == ["uno", "dos"]
+
+
+def test_me_answers_if_none_match(client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    response = client.get("/api/me", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    assert client.get("/api/me", headers={**headers, "If-None-Match": etag}).status_code == 304
+    assert client.get("/api/me", headers={**headers, "If-None-Match": f'"other", {etag}'}).status_code == 304
+    # another user's token carries other claims, so the cached copy is not theirs
+    other = auth(supervisor_id + 1, "supervisor")
+    assert client.get("/api/me", headers={**other, "If-None-Match": etag}).status_code == 200
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from services.jobs import CANCELLED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobStore, QueueFull
+
+
+def _queue(store, runner, **options):
+    return JobQueue(kind="test", runner=runner, store=store, workers=1, **options)
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_starting_worker_leaves_leased_jobs_alone(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    runs = []
+
+    async def slow(payload):
+        runs.append(payload["n"])
+        await asyncio.sleep(0.3)
+        return payload["n"]
+
+    async def scenario():
+        first = _queue(store, slow)
+        await first.start()
+        job_id = first.submit({"n": 1})
+        await _until(lambda: store.get(job_id)["status"] == RUNNING)
+
+        # a second uvicorn worker (or the new one in a rolling restart) comes up
+        second = _queue(store, slow)
+        await second.start()
+        job = await first.wait(job_id, 2)
+        await second.stop()
+        await first.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert runs == [1]
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("test", {"n": 7}, priority=0)
+    # a worker claimed it and died without renewing
+    assert store.claim(job_id, "dead-worker", lease_seconds=0.05)
+
+    async def quick(payload):
+        return payload["n"]
+
+    async def scenario():
+        worker = _queue(store, quick, lease_seconds=0.15)
+        await worker.start()
+        job = await worker.wait(job_id, 2)
+        await worker.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == 7
+    # the dead worker cannot overwrite the new owner's result
+    assert not store.transition(job_id, QUEUED, only_from=(RUNNING,), owner="dead-worker")
+
+
+def test_stop_releases_interrupted_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def forever(payload):
+        await asyncio.Event().wait()
+
+    async def scenario():
+        worker = _queue(store, forever)
+        await worker.start()
+        job_id = worker.submit({})
+        await _until(lambda: store.get(job_id)["status"] == RUNNING)
+        await worker.stop()
+        return job_id
+
+    job_id = asyncio.run(scenario())
+    assert store.requeue_expired() == [(job_id, 0)]
+    assert store.get(job_id)["status"] == QUEUED
+
+
+def test_max_pending_counts_the_shared_store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def never_run(payload):
+        raise AssertionError("no workers")
+
+    async def scenario():
+        # two processes accepting submissions, no workers draining them
+        first = JobQueue(kind="test", runner=never_run, store=store, workers=0, max_pending=2)
+        second = JobQueue(kind="test", runner=never_run, store=store, workers=0, max_pending=2)
+        await first.start()
+        await second.start()
+        first.submit({})
+        second.submit({})
+        with pytest.raises(QueueFull):
+            first.submit({})
+        with pytest.raises(QueueFull):
+            second.submit({})
+        # finished jobs no longer count
+        assert first.cancel(store.queued()[0][0])
+        second.submit({})
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+    assert len(store.queued()) == 2
+
+
+def test_cancel_reaches_a_job_running_in_another_process(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def forever(payload):
+        await asyncio.Event().wait()
+
+    async def scenario():
+        runner = _queue(store, forever, lease_seconds=0.15)
+        other = JobQueue(kind="test", runner=forever, store=store, workers=0, lease_seconds=0.15)
+        await runner.start()
+        await other.start()
+        job_id = runner.submit({})
+        await _until(lambda: store.get(job_id)["status"] == RUNNING)
+
+        assert other.cancel(job_id)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        job = await other.wait(job_id, 5)
+        elapsed = loop.time() - started
+        await other.stop()
+        await runner.stop()
+        return job, elapsed, other
+
+    job, elapsed, other = asyncio.run(scenario())
+    assert job["status"] == CANCELLED
+    assert elapsed < 1
+    # the long-poll was woken by the heartbeat, and its event dropped
+    assert other._done == {}
+
+
+def test_cancelled_orphan_is_not_requeued(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("test", {}, priority=0)
+    assert store.claim(job_id, "dead-worker", lease_seconds=0)
+    assert store.request_cancel(job_id)
+
+    assert store.requeue_expired() == []
+    assert store.get(job_id)["status"] == CANCELLED
+
+
+def test_long_poll_sees_a_job_finished_elsewhere(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def quick(payload):
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def scenario():
+        runner = _queue(store, quick)
+        other = JobQueue(kind="test", runner=quick, store=store, workers=0, lease_seconds=0.15)
+        await runner.start()
+        await other.start()
+        job_id = runner.submit({})
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        job = await other.wait(job_id, 5)
+        elapsed = loop.time() - started
+        await other.stop()
+        await runner.stop()
+        return job, elapsed, other
+
+    job, elapsed, other = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert elapsed < 1
+    assert other._done == {}
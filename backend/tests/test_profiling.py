@@ -0,0 +1,47 @@
+import json
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.profiling import INDEX, ProfilingMiddleware
+
+
+def _client(directory, writers):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    class RecordingMiddleware(ProfilingMiddleware):
+        def _write(self, *args):
+            writers.append(threading.get_ident())
+            super()._write(*args)
+
+    app.add_middleware(RecordingMiddleware, directory=str(directory), sample_rate=0, token="s3cret", keep=2)
+    return TestClient(app)
+
+
+def test_profiles_are_written_off_the_event_loop(tmp_path):
+    writers, loop_threads = [], []
+    client = _client(tmp_path, writers)
+    with client:
+        client.portal.call(lambda: loop_threads.append(threading.get_ident()))
+        for _ in range(3):
+            assert client.get("/ping", headers={"X-Profile": "s3cret"}).status_code == 200
+
+    assert len(writers) == 3
+    assert loop_threads[0] not in writers
+    entries = [json.loads(line) for line in (tmp_path / INDEX).read_text().splitlines()]
+    # rotated down to `keep`
+    assert len(entries) == 2
+    assert all((tmp_path / (e["name"] + ".prof")).exists() for e in entries)
+
+
+def test_wrong_token_is_not_profiled(tmp_path):
+    writers = []
+    client = _client(tmp_path, writers)
+    assert client.get("/ping", headers={"X-Profile": "s3cre"}).status_code == 200
+    assert client.get("/ping").status_code == 200
+    assert writers == []
@@ -0,0 +1,118 @@
+from conftest import add_group, add_project, add_supervisor, auth, place, prefer
+from models.capacity import ProjectCapacity, SupervisorCapacity
+from models.group import StudentGroup
+from models.project import Project
+
+
+def _new(title):
+    return {
+        "title": title,
+        "description": "",
+        "research_field": "",
+        "group_or_individual": "group",
+        "project_start_time": "2026-02-01T00:00:00",
+        "project_end_time": "2026-06-01T00:00:00",
+    }
+
+
+def _titles(db, ids):
+    db.expire_all()
+    return [db.get(Project, i).title for i in ids]
+
+
+def test_batch_create_returns_ids_in_input_order(client, db):
+    supervisor_id = add_supervisor(db).id
+    titles = ["zeta", "alpha", "mu", "beta"]
+    response = client.post(f"/supervisors/{supervisor_id}/projects/batch",
+                           json={"projects": [_new(t) for t in titles]},
+                           headers=auth(supervisor_id, "supervisor"))
+    assert response.status_code == 200
+    ids = response.json()["ids"]
+    assert _titles(db, ids) == titles
+    assert {p.supervisor_id for p in db.query(Project)} == {supervisor_id}
+
+
+def test_batch_create_for_someone_else_is_403(client, db):
+    owner_id, other_id = add_supervisor(db).id, add_supervisor(db).id
+    response = client.post(f"/supervisors/{owner_id}/projects/batch",
+                           json={"projects": [_new("x")]}, headers=auth(other_id, "supervisor"))
+    assert response.status_code == 403
+    assert db.query(Project).count() == 0
+
+
+def test_batch_patch_updates_every_row(client, db):
+    supervisor_id = add_supervisor(db).id
+    p1, p2 = add_project(db, supervisor_id, "one").id, add_project(db, supervisor_id, "two").id
+    response = client.patch(f"/supervisors/{supervisor_id}/projects/batch",
+                            json={"projects": [{"id": p2, "title": "TWO"}, {"id": p1, "title": "ONE"}]},
+                            headers=auth(supervisor_id, "supervisor"))
+    assert response.json() == {"ids": [p2, p1]}
+    assert _titles(db, [p1, p2]) == ["ONE", "TWO"]
+
+
+def test_batch_patch_is_all_or_nothing(client, db):
+    owner_id, other_id = add_supervisor(db).id, add_supervisor(db).id
+    mine = add_project(db, owner_id, "mine").id
+    theirs = add_project(db, other_id, "theirs").id
+    response = client.patch(f"/supervisors/{owner_id}/projects/batch",
+                            json={"projects": [{"id": mine, "title": "changed"},
+                                               {"id": theirs, "title": "changed"},
+                                               {"id": 999, "title": "changed"}]},
+                            headers=auth(owner_id, "supervisor"))
+    assert response.status_code == 404
+    assert str([theirs, 999]) in response.json()["detail"]
+    assert _titles(db, [mine, theirs]) == ["mine", "theirs"]
+
+
+def test_batch_patch_of_another_supervisors_projects_is_rejected(client, db):
+    owner_id, other_id = add_supervisor(db).id, add_supervisor(db).id
+    project_id = add_project(db, owner_id, "mine").id
+    # through their own path: none of the ids are theirs
+    response = client.patch(f"/supervisors/{other_id}/projects/batch",
+                            json={"projects": [{"id": project_id, "title": "hijacked"}]},
+                            headers=auth(other_id, "supervisor"))
+    assert response.status_code == 404
+    # through the owner's path: the token is not the owner's
+    response = client.patch(f"/supervisors/{owner_id}/projects/batch",
+                            json={"projects": [{"id": project_id, "title": "hijacked"}]},
+                            headers=auth(other_id, "supervisor"))
+    assert response.status_code == 403
+    assert _titles(db, [project_id]) == ["mine"]
+
+
+def test_batch_delete_is_all_or_nothing(client, db):
+    owner_id, other_id = add_supervisor(db).id, add_supervisor(db).id
+    mine = add_project(db, owner_id, "mine").id
+    theirs = add_project(db, other_id, "theirs").id
+    response = client.request("DELETE", f"/supervisors/{owner_id}/projects/batch",
+                              json={"ids": [mine, theirs]}, headers=auth(owner_id, "supervisor"))
+    assert response.status_code == 404
+    assert str([theirs]) in response.json()["detail"]
+    db.expire_all()
+    assert db.get(Project, mine) is not None and db.get(Project, theirs) is not None
+
+
+def test_batch_delete_releases_capacity_and_rehouses_groups(client, db):
+    s1, s2 = add_supervisor(db, quota=2), add_supervisor(db, quota=1)
+    p1, p2 = add_project(db, s1.id, "p1"), add_project(db, s1.id, "p2")
+    p3 = add_project(db, s2.id, "p3")
+    g1, g2 = add_group(db, "g1"), add_group(db, "g2")
+    prefer(db, g1, p1, p3)
+    prefer(db, g2, p2)
+    place(db, g1, p1)
+    place(db, g2, p2)
+    s1_id, p1_id, p2_id, p3_id, g1_id, g2_id = s1.id, p1.id, p2.id, p3.id, g1.id, g2.id
+
+    response = client.request("DELETE", f"/supervisors/{s1_id}/projects/batch",
+                              json={"ids": [p1_id, p2_id]}, headers=auth(s1_id, "supervisor"))
+    assert response.json() == {"ids": [p1_id, p2_id]}
+
+    db.expire_all()
+    assert db.get(Project, p1_id) is None and db.get(Project, p2_id) is None
+    # g1 moves on to its second choice; g2 has nowhere else to go
+    assert db.get(StudentGroup, g1_id).project_id == p3_id
+    assert db.get(StudentGroup, g2_id).project_id is None
+    assert db.get(SupervisorCapacity, s1_id).remaining == 2
+    assert db.get(SupervisorCapacity, s2.id).remaining == 0
+    assert db.get(ProjectCapacity, p3_id).remaining == 0
+    assert db.get(ProjectCapacity, p1_id) is None
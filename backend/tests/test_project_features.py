@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta, timezone
+
+from conftest import add_project, add_supervisor
+from models.project_feature import ProjectFeature
+from services.project_features import refresh_features
+
+
+def test_analyzed_at_is_naive_utc(db):
+    supervisor_id = add_supervisor(db).id
+    project = add_project(db, supervisor_id, "Network intrusion detection", research_field="Cybersecurity")
+    assert refresh_features(db, [project], force=True) == 1
+    db.commit()
+
+    analyzed_at = db.get(ProjectFeature, project.id).analyzed_at
+    assert analyzed_at.tzinfo is None
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert abs(analyzed_at - now) < timedelta(minutes=1)
+    # unchanged source text is not analyzed again
+    assert refresh_features(db, [project]) == 0
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from conftest import add_project, add_supervisor, auth
+from utils.query_stats import QueryStatsMiddleware, assert_query_budget, statement_shape, track_queries
+
+
+def test_statement_shape_folds_literals_and_in_lists():
+    assert statement_shape("SELECT * FROM t WHERE id = 1 AND name = 'x'") == \
+        statement_shape("SELECT * FROM t WHERE id = 2 AND name = 'y'")
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (?)"
+
+
+def test_my_projects_stays_within_budget(client, db):
+    supervisor_id = add_supervisor(db).id
+    for i in range(5):
+        add_project(db, supervisor_id, title=f"P{i}")
+    headers = auth(supervisor_id, "supervisor")
+
+    # the ETag stamp, then the list: two statements however many projects
+    with assert_query_budget(2):
+        response = client.get("/supervisors/me/projects", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
+    with assert_query_budget(1):
+        response = client.get("/supervisors/me/projects", headers={**headers, "If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+
+def test_budget_catches_a_per_row_query(client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    with pytest.raises(AssertionError, match="statement ran 3 times"):
+        with assert_query_budget(10):
+            for _ in range(3):
+                client.get("/supervisors/me", headers=headers)
+
+
+def test_middleware_reports_query_headers(engine, db):
+    supervisor_id = add_supervisor(db).id
+    app = main.create_app()
+    app.add_middleware(QueryStatsMiddleware)
+    with track_queries() as stats:
+        response = TestClient(app).get("/supervisors/me", headers=auth(supervisor_id, "supervisor"))
+    assert response.status_code == 200
+    assert int(response.headers["x-query-count"]) == stats.count == 2
+    assert response.headers["x-query-max-repeat"] == "1"
@@ -0,0 +1,92 @@
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import database
+import main
+from conftest import add_project, add_supervisor, auth
+from services import availability
+from utils.last_writes import MemoryLastWrites, SQLiteLastWrites
+
+
+@pytest.fixture
+def routed_client(engine, monkeypatch):
+    # an empty replica: whatever a read finds there proves it was routed there
+    replica = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    database.Base.metadata.create_all(replica)
+    monkeypatch.setattr(database, "replica_engines", [replica])
+    monkeypatch.setattr(database, "_next_replica", itertools.cycle([0]))
+    monkeypatch.setattr(database, "last_writes", MemoryLastWrites())
+    availability.invalidate_availability()
+    yield TestClient(main.create_app())
+    availability.invalidate_availability()
+    replica.dispose()
+
+
+def test_bearer_client_reads_its_writes_without_cookies(routed_client, db):
+    supervisor_id = add_supervisor(db).id
+    other_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+
+    assert routed_client.get("/supervisors/me", headers=headers).status_code == 404  # replica
+    assert routed_client.put("/supervisors/me", json={"faculty": "FEIT"}, headers=headers).status_code == 200
+    routed_client.cookies.clear()
+
+    response = routed_client.get("/supervisors/me", headers=headers)
+    assert response.status_code == 200  # primary
+    assert response.json()["faculty"] == "FEIT"
+    # only the writer is pinned
+    assert routed_client.get("/supervisors/me", headers=auth(other_id, "supervisor")).status_code == 404
+
+
+def test_cookie_still_pins_the_session(routed_client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    response = routed_client.put("/supervisors/me", json={"faculty": "FEIT"}, headers=headers)
+    assert database.STICKY_COOKIE in response.cookies
+    database.last_writes = MemoryLastWrites()  # forget the user: only the cookie is left
+    assert routed_client.get("/supervisors/me", headers=headers).status_code == 200
+
+
+def test_shared_snapshot_is_loaded_from_the_primary(routed_client, db):
+    supervisor_id = add_supervisor(db).id
+    soon = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    add_project(db, supervisor_id, project_start_time=soon, project_end_time=soon + timedelta(days=30))
+
+    response = routed_client.get("/projects/availability/overlapping", headers=auth(supervisor_id, "supervisor"),
+                                 params={"start": soon.isoformat(), "end": (soon + timedelta(days=1)).isoformat()})
+    assert response.status_code == 200
+    # the request itself read from the (empty) replica, the tree did not
+    assert len(availability._snapshot.tree) == 1
+
+
+def test_sticky_request_bypasses_the_cached_tree(routed_client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    soon = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    params = {"start": soon.isoformat(), "end": (soon + timedelta(days=1)).isoformat()}
+    routed_client.get("/projects/availability/overlapping", headers=headers, params=params)
+
+    # written through another worker: this process's tree does not know about it
+    add_project(db, supervisor_id, project_start_time=soon, project_end_time=soon + timedelta(days=30))
+    assert routed_client.get("/projects/availability/overlapping", headers=headers, params=params).json()["total"] == 0
+
+    routed_client.put("/supervisors/me", json={"faculty": "FEIT"}, headers=headers)
+    assert routed_client.get("/projects/availability/overlapping", headers=headers, params=params).json()["total"] == 1
+
+
+def test_sqlite_last_writes_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "sticky.sqlite3")
+    writer, reader = SQLiteLastWrites(path), SQLiteLastWrites(path)
+    until = time.time() + 60
+    writer.record("student:1", until)
+    writer.record("student:1", until - 30)  # an older deadline never shortens it
+    writer.record("student:3", time.time() - 1)  # already over: swept
+    assert reader.sticky_until("student:1") == until
+    assert reader.sticky_until("student:2") == 0.0
+    assert reader.sticky_until("student:3") == 0.0
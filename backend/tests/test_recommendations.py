@@ -0,0 +1,133 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import add_project, add_student, add_supervisor, auth
+from crud import supervisor
+from database import SessionLocal
+from schemas.supervisor import ProjectUpdate
+from services import project_features, recommendations
+from utils.jwt import decode_token
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def ai_calls(monkeypatch):
+    calls = []
+
+    def fake_call(path, body, token):
+        calls.append((path, body, decode_token(token)))
+        if path == "/analyze-requirements":
+            return {"fields": ["Blockchain"], "keywords": ["Smart Contracts"], "features": []}
+        return {"ranked_projects": [
+            {"id": p["id"], "name": p["name"], "score": 10 - i, "reasoning": "ranked"}
+            for i, p in enumerate(body["projects"])
+        ]}
+
+    monkeypatch.setattr(recommendations, "_call_ai", fake_call)
+    monkeypatch.setattr(recommendations, "RECOMMENDATION_CANDIDATES", 3)
+    return calls
+
+
+def test_only_a_shortlist_is_sent_for_ranking(client, db, ai_calls):
+    supervisor_id = add_supervisor(db).id
+    for i in range(8):
+        add_project(db, supervisor_id, title=f"Dashboard {i}", research_field="Big Data")
+    wanted = add_project(db, supervisor_id, title="Smart contracts audit", research_field="Blockchain").id
+    project_features.refresh_features_for_ids(db, list(range(1, wanted + 1)), force=True)
+    db.commit()
+    student_id = add_student(db).id
+    headers = auth(student_id, "student")
+
+    response = client.put("/students/me/recommendations", json={"requirements": "blockchain please"}, headers=headers)
+    assert response.status_code == 202
+
+    (analyze, _, claims), (rank, body, _) = ai_calls
+    assert (analyze, rank) == ("/analyze-requirements", "/rank-projects")
+    # the student's own identity, so their rate limit applies
+    assert (claims["id"], claims["role"]) == (student_id, "student")
+    assert len(body["projects"]) == 3
+    assert body["projects"][0]["id"] == wanted
+
+    stored = client.get("/students/me/recommendations", headers=headers).json()
+    assert stored["status"] == "ready"
+    assert stored["results"][0]["id"] == wanted
+    computed_at = datetime.fromisoformat(stored["computed_at"])
+    assert abs(computed_at - datetime.now(timezone.utc).replace(tzinfo=None)) < timedelta(minutes=1)
+
+
+def test_shortlist_keeps_catalogue_order_without_requirements():
+    projects = [{"id": i, "name": str(i)} for i in range(10)]
+    assert recommendations.shortlist(None, projects, 4) == projects[:4]
+    assert recommendations.shortlist({"fields": ["AI"]}, projects[:2], 4) == projects[:2]
+
+
+def test_main_api_does_not_load_the_ai_service():
+    code = "import sys, main; main.create_app(); import services.recommendations; print('ai' in sys.modules)"
+    env = {**os.environ, "FAST_START": "1", "SQL_ECHO": "0"}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_busy_ai_service_is_waited_out(monkeypatch):
+    import io
+    import urllib.error
+
+    attempts = []
+
+    def fake_urlopen(request, timeout):
+        attempts.append(request.full_url)
+        if len(attempts) < 3:
+            raise urllib.error.HTTPError(request.full_url, 429, "busy", {"Retry-After": "0"}, None)
+        return io.BytesIO(b'{"ok": true}')
+
+    monkeypatch.setattr(recommendations.urllib.request, "urlopen", fake_urlopen)
+    assert recommendations._call_ai("/rank-projects", {}, "token") == {"ok": True}
+    assert len(attempts) == 3
+
+
+def test_project_change_during_a_run_is_not_lost(client, db, ai_calls, monkeypatch):
+    supervisor_id = add_supervisor(db).id
+    project_id = add_project(db, supervisor_id, title="Smart contracts audit", research_field="Blockchain").id
+    headers = auth(add_student(db).id, "student")
+    fake_call = recommendations._call_ai
+
+    def edited_while_ranking(path, body, token):
+        if path == "/rank-projects" and len(ai_calls) == 1:
+            # the supervisor edits the project after the run read the catalogue
+            with SessionLocal() as other:
+                supervisor.update_project_for_supervisor(
+                    other, supervisor_id, project_id, ProjectUpdate(description="Now about auditing DAOs"))
+        return fake_call(path, body, token)
+
+    monkeypatch.setattr(recommendations, "_call_ai", edited_while_ranking)
+    client.put("/students/me/recommendations", json={"requirements": "blockchain please"}, headers=headers)
+
+    # the outdated ranking was dropped rather than stored as ready
+    first = client.get("/students/me/recommendations", headers=headers).json()
+    assert first["status"] == "stale"
+    assert first["results"] == []
+
+    # that read scheduled a fresh run over the edited catalogue
+    assert [path for path, _, _ in ai_calls].count("/rank-projects") == 2
+    refreshed = client.get("/students/me/recommendations", headers=headers).json()
+    assert refreshed["status"] == "ready"
+    assert [p["id"] for p in refreshed["results"]] == [project_id]
+
+
+def test_failed_run_is_logged(client, db, monkeypatch, caplog):
+    def unreachable(path, body, token):
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(recommendations, "_call_ai", unreachable)
+    headers = auth(add_student(db).id, "student")
+    with caplog.at_level("WARNING", logger="services.recommendations"):
+        client.put("/students/me/recommendations", json={"requirements": "anything"}, headers=headers)
+
+    assert client.get("/students/me/recommendations", headers=headers).json()["status"] == "failed"
+    assert "connection refused" in caplog.text
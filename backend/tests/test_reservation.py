@@ -0,0 +1,36 @@
+from conftest import add_group, add_project, add_student, add_supervisor, auth
+from models.capacity import ProjectCapacity, SupervisorCapacity
+
+
+def test_student_reserves_and_releases_for_own_group(client, db):
+    supervisor = add_supervisor(db, quota=1)
+    project = add_project(db, supervisor.id)
+    group = add_group(db, "g1")
+    student = add_student(db, group_id=group.id)
+
+    response = client.post(f"/groups/{group.id}/reservation", json={"project_id": project.id}, headers=auth(student.id, "student"))
+    assert response.status_code == 200
+    assert response.json() == {"group_id": group.id, "project_id": project.id, "supervisor_id": supervisor.id}
+    db.expire_all()
+    assert db.get(ProjectCapacity, project.id).remaining == 0
+    assert db.get(SupervisorCapacity, supervisor.id).remaining == 0
+
+    response = client.delete(f"/groups/{group.id}/reservation", headers=auth(student.id, "student"))
+    assert response.status_code == 204
+    db.expire_all()
+    assert db.get(ProjectCapacity, project.id).remaining == 1
+    assert db.get(SupervisorCapacity, supervisor.id).remaining == 1
+
+
+def test_student_cannot_touch_another_groups_reservation(client, db):
+    supervisor = add_supervisor(db, quota=2)
+    project = add_project(db, supervisor.id)
+    own = add_group(db, "own")
+    other = add_group(db, "other", project_id=project.id, supervisor_id=supervisor.id)
+    student = add_student(db, group_id=own.id)
+    headers = auth(student.id, "student")
+
+    assert client.post(f"/groups/{other.id}/reservation", json={"project_id": project.id}, headers=headers).status_code == 403
+    assert client.delete(f"/groups/{other.id}/reservation", headers=headers).status_code == 403
+    db.expire_all()
+    assert db.get(type(other), other.id).project_id == project.id
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import select
+
+from conftest import add_group, add_project, add_supervisor, auth
+from models.group import StudentGroup
+from models.project import Project
+from models.supervisor import Supervisor
+from utils.query_stats import track_queries
+
+
+@pytest.fixture
+def no_returning(engine, monkeypatch):
+    # MySQL has no UPDATE ... RETURNING; take the rowcount + SELECT branch
+    monkeypatch.setattr(engine.dialect, "update_returning", False)
+
+
+def _selected_tables(stats):
+    return [shape.split(" FROM ")[1].split()[0] for shape in stats.shapes if shape.startswith("SELECT")]
+
+
+def test_update_supervisor_is_one_statement(client, db):
+    supervisor_id = add_supervisor(db).id
+    headers = auth(supervisor_id, "supervisor")
+    with track_queries() as stats:
+        response = client.put("/supervisors/me", json={"faculty": "FEIT"}, headers=headers)
+    assert response.status_code == 200
+    assert stats.count == 1
+    assert next(iter(stats.shapes)).startswith("UPDATE supervisors")
+    assert db.get(Supervisor, supervisor_id).faculty == "FEIT"
+
+
+def test_update_missing_supervisor_is_404(client, db):
+    with track_queries() as stats:
+        response = client.put("/supervisors/me", json={"faculty": "FEIT"}, headers=auth(999, "supervisor"))
+    assert response.status_code == 404
+    assert stats.count == 1
+
+
+def test_update_project_is_one_statement(client, db):
+    supervisor_id = add_supervisor(db).id
+    project_id = add_project(db, supervisor_id).id
+    headers = auth(supervisor_id, "supervisor")
+    with track_queries() as stats:
+        response = client.put(f"/supervisors/{supervisor_id}/projects/{project_id}",
+                              json={"project_grade": "HD"}, headers=headers)
+    assert response.status_code == 200
+    assert db.get(Project, project_id).project_grade == "HD"
+    assert stats.count == 1
+
+
+def test_update_other_supervisors_project_is_404(client, db):
+    owner_id = add_supervisor(db).id
+    other_id = add_supervisor(db).id
+    project_id = add_project(db, owner_id).id
+    response = client.put(f"/supervisors/{other_id}/projects/{project_id}",
+                          json={"project_grade": "HD"}, headers=auth(other_id, "supervisor"))
+    assert response.status_code == 404
+    db.expire_all()
+    assert db.get(Project, project_id).project_grade != "HD"
+
+
+def test_update_without_returning_selects_once(client, db, no_returning):
+    supervisor_id = add_supervisor(db).id
+    project_id = add_project(db, supervisor_id).id
+    headers = auth(supervisor_id, "supervisor")
+    with track_queries() as stats:
+        response = client.put(f"/supervisors/{supervisor_id}/projects/{project_id}",
+                              json={"project_grade": "HD"}, headers=headers)
+    assert response.status_code == 200
+    assert db.get(Project, project_id).project_grade == "HD"
+    assert stats.count == 2
+    assert _selected_tables(stats) == ["projects"]
+
+    with track_queries() as stats:
+        response = client.put(f"/supervisors/{supervisor_id}/projects/{project_id + 1}",
+                              json={"project_grade": "HD"}, headers=headers)
+    # rowcount 0: no follow-up SELECT
+    assert response.status_code == 404
+    assert stats.count == 1
+
+
+def test_delete_project_does_not_load_it(client, db):
+    supervisor_id = add_supervisor(db).id
+    project_id = add_project(db, supervisor_id).id
+    headers = auth(supervisor_id, "supervisor")
+    with track_queries() as stats:
+        response = client.delete(f"/supervisors/{supervisor_id}/projects/{project_id}", headers=headers)
+    assert response.status_code == 204
+    # placed-group probe, claim release, capacity row, stale recommendations, the DELETE
+    assert stats.count == 5
+    assert _selected_tables(stats) == ["student_groups"]
+    assert db.get(Project, project_id) is None
+
+
+def test_delete_other_supervisors_project_rolls_back(client, db):
+    owner_id = add_supervisor(db).id
+    other_id = add_supervisor(db).id
+    project_id = add_project(db, owner_id).id
+    group_id = add_group(db, "g1", project_id=project_id, supervisor_id=owner_id).id
+
+    response = client.delete(f"/supervisors/{other_id}/projects/{project_id}", headers=auth(other_id, "supervisor"))
+    assert response.status_code == 404
+    db.expire_all()
+    # rowcount 0 on the DELETE undoes the claim release that ran before it
+    assert db.get(Project, project_id) is not None
+    assert db.execute(select(StudentGroup.project_id).where(StudentGroup.id == group_id)).scalar_one() == project_id
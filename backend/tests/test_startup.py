@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code: str) -> str:
+    env = {**os.environ, "FAST_START": "1", "SQL_ECHO": "0"}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+
+
+def test_factory_builds_the_app_once():
+    code = (
+        "import main\n"
+        "built = []\n"
+        "create = main.create_app\n"
+        "main.create_app = lambda: built.append(1) or create()\n"
+        "main.create_app()\n"
+        "print(len(built), main._app is None)\n"
+    )
+    assert _run(code) == "1 True"
+
+
+def test_module_app_is_built_lazily_and_cached():
+    assert _run("import main; print(main._app is None, main.app is main.app)") == "True True"
+
+
+def test_startup_does_not_import_numpy():
+    assert _run("import sys, main; main.create_app(); print('numpy' in sys.modules)") == "False"
+
+
+def test_ai_settings_come_from_dotenv(tmp_path):
+    # a stand-in dotenv whose load_dotenv() sets what a .env file would
+    (tmp_path / "dotenv.py").write_text(
+        "import os\n"
+        "def load_dotenv():\n"
+        "    os.environ.setdefault('AI_USER_BURST', '7')\n"
+        "    os.environ.setdefault('DEEPSEEK_MAX_CONCURRENCY', '3')\n"
+        "    os.environ.setdefault('RANK_JOB_WORKERS', '2')\n"
+        "    os.environ.setdefault('ANALYZE_BATCH_CONCURRENCY', '9')\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key not in (
+        "AI_USER_BURST", "DEEPSEEK_MAX_CONCURRENCY", "RANK_JOB_WORKERS", "ANALYZE_BATCH_CONCURRENCY")}
+    code = (
+        "import ai\n"
+        "print(ai.rate_limiter.user_burst, ai.deepseek_gate.limit, ai.rank_jobs.workers,"
+        " ai.ANALYZE_BATCH_CONCURRENCY)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                         env={**env, "PYTHONPATH": str(tmp_path), "FAST_START": "1", "SQL_ECHO": "0"},
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["7.0", "3", "2", "9"]
@@ -0,0 +1,100 @@
+from collections import Counter
+
+import pytest
+
+import ai
+from conftest import auth
+from services.taxonomy import extract_terms, quick_analysis
+from utils.aho_corasick import Automaton
+
+
+def test_automaton_reports_overlapping_occurrences():
+    automaton = Automaton({"he": "he", "she": "she", "hers": "hers", "his": "his"})
+    assert sorted(automaton.iter_all("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_find_keeps_whole_words_only():
+    automaton = Automaton({"ai": "AI", "cloud": "Cloud", "spark": "Spark"})
+    assert automaton.find("said the cloudy sparkling rain") == []
+    assert automaton.find("ai, cloud and spark_ml") == [(0, 2, "AI"), (4, 9, "Cloud")]
+
+
+def test_find_prefers_the_leftmost_longest_phrase():
+    automaton = Automaton({"smart contract": "short", "smart contracts": "long", "contracts": "tail"})
+    assert automaton.find("smart contracts") == [(0, 15, "long")]
+    # a rejected occurrence does not hide the ones it overlaps ("smart
+    # contract" is not a whole word here)
+    assert automaton.find("smart contracts", accept=lambda start, end, value: value != "long") == [
+        (6, 15, "tail")
+    ]
+
+
+def test_overlapping_terms_resolve_to_the_longer_one():
+    assert extract_terms("a deep learning model for radiology") == {
+        "fields": ["Healthcare"],
+        "keywords": ["Medical Imaging"],
+        "features": ["Deep Learning Model"],
+    }
+    assert extract_terms("big data analytics")["fields"] == ["Big Data"]
+
+
+@pytest.mark.parametrize("text", ["list the project ids", "an ai project", "user-IDS lookup", "AI-based tool", "Ids"])
+def test_short_acronyms_need_capitals_and_a_whole_token(text):
+    assert extract_terms(text) == {"fields": [], "keywords": [], "features": []}
+
+
+@pytest.mark.parametrize("text, keyword", [
+    ("An IDS for home networks", "Intrusion Detection"),
+    ("AI/ML project", "Machine Learning"),
+    ("NLP.", "Natural Language Processing"),
+    ("(ML) on the edge", "Machine Learning"),
+])
+def test_short_acronyms_written_as_acronyms_match(text, keyword):
+    assert keyword in extract_terms(text)["keywords"]
+
+
+def test_clear_cut_input_is_answered_locally():
+    assert quick_analysis("I want a blockchain project with smart contracts") == {
+        "fields": ["Blockchain"], "keywords": ["Smart Contracts"], "features": []
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "anything except blockchain",                                       # negation
+    "cloud gaming for retro consoles on cheap phones",                  # mostly unexplained words
+    "healthcare, blockchain and cloud computing",                       # more than two fields
+    "hello there",                                                       # nothing matched
+])
+def test_ambiguous_input_is_left_to_the_model(text):
+    assert quick_analysis(text) is None
+
+
+@pytest.fixture
+def deepseek(monkeypatch):
+    calls = []
+
+    async def fake(messages, expect_json=True):
+        calls.append(messages[-1]["content"])
+        return {"fields": ["Cloud Computing"], "keywords": [], "features": []}
+
+    monkeypatch.setattr(ai, "call_deepseek_api", fake)
+    monkeypatch.setattr(ai, "analysis_metrics", Counter())
+    return calls
+
+
+def test_triage_routes_and_counts(ai_client, deepseek):
+    headers = auth(1, "student")
+
+    def analyze(text):
+        response = ai_client.post("/analyze-requirements", json={"user_input": text}, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    assert analyze("I want a blockchain project")["fields"] == ["Blockchain"]
+    assert analyze("blockchain but not crypto")["fields"] == ["Cloud Computing"]
+    assert analyze("show projects")["fields"] == []
+    assert deepseek == ["blockchain but not crypto"]
+
+    metrics = ai_client.get("/metrics/analysis", headers=headers).json()
+    assert (metrics["total"], metrics["rule_based"], metrics["llm"], metrics["list_all"]) == (3, 1, 1, 1)
+    assert metrics["rule_based_share"] == pytest.approx(1 / 3)
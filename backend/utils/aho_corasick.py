@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Automaton:
+    """Aho-Corasick matcher over a fixed set of lowercase phrases.
+
+    One pass over the text finds every phrase occurrence, however many phrases
+    there are; `find` keeps whole-word matches only and resolves overlaps
+    leftmost-longest, the same way an ordered regex alternation would.
+    """
+
+    def __init__(self, phrases: Dict[str, Any]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # per state: (phrase length, value) for every phrase ending there
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+        for phrase, value in phrases.items():
+            state = 0
+            for char in phrase:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(phrase), value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_all(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Every (start, end, value) occurrence, overlapping ones included."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._out[state]:
+                yield index + 1 - length, index + 1, value
+
+    def find(self, text: str, accept: Optional[Callable[[int, int, Any], bool]] = None) -> List[Tuple[int, int, Any]]:
+        """Non-overlapping whole-word matches, leftmost-longest, in text order.
+
+        accept(start, end, value) can reject further occurrences before
+        overlaps are resolved, so a rejected one never hides another.
+        """
+        candidates = [
+            (start, end, value)
+            for start, end, value in self.iter_all(text)
+            if _is_boundary(text, start - 1) and _is_boundary(text, end)
+            and (accept is None or accept(start, end, value))
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches, covered_until = [], 0
+        for start, end, value in candidates:
+            if start >= covered_until:
+                matches.append((start, end, value))
+                covered_until = end
+        return matches
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == "_")
@@ -0,0 +1,87 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Tuple
+
+
+class IntervalTree:
+    """Static interval tree over closed [start, end] intervals.
+
+    Intervals are kept sorted by start and viewed as an implicit balanced
+    tree (the middle of every index range is a node), each node holding the
+    largest and smallest end in its subtree, so whole subtrees that end too
+    early (overlap) or only too late (containment) are skipped. A query visits
+    the O(log n) nodes along its bounds plus at most O(log n) per match;
+    results come in start order.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]]):
+        items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._values = [item[2] for item in items]
+        self._max_end: List[Any] = [None] * len(items)
+        self._min_end: List[Any] = [None] * len(items)
+        self._build(0, len(items))
+
+    def _build(self, lo: int, hi: int):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        largest = smallest = self._ends[mid]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is None:
+                continue
+            if child[0] > largest:
+                largest = child[0]
+            if child[1] < smallest:
+                smallest = child[1]
+        self._max_end[mid] = largest
+        self._min_end[mid] = smallest
+        return largest, smallest
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Values whose interval shares at least one point with [start, end]."""
+        found = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue
+            stack.append((lo, mid))
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+        found.sort()
+        return [self._values[i] for i in found]
+
+    def at(self, point) -> List[Any]:
+        """Values whose interval contains point."""
+        return self.overlapping(point, point)
+
+    def within(self, start, end) -> List[Any]:
+        """Values whose interval lies entirely inside [start, end]."""
+        # candidates start inside the window, a slice of the sorted starts;
+        # subtrees outside it, or whose every interval ends after `end`, are skipped
+        first = bisect_left(self._starts, start)
+        last = bisect_right(self._starts, end)
+        found = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi or hi <= first or lo >= last:
+                continue
+            mid = (lo + hi) // 2
+            if self._min_end[mid] > end:
+                continue
+            stack.append((lo, mid))
+            if first <= mid < last and self._ends[mid] <= end:
+                found.append(mid)
+            stack.append((mid + 1, hi))
+        found.sort()
+        return [self._values[i] for i in found]
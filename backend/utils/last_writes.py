@@ -0,0 +1,67 @@
+"""Server-side record of when each user last wrote, for read-your-writes routing.
+
+The sticky cookie only follows browsers that keep cookies; API clients using
+a bearer token, and cross-origin SPAs, are recognized by their user instead.
+Each entry says "read from the primary until this time" and is dropped once
+that time has passed.
+
+MemoryLastWrites keeps the map per worker process; with READ_STICKY_DB every
+worker on the host shares one SQLite file, so a write on one worker keeps the
+user's reads on the primary whichever worker serves them.
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+
+class MemoryLastWrites:
+    # expired entries are swept once the map grows past this many users
+    SWEEP_ABOVE = 10000
+
+    def __init__(self):
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def sticky_until(self, key: str) -> float:
+        with self._lock:
+            return self._until.get(key, 0.0)
+
+    def record(self, key: str, until: float):
+        with self._lock:
+            if until > self._until.get(key, 0.0):
+                self._until[key] = until
+            if len(self._until) > self.SWEEP_ABOVE:
+                now = time.time()
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+
+class SQLiteLastWrites:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS last_writes (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_last_writes_until ON last_writes (until)")
+            self._connection = connection
+        return self._connection
+
+    def sticky_until(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT until FROM last_writes WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def record(self, key: str, until: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO last_writes (key, until) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET until = max(until, excluded.until)",
+                (key, until),
+            )
+            self._conn.execute("DELETE FROM last_writes WHERE until < ?", (time.time(),))
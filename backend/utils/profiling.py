@@ -0,0 +1,246 @@
+"""Opt-in request profiling for the FastAPI apps.
+
+A request is profiled when it is picked by PROFILE_SAMPLE_RATE (0-1) or when
+it carries `X-Profile: <PROFILE_TOKEN>`. Each profiled request gets:
+
+- a cProfile of the event-loop thread (async endpoints and middleware),
+- wall-clock stack samples of every thread, which is where sync endpoints
+  run (FastAPI executes them in a threadpool, out of cProfile's sight),
+
+written to PROFILE_DIR, which keeps the newest PROFILE_KEEP requests. Show the
+slowest profiled requests and their hottest stacks with:
+
+    python -m utils.profiling [--dir profiles] [--top 10]
+
+With neither setting present the middleware is not installed at all.
+"""
+import argparse
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 200))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)) / 1000
+
+INDEX = "index.jsonl"
+HEADER = b"x-profile"
+
+# innermost frames of threads that are parked rather than working
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's stack at a fixed interval until stopped."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled or explicitly requested HTTP requests.
+
+    Only one request is profiled at a time: cProfile hooks the whole thread,
+    so overlapping profiles would corrupt each other. Requests arriving while
+    one is in progress run unprofiled.
+    """
+
+    def __init__(self, app, directory: str = PROFILE_DIR, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 token: str = PROFILE_TOKEN, keep: int = PROFILE_KEEP):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token.encode()
+        self.keep = keep
+        self._busy = threading.Lock()
+        # profiles are written from worker threads; one at a time keeps the index intact
+        self._writing = threading.Lock()
+
+    def _wanted(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == HEADER and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status = {}
+
+        async def capture_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(SAMPLE_INTERVAL)
+        started = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, capture_status)
+        finally:
+            profiler.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            self._busy.release()
+            try:
+                # dumping, formatting and rotating are file I/O: keep them off the event loop
+                await asyncio.to_thread(self._write, scope, status.get("code"), elapsed, profiler, sampler)
+            except OSError as e:
+                print(f"[profiling] could not write profile: {e}")
+
+    def _write(self, scope, status_code: Optional[int], elapsed: float, profiler, sampler):
+        with self._writing:
+            self._write_files(scope, status_code, elapsed, profiler, sampler)
+
+    def _write_files(self, scope, status_code: Optional[int], elapsed: float, profiler, sampler):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        slug = scope["path"].strip("/").replace("/", "_") or "root"
+        name = f"{stamp}-{scope['method']}-{slug}"[:150]
+        base = os.path.join(self.directory, name)
+
+        profiler.dump_stats(base + ".prof")
+        with open(base + ".stacks", "w") as f:
+            # collapsed-stack format, readable by flamegraph.pl / speedscope
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(30)
+        with open(base + ".txt", "w") as f:
+            f.write(f"{scope['method']} {scope['path']} -> {status_code} in {elapsed * 1000:.1f}ms\n\n")
+            f.write("Hottest sampled stacks (all threads):\n")
+            for stack, count in sampler.stacks.most_common(10):
+                f.write(f"  {count:5d}  {_leaf(stack)}\n")
+            f.write("\nEvent-loop thread cProfile:\n")
+            f.write(report.getvalue())
+
+        with open(os.path.join(self.directory, INDEX), "a") as f:
+            f.write(json.dumps({
+                "name": name,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "ms": round(elapsed * 1000, 2),
+                "samples": sampler.samples,
+                "at": stamp,
+            }) + "\n")
+        self._rotate()
+
+    def _rotate(self):
+        index_path = os.path.join(self.directory, INDEX)
+        with open(index_path) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        if len(entries) <= self.keep:
+            return
+        for entry in entries[:-self.keep]:
+            for suffix in (".prof", ".stacks", ".txt"):
+                try:
+                    os.remove(os.path.join(self.directory, entry["name"] + suffix))
+                except FileNotFoundError:
+                    pass
+        with open(index_path, "w") as f:
+            for entry in entries[-self.keep:]:
+                f.write(json.dumps(entry) + "\n")
+
+
+def _leaf(stack: str, depth: int = 4) -> str:
+    # the last few frames say more than the full framework call chain
+    return " <- ".join(reversed(stack.split(";")[-depth:]))
+
+
+def install_profiling(app):
+    """Add the middleware only when profiling is configured, so it costs nothing otherwise."""
+    if PROFILE_SAMPLE_RATE > 0 or PROFILE_TOKEN:
+        app.add_middleware(ProfilingMiddleware)
+
+
+def summary(directory: str, top: int):
+    index_path = os.path.join(directory, INDEX)
+    if not os.path.exists(index_path):
+        print(f"No profiles in {directory}")
+        return
+    with open(index_path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{len(entries)} profiled requests in {directory}\n")
+    print("Slowest:")
+    for entry in sorted(entries, key=lambda e: e["ms"], reverse=True)[:top]:
+        print(f"  {entry['ms']:9.1f}ms  {entry['method']:6s} {entry['path']}  ({entry['status']})  {entry['name']}")
+
+    by_route = {}
+    for entry in entries:
+        by_route.setdefault((entry["method"], entry["path"]), []).append(entry["ms"])
+    print("\nBy route (count, median ms):")
+    for (method, path), times in sorted(by_route.items(), key=lambda kv: -sorted(kv[1])[len(kv[1]) // 2]):
+        print(f"  {len(times):5d}  {sorted(times)[len(times) // 2]:9.1f}ms  {method} {path}")
+
+    stacks = Counter()
+    for entry in entries:
+        try:
+            with open(os.path.join(directory, entry["name"] + ".stacks")) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    stacks[_leaf(stack)] += int(count)
+        except FileNotFoundError:
+            continue
+    print("\nHottest sampled stacks across all profiles:")
+    for stack, count in stacks.most_common(top):
+        print(f"  {count:6d}  {stack}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize recorded request profiles")
+    parser.add_argument("--dir", default=PROFILE_DIR)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    summary(args.dir, args.top)
@@ -0,0 +1,163 @@
+"""Per-request SQL query counting, timing and N+1 detection.
+
+Hooks the cursor events of every SQLAlchemy Engine (class level, so engines
+swapped in by scripts or tests are covered too). With QUERY_STATS=1 each
+response carries:
+
+    X-Query-Count: 3
+    X-Query-Time-Ms: 1.42
+    X-Query-Max-Repeat: 1     # most executions of one statement shape
+
+For tests, `assert_query_budget` fails when the code under it runs more
+queries than allowed or the same statement shape too often:
+
+    with assert_query_budget(max_queries=3):
+        client.get("/supervisors/me/projects", headers=auth)
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_STATS = os.getenv("QUERY_STATS", "0") == "1"
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES_ROWS = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with literals and parameter lists folded, so `id = 1` and `id = 2` match."""
+    shape = _SPACE.sub(" ", statement).strip()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _VALUES_ROWS.sub(r"\1", shape)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+    @property
+    def max_repeat(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def repeated(self, limit: int):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > limit]
+
+
+# stats of the request being handled; copied into threadpool workers with the context
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# collectors that see every query regardless of context (test helper)
+_watchers: List[QueryStats] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is None and not _watchers:
+        return
+    elapsed = time.perf_counter() - started
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for watcher in list(_watchers):
+        watcher.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # the failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware adding the query headers to every HTTP response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-query-count", str(stats.count).encode()),
+                    (b"x-query-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+                    (b"x-query-max-repeat", str(stats.max_repeat).encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+
+
+def install_query_stats(app):
+    """Add the debug headers when QUERY_STATS=1; nothing is installed otherwise."""
+    if QUERY_STATS:
+        app.add_middleware(QueryStatsMiddleware)
+
+
+@contextmanager
+def track_queries():
+    """Collect every query run (in any thread) while the block executes."""
+    stats = QueryStats()
+    _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        _watchers.remove(stats)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: int = 1):
+    """Fail if the block runs more than max_queries statements, or one statement
+    shape more than max_repeats times (the signature of an N+1 loop)."""
+    with track_queries() as stats:
+        yield stats
+
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f"{stats.count} queries, budget is {max_queries}")
+    for shape, n in stats.repeated(max_repeats):
+        problems.append(f"statement ran {n} times (limit {max_repeats}): {shape}")
+    if problems:
+        raise AssertionError("Query budget exceeded:\n  " + "\n  ".join(problems))
@@ -0,0 +1,31 @@
+"""The database's current time in UTC, as a SQL expression.
+
+func.now() is server-local time on MySQL, so naive DateTime columns filled
+by it disagree with the UTC the rest of the code assumes (HTTP dates,
+availability windows). utcnow() renders the UTC clock of each dialect.
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+
+
+class utcnow(FunctionElement):
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "mysql")
+def _mysql_utcnow(element, compiler, **kw):
+    # parenthesized so it is also valid as a column DEFAULT (MySQL 8.0.13+)
+    return "(UTC_TIMESTAMP())"
+
+
+@compiles(utcnow, "postgresql")
+def _postgresql_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"